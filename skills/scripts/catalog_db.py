@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+本地目录库（SQLite）
+按 (类别, id) 保存标准化后的硬件记录，支持分批 upsert 和按类别流式导出，
+供大规模数据源（如 GitHub/Intel 数据集）增量入库，而不必把整个目录读入内存。
+
+使用方法：
+python catalog_db.py                          # 各类别记录数
+python catalog_db.py --export cpu -o cpu.json # 导出某个类别
+"""
+
+import json
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+from config import CATALOG_DB_CONFIG
+from json_stream import write_json_items
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    category     TEXT NOT NULL,
+    id           TEXT NOT NULL,
+    model        TEXT,
+    brand        TEXT,
+    release_date TEXT,
+    source       TEXT,
+    data         TEXT NOT NULL,
+    updated_at   REAL NOT NULL,
+    PRIMARY KEY (category, id)
+)
+"""
+
+_UPSERT = """
+INSERT INTO catalog (category, id, model, brand, release_date, source, data, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(category, id) DO UPDATE SET
+    model = excluded.model,
+    brand = excluded.brand,
+    release_date = excluded.release_date,
+    source = excluded.source,
+    data = excluded.data,
+    updated_at = excluded.updated_at
+"""
+
+
+class CatalogDB:
+    """按类别存储硬件记录的 SQLite 目录库"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path or CATALOG_DB_CONFIG["path"])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+
+    def upsert_many(self, category: str, records: Iterable[Dict[str, Any]],
+                    batch_size: Optional[int] = None) -> int:
+        """
+        分批写入记录（同一类别下 id 相同的记录整条替换）
+
+        Args:
+            category: 类别（cpu, gpu, phone）
+            records: 记录迭代器，每条必须有 id
+            batch_size: 每批提交的记录数
+
+        Returns:
+            写入的记录数
+        """
+        batch_size = batch_size or CATALOG_DB_CONFIG["batch_size"]
+        batch = []
+        total = 0
+        for record in records:
+            batch.append((
+                category, record['id'], record.get('model'), record.get('brand'),
+                record.get('releaseDate'), record.get('source'),
+                json.dumps(record, ensure_ascii=False), time.time()
+            ))
+            if len(batch) >= batch_size:
+                total += self._write(batch)
+                batch = []
+        if batch:
+            total += self._write(batch)
+        return total
+
+    def _write(self, batch) -> int:
+        with self._conn:
+            self._conn.executemany(_UPSERT, batch)
+        return len(batch)
+
+    def iter_records(self, category: str, source: Optional[str] = None,
+                     updated_since: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """按 id 顺序逐条读取某个类别的记录（可按来源、写入时间 time.time() 过滤）"""
+        sql = "SELECT data FROM catalog WHERE category = ?"
+        params = [category]
+        if source is not None:
+            sql += " AND source = ?"
+            params.append(source)
+        if updated_since is not None:
+            sql += " AND updated_at >= ?"
+            params.append(updated_since)
+        for (data,) in self._conn.execute(sql + " ORDER BY id", params):
+            yield json.loads(data)
+
+    def get(self, category: str, record_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT data FROM catalog WHERE category = ? AND id = ?",
+                                 (category, record_id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        """各类别记录数"""
+        return dict(self._conn.execute("SELECT category, COUNT(*) FROM catalog GROUP BY category"))
+
+    def export_json(self, category: str, path: Union[str, Path]) -> int:
+        """逐条写出某个类别的全部记录为 JSON 数组，返回记录数"""
+        return write_json_items(self.iter_records(category), path)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地目录库")
+    parser.add_argument('--db', help='数据库路径（默认读取配置）')
+    parser.add_argument('--export', metavar='CATEGORY', help='导出某个类别')
+    parser.add_argument('-o', '--output', help='导出文件路径')
+    args = parser.parse_args()
+
+    with CatalogDB(args.db) as catalog:
+        if args.export:
+            output = args.output or f"{args.export}_catalog.json"
+            count = catalog.export_json(args.export, output)
+            print(f"💾 已导出 {count} 条 {args.export} 记录: {output}")
+            return
+        counts = catalog.counts()
+        print(f"🗂️  目录库: {catalog.path}")
+        for category, count in sorted(counts.items()):
+            print(f"  {category}: {count} 条")
+        if not counts:
+            print("  （空）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+列式目录快照
+将 CPU/GPU/手机数据列表转换为 NumPy 结构化数组快照，并提供向量化的
+日期窗口、分组、百分位和 Top-N 查询，供分析和报告脚本使用
+
+使用方法：
+python catalog_snapshot.py                 # 为所有类别生成快照
+python catalog_snapshot.py cpu --report    # 生成CPU快照并打印统计
+
+依赖库：
+pip install numpy
+"""
+
+import json
+import re
+import sys
+import argparse
+from datetime import datetime, date
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Sequence, Union
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+from config import TARGET_FILES, SNAPSHOT_DIR
+from date_normalizer import parse_date, normalize_array
+
+
+SNAPSHOT_VERSION = 2
+
+# 缺失日期的占位值（排序后位于最前，不会落入任何日期窗口）
+MISSING_DAY = -(2 ** 31)
+EPOCH = date(1970, 1, 1)
+
+# 派生列（不会还原到记录中；原始记录中的同名字段会被忽略）
+DAY_COLUMN = "_day"
+MODEL_NUMBER_COLUMN = "_model_number"
+CORES_TOTAL_COLUMN = "_cores_total"
+DATE_PRECISION_COLUMN = "_date_precision"
+DERIVED_COLUMNS = (DAY_COLUMN, MODEL_NUMBER_COLUMN, CORES_TOTAL_COLUMN, DATE_PRECISION_COLUMN)
+
+_DIGITS = re.compile(r'\d+')
+
+
+def _require_numpy():
+    if not HAS_NUMPY:
+        raise ImportError("列式快照需要 numpy，请先安装: pip install numpy")
+
+
+def _to_day(value: Any) -> int:
+    """将发布日期转换为自 1970-01-01 起的天数，无法解析时返回 MISSING_DAY"""
+    parsed = parse_date(value)
+    return (parsed - EPOCH).days if parsed else MISSING_DAY
+
+
+def _model_number(model: Any) -> int:
+    """与 extract_model_number 相同的排序键：拼接型号中的所有数字"""
+    numbers = _DIGITS.findall(model) if isinstance(model, str) else []
+    if not numbers:
+        return 0
+    return min(int(''.join(numbers)), 2 ** 62)
+
+
+def _cores_total(cores: Any) -> int:
+    """核心总数，'8P+16E' 计为 24，无法解析时为 -1"""
+    if isinstance(cores, bool):
+        return -1
+    if isinstance(cores, (int, float)):
+        return int(cores)
+    numbers = _DIGITS.findall(cores) if isinstance(cores, str) else []
+    return sum(int(n) for n in numbers) if numbers else -1
+
+
+def _infer_kind(values: Sequence[Any]) -> str:
+    """推断列类型：bool / int / float / str / json"""
+    kinds = set()
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            kinds.add('bool')
+        elif isinstance(value, int):
+            kinds.add('int')
+        elif isinstance(value, float):
+            kinds.add('float')
+        elif isinstance(value, (dict, list)):
+            kinds.add('json')
+        else:
+            kinds.add('str')
+    if not kinds:
+        return 'str'
+    if kinds == {'bool'}:
+        return 'bool'
+    if kinds <= {'int', 'float'}:
+        return 'float' if 'float' in kinds else 'int'
+    if 'json' in kinds:
+        return 'json'
+    return 'str'
+
+
+class CatalogSnapshot:
+    """
+    单个类别的列式快照
+
+    columns 为结构化数组，每个记录字段一列，另含派生列（_day 等）；
+    nulls 为同名布尔结构化数组，标记原始值是否为 None/缺失；
+    date_order 为按 _day 排序的行索引，用于二分查找日期窗口
+    """
+
+    def __init__(self, data_type: str, columns, nulls, fields: List[str],
+                 kinds: Dict[str, str], date_order=None, created_at: Optional[str] = None):
+        _require_numpy()
+        self.data_type = data_type
+        self.columns = columns
+        self.nulls = nulls
+        self.fields = fields
+        self.kinds = kinds
+        self.created_at = created_at or datetime.now().isoformat(timespec='seconds')
+        if date_order is None:
+            date_order = np.argsort(columns[DAY_COLUMN], kind='stable')
+        self.date_order = date_order
+        self.sorted_days = columns[DAY_COLUMN][date_order]
+        self._group_cache: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]], data_type: str) -> 'CatalogSnapshot':
+        """
+        从字典列表构建快照
+
+        Args:
+            records: 数据列表
+            data_type: 数据类型（cpu/gpu/phone）
+
+        Returns:
+            快照对象
+        """
+        _require_numpy()
+        fields: List[str] = []
+        for record in records:
+            for field in record:
+                if field not in fields and field not in DERIVED_COLUMNS:
+                    fields.append(field)
+
+        kinds, dtype, null_dtype, values_by_field = {}, [], [], {}
+        for field in fields:
+            values = [record.get(field) for record in records]
+            kind = _infer_kind(values)
+            if kind == 'json':
+                values = [None if v is None else json.dumps(v, ensure_ascii=False) for v in values]
+            elif kind == 'str':
+                values = [None if v is None else str(v) for v in values]
+            kinds[field] = kind
+            values_by_field[field] = values
+
+            if kind == 'bool':
+                dtype.append((field, '?'))
+            elif kind in ('int', 'float'):
+                dtype.append((field, 'f8'))
+            else:
+                width = max((len(v) for v in values if v is not None), default=1)
+                dtype.append((field, f'U{max(width, 1)}'))
+            null_dtype.append((field, '?'))
+
+        dtype += [(DAY_COLUMN, 'i4'), (MODEL_NUMBER_COLUMN, 'i8'), (CORES_TOTAL_COLUMN, 'i4'),
+                  (DATE_PRECISION_COLUMN, 'i1')]
+
+        columns = np.zeros(len(records), dtype=dtype)
+        nulls = np.zeros(len(records), dtype=null_dtype)
+        for field in fields:
+            values = values_by_field[field]
+            mask = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+            nulls[field] = mask
+            kind = kinds[field]
+            if kind in ('int', 'float'):
+                columns[field] = [np.nan if v is None else float(v) for v in values]
+            elif kind == 'bool':
+                columns[field] = [bool(v) for v in values]
+            else:
+                columns[field] = ['' if v is None else v for v in values]
+
+        # 发布日期只解析一次，之后的排序和过滤都基于天数列
+        dates, precision = normalize_array(r.get('releaseDate') for r in records)
+        days = dates.astype('i8')
+        days[np.isnat(dates)] = MISSING_DAY
+        columns[DAY_COLUMN] = days
+        columns[DATE_PRECISION_COLUMN] = precision
+        columns[MODEL_NUMBER_COLUMN] = [_model_number(r.get('model')) for r in records]
+        columns[CORES_TOTAL_COLUMN] = [_cores_total(r.get('cores')) for r in records]
+
+        return cls(data_type, columns, nulls, fields, kinds)
+
+    def save(self, path: Path) -> Path:
+        """保存为 .npz 文件"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "data_type": self.data_type,
+            "fields": self.fields,
+            "kinds": self.kinds,
+            "created_at": self.created_at,
+            "rows": len(self)
+        }
+        with open(path, 'wb') as f:
+            np.savez(f, columns=self.columns, nulls=self.nulls, date_order=self.date_order,
+                     meta=np.array(json.dumps(meta, ensure_ascii=False)))
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> 'CatalogSnapshot':
+        """从 .npz 文件加载快照"""
+        _require_numpy()
+        with np.load(path, allow_pickle=False) as archive:
+            meta = json.loads(str(archive['meta']))
+            if meta.get("version") != SNAPSHOT_VERSION:
+                raise ValueError(f"快照版本不匹配: {meta.get('version')}")
+            return cls(meta["data_type"], archive['columns'], archive['nulls'], meta["fields"],
+                       meta["kinds"], archive['date_order'], meta.get("created_at"))
+
+    def query(self) -> 'CatalogQuery':
+        """返回覆盖全部行的查询对象"""
+        return CatalogQuery(self, np.arange(len(self)))
+
+    def group_codes(self, field: str):
+        """返回 (分组键数组, 每行的分组编号)，按字段缓存"""
+        if field not in self._group_cache:
+            self._group_cache[field] = np.unique(self.columns[field], return_inverse=True)
+        return self._group_cache[field]
+
+    def value(self, field: str, row: int) -> Any:
+        """还原单元格的原始值"""
+        if self.nulls[field][row]:
+            return None
+        value = self.columns[field][row]
+        kind = self.kinds[field]
+        if kind == 'int':
+            return int(value)
+        if kind == 'float':
+            return float(value)
+        if kind == 'bool':
+            return bool(value)
+        if kind == 'json':
+            return json.loads(str(value))
+        return str(value)
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """还原整行记录"""
+        return {field: self.value(field, row) for field in self.fields}
+
+
+def _day_of(value: Union[str, date, datetime, int]) -> int:
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return (value - EPOCH).days
+    if isinstance(value, int):
+        return value
+    return _to_day(value)
+
+
+class CatalogQuery:
+    """快照上的行选择，所有操作都返回新的查询对象或聚合结果"""
+
+    def __init__(self, snapshot: CatalogSnapshot, rows):
+        self.snapshot = snapshot
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def count(self) -> int:
+        return len(self.rows)
+
+    def between_dates(self, start=None, end=None) -> 'CatalogQuery':
+        """
+        日期窗口过滤（闭区间），通过排序索引二分查找，无法解析的日期会被排除
+
+        Args:
+            start: 起始日期（str/date/datetime），None表示不限
+            end: 结束日期，None表示不限
+        """
+        snap = self.snapshot
+        lo_day = _day_of(start) if start is not None else MISSING_DAY + 1
+        hi_day = _day_of(end) if end is not None else np.iinfo(np.int32).max
+        lo = np.searchsorted(snap.sorted_days, lo_day, side='left')
+        hi = np.searchsorted(snap.sorted_days, hi_day, side='right')
+        window = snap.date_order[lo:hi]
+        if len(self.rows) != len(snap):
+            window = window[np.isin(window, self.rows, assume_unique=True)]
+        return CatalogQuery(snap, np.sort(window))
+
+    def where(self, field: str, value: Any) -> 'CatalogQuery':
+        """相等过滤"""
+        column = self.snapshot.columns[field][self.rows]
+        return CatalogQuery(self.snapshot, self.rows[column == value])
+
+    def column(self, field: str):
+        """选中行的列值（数值列中缺失值为 NaN）"""
+        return self.snapshot.columns[field][self.rows]
+
+    def valid(self, field: str):
+        """选中行中非空的数值"""
+        values = self.column(field)
+        mask = ~self.snapshot.nulls[field][self.rows] if field in self.snapshot.kinds else values >= 0
+        values = values[mask]
+        if values.dtype.kind == 'f':
+            values = values[~np.isnan(values)]
+        return values
+
+    def group_by(self, field: str, missing: Optional[str] = None) -> Dict[str, 'CatalogQuery']:
+        """
+        按字段分组，返回 {分组键: 查询对象}，分组按首次出现的顺序排列
+
+        Args:
+            field: 分组字段
+            missing: 字段为空（None/缺失）的行归入的分组键；为 None 时按空值本身分组
+        """
+        keys, codes = self.snapshot.group_codes(field)
+        selected = codes[self.rows]
+        if missing is not None and field in self.snapshot.kinds:
+            # 空值单独编号为 len(keys)，之后映射到 missing 分组
+            selected = np.where(self.snapshot.nulls[field][self.rows], len(keys), selected)
+        order = np.argsort(selected, kind='stable')
+        sorted_codes = selected[order]
+        bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+        chunks = [chunk for chunk in np.split(order, bounds) if len(chunk)]
+        # 稳定排序后每组第一个下标即首次出现的位置
+        chunks.sort(key=lambda chunk: chunk[0])
+        groups = {}
+        for chunk in chunks:
+            code = selected[chunk[0]]
+            key = missing if code == len(keys) else str(keys[code])
+            rows = self.rows[chunk]
+            if key in groups:
+                # 空值分组与同名的非空分组合并
+                rows = np.sort(np.concatenate([groups[key].rows, rows]))
+            groups[key] = CatalogQuery(self.snapshot, rows)
+        return groups
+
+    def group_counts(self, field: str) -> Dict[str, int]:
+        """按字段统计数量"""
+        keys, codes = self.snapshot.group_codes(field)
+        counts = np.bincount(codes[self.rows], minlength=len(keys))
+        return {str(keys[i]): int(c) for i, c in enumerate(counts) if c}
+
+    def sort_by(self, field: str, descending: bool = False) -> 'CatalogQuery':
+        """按字段排序（稳定排序）"""
+        values = self.column(field)
+        order = np.argsort(values, kind='stable')
+        if descending:
+            order = order[::-1]
+        return CatalogQuery(self.snapshot, self.rows[order])
+
+    def top_n(self, field: str, n: int = 10, descending: bool = True) -> 'CatalogQuery':
+        """按字段取前N行，缺失值不参与排序"""
+        values = self.column(field).astype('f8')
+        if field in self.snapshot.kinds:
+            values[self.snapshot.nulls[field][self.rows]] = np.nan
+        valid = np.flatnonzero(~np.isnan(values))
+        if not len(valid):
+            return CatalogQuery(self.snapshot, self.rows[:0])
+        keys = -values[valid] if descending else values[valid]
+        n = min(n, len(valid))
+        part = np.argpartition(keys, n - 1)[:n]
+        part = part[np.argsort(keys[part], kind='stable')]
+        return CatalogQuery(self.snapshot, self.rows[valid[part]])
+
+    def percentiles(self, field: str, qs: Sequence[float] = (25, 50, 75)) -> Dict[float, float]:
+        """数值列的百分位"""
+        values = self.valid(field)
+        if not len(values):
+            return {}
+        result = np.percentile(values, list(qs))
+        return {q: float(v) for q, v in zip(qs, result)}
+
+    def stats(self, field: str) -> Dict[str, float]:
+        """数值列的 count/mean/min/max"""
+        values = self.valid(field)
+        if not len(values):
+            return {"count": 0}
+        return {
+            "count": int(len(values)),
+            "mean": float(values.mean()),
+            "min": float(values.min()),
+            "max": float(values.max())
+        }
+
+    def records(self) -> List[Dict[str, Any]]:
+        """还原为字典列表"""
+        return [self.snapshot.record(int(row)) for row in self.rows]
+
+
+def snapshot_path(data_type: str) -> Path:
+    """类别快照文件路径"""
+    return SNAPSHOT_DIR / f"{data_type}_snapshot.npz"
+
+
+def write_snapshot(data_type: str, records: List[Dict[str, Any]]) -> Path:
+    """
+    为类别生成并保存快照
+
+    Args:
+        data_type: 数据类型
+        records: 数据列表
+
+    Returns:
+        快照文件路径
+    """
+    snapshot = CatalogSnapshot.from_records(records, data_type)
+    return snapshot.save(snapshot_path(data_type))
+
+
+def load_or_build_snapshot(data_type: str, json_path: Optional[Path] = None) -> CatalogSnapshot:
+    """
+    加载类别快照；快照不存在或比 JSON 数据旧时重新生成
+
+    Args:
+        data_type: 数据类型
+        json_path: 数据JSON路径，默认使用 TARGET_FILES
+
+    Returns:
+        快照对象
+    """
+    json_path = Path(json_path or TARGET_FILES[data_type])
+    path = snapshot_path(data_type) if json_path == TARGET_FILES.get(data_type) \
+        else SNAPSHOT_DIR / f"{json_path.stem}_snapshot.npz"
+
+    if path.exists() and (not json_path.exists() or path.stat().st_mtime >= json_path.stat().st_mtime):
+        try:
+            return CatalogSnapshot.load(path)
+        except (ValueError, KeyError, OSError):
+            pass
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    snapshot = CatalogSnapshot.from_records(records, data_type)
+    snapshot.save(path)
+    return snapshot
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='生成列式目录快照')
+    parser.add_argument('types', nargs='*', default=list(TARGET_FILES), help='数据类型（cpu/gpu/phone）')
+    parser.add_argument('--report', action='store_true', help='打印品牌分布和价格统计')
+    args = parser.parse_args()
+
+    if not HAS_NUMPY:
+        print("❌ 需要 numpy: pip install numpy")
+        sys.exit(1)
+
+    for data_type in args.types:
+        with open(TARGET_FILES[data_type], 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        path = write_snapshot(data_type, records)
+        print(f"💾 {data_type.upper()} 快照已保存: {path} ({len(records)} 行)")
+
+        if args.report:
+            query = CatalogSnapshot.load(path).query()
+            print(f"   品牌分布: {query.group_counts('brand')}")
+            if 'price' in query.snapshot.kinds:
+                print(f"   价格统计: {query.stats('price')}")
+
+
+if __name__ == "__main__":
+    main()
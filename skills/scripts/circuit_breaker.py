@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+按主机 / 数据源的熔断器与健康度
+状态保存在 SQLite 中，跨线程、跨进程、跨运行共享：
+
+- closed：正常放行；连续失败达到 failure_threshold 次后转为 open
+- open：在冷却期内直接拒绝（不再重试、不再随机延迟），快速退回备用数据
+- half_open：冷却期结束后只放行一个探测请求，成功则恢复 closed，失败则重新 open 且冷却期加倍
+
+每个键还保存一个健康分（成功记 1、失败记 0 的指数滑动平均），编排器据此跳过熔断中的数据源，
+并让健康的数据源先采集。键为主机名（传输层按请求 URL 记录）或 "source:名称"（cpu_sources 按数据源记录）。
+
+使用方法：
+breaker = open_circuit_breaker()
+if breaker.allow("https://search.jd.com/Search"):
+    ...
+    breaker.record_success("https://search.jd.com/Search")
+
+python circuit_breaker.py            # 查看各主机 / 数据源的状态与健康分
+python circuit_breaker.py --reset    # 清空全部记录
+"""
+
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from config import CIRCUIT_BREAKER_CONFIG
+from rate_limiter import host_of
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS breakers (
+    key          TEXT PRIMARY KEY,
+    state        TEXT NOT NULL,
+    failures     INTEGER NOT NULL DEFAULT 0,
+    cooldown     REAL NOT NULL DEFAULT 0,
+    open_until   REAL NOT NULL DEFAULT 0,
+    probe_until  REAL NOT NULL DEFAULT 0,
+    health       REAL NOT NULL DEFAULT 1,
+    successes    INTEGER NOT NULL DEFAULT 0,
+    total_failures INTEGER NOT NULL DEFAULT 0,
+    last_error   TEXT,
+    updated_at   REAL NOT NULL
+)
+"""
+
+_COLUMNS = ('state', 'failures', 'cooldown', 'open_until', 'probe_until', 'health',
+            'successes', 'total_failures', 'last_error', 'updated_at')
+
+
+class CircuitBreaker:
+    """跨进程共享的熔断器（SQLite）"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            path: 状态数据库路径，同一路径的所有进程共用熔断状态
+            config: 熔断参数（见 CIRCUIT_BREAKER_CONFIG）
+        """
+        self.config = config or CIRCUIT_BREAKER_CONFIG
+        self.path = Path(path or self.config["path"])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None：事务由 BEGIN IMMEDIATE 显式控制，其他进程在写锁上等待
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_of(url_or_key: str) -> str:
+        """URL 取主机名，"source:名称" 等键原样使用"""
+        return host_of(url_or_key)
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM breakers WHERE key = ?", (key,)
+        ).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    def _update(self, key: str, change) -> Any:
+        """在一个写事务中读取、修改并保存某个键的状态"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                state = self._read(key) or {
+                    "state": CLOSED, "failures": 0, "cooldown": 0.0, "open_until": 0.0, "probe_until": 0.0,
+                    "health": 1.0, "successes": 0, "total_failures": 0, "last_error": None, "updated_at": now
+                }
+                result = change(state, now)
+                state["updated_at"] = now
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO breakers (key, {', '.join(_COLUMNS)}) "
+                    f"VALUES (?, {', '.join('?' * len(_COLUMNS))})",
+                    (key,) + tuple(state[column] for column in _COLUMNS)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def is_open(self, url_or_key: str) -> bool:
+        """只查询、不占用探测名额：冷却期内或探测请求进行中时返回 True"""
+        with self._lock:
+            state = self._read(self.key_of(url_or_key))
+        if state is None or state["state"] == CLOSED:
+            return False
+        now = time.time()
+        if state["state"] == OPEN:
+            return now < state["open_until"]
+        return now < state["probe_until"]
+
+    def allow(self, url_or_key: str) -> bool:
+        """
+        是否放行一次请求；冷却期结束后第一个调用者获得探测名额（half_open），其余调用者继续被拒绝
+
+        Returns:
+            True 表示可以发出请求，请求结束后须调用 record_success / record_failure
+        """
+        def check(state, now):
+            if state["state"] == CLOSED:
+                return True
+            if state["state"] == OPEN and now < state["open_until"]:
+                return False
+            if state["state"] == HALF_OPEN and now < state["probe_until"]:
+                return False
+            # 冷却期结束，或上一个探测请求超时未报告结果：放行一个新的探测请求
+            state["state"] = HALF_OPEN
+            state["probe_until"] = now + self.config["probe_timeout"]
+            return True
+
+        return self._update(self.key_of(url_or_key), check)
+
+    def _health(self, health: float, outcome: float) -> float:
+        alpha = self.config["health_alpha"]
+        return (1 - alpha) * health + alpha * outcome
+
+    def record_success(self, url_or_key: str) -> None:
+        """请求成功：恢复 closed，连续失败清零"""
+        def succeed(state, now):
+            state.update(state=CLOSED, failures=0, cooldown=0.0, open_until=0.0, probe_until=0.0)
+            state["successes"] += 1
+            state["health"] = self._health(state["health"], 1.0)
+
+        self._update(self.key_of(url_or_key), succeed)
+
+    def record_failure(self, url_or_key: str, error: Optional[str] = None) -> str:
+        """
+        请求失败：连续失败达到阈值或探测失败时打开熔断
+
+        Returns:
+            记录后的状态
+        """
+        def fail(state, now):
+            state["failures"] += 1
+            state["total_failures"] += 1
+            state["health"] = self._health(state["health"], 0.0)
+            state["last_error"] = (error or '')[:200] or None
+            if state["state"] == HALF_OPEN or state["failures"] >= self.config["failure_threshold"]:
+                # 探测失败时冷却期加倍
+                cooldown = state["cooldown"] * 2 if state["state"] == HALF_OPEN else self.config["cooldown"]
+                state["cooldown"] = min(max(cooldown, self.config["cooldown"]), self.config["max_cooldown"])
+                state["state"] = OPEN
+                state["open_until"] = now + state["cooldown"]
+                state["probe_until"] = 0.0
+            return state["state"]
+
+        return self._update(self.key_of(url_or_key), fail)
+
+    def health(self, url_or_key: str) -> float:
+        """健康分（0~1，没有记录时为 1）"""
+        with self._lock:
+            state = self._read(self.key_of(url_or_key))
+        return state["health"] if state else 1.0
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """所有键的当前状态"""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT key, {', '.join(_COLUMNS)} FROM breakers ORDER BY key").fetchall()
+        return {row[0]: dict(zip(_COLUMNS, row[1:])) for row in rows}
+
+    def reset(self, url_or_key: Optional[str] = None) -> None:
+        """清除某个键（默认全部）的记录"""
+        with self._lock:
+            if url_or_key is None:
+                self._conn.execute("DELETE FROM breakers")
+            else:
+                self._conn.execute("DELETE FROM breakers WHERE key = ?", (self.key_of(url_or_key),))
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_circuit_breaker() -> Optional[CircuitBreaker]:
+    """按配置打开熔断器；关闭时返回 None（所有请求照常发出）"""
+    return CircuitBreaker() if CIRCUIT_BREAKER_CONFIG["enabled"] else None
+
+
+def main():
+    """命令行：查看各主机 / 数据源的熔断状态与健康分"""
+    import argparse
+    parser = argparse.ArgumentParser(description="熔断器状态")
+    parser.add_argument('--reset', nargs='?', const='*', metavar='KEY', help='清空全部记录或某个主机 / 数据源')
+    args = parser.parse_args()
+
+    with CircuitBreaker() as breaker:
+        if args.reset:
+            breaker.reset(None if args.reset == '*' else args.reset)
+            print("🧹 已清空熔断记录")
+            return
+        states = breaker.snapshot()
+        if not states:
+            print("（尚无熔断记录）")
+        now = time.time()
+        icons = {CLOSED: '🟢', HALF_OPEN: '🟡', OPEN: '🔴'}
+        for key, state in states.items():
+            line = (f"{icons[state['state']]} {key}: {state['state']}，健康分 {state['health']:.2f}，"
+                    f"成功 {state['successes']} / 失败 {state['total_failures']}")
+            if state["state"] == OPEN and state["open_until"] > now:
+                line += f"，{state['open_until'] - now:.0f}s 后探测"
+            if state["last_error"] and state["state"] != CLOSED:
+                line += f"\n     最近错误: {state['last_error']}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ MOCK_DIR = PROJECT_ROOT / "src" / "mock"
 BACKUP_DIR = Path(__file__).parent / "backups"
 SCRAPERS_DIR = Path(__file__).parent / "scrapers"
 CACHE_DIR = Path(__file__).parent / ".cache"
+SNAPSHOT_DIR = CACHE_DIR / "snapshots"
 
 # 目录路径字典
 PATHS = {
@@ -19,7 +20,8 @@ PATHS = {
     "MOCK_DIR": MOCK_DIR,
     "BACKUP_DIR": BACKUP_DIR,
     "SCRAPERS_DIR": SCRAPERS_DIR,
-    "CACHE_DIR": CACHE_DIR
+    "CACHE_DIR": CACHE_DIR,
+    "SNAPSHOT_DIR": SNAPSHOT_DIR
 }
 
 # 目标文件配置
@@ -29,6 +31,14 @@ TARGET_FILES = {
     "phone": MOCK_DIR / "phone_data.json"
 }
 
+# 云数据库集合配置（与前端 useHardwareList 使用的集合名一致）
+SCHEMA_DIR = PROJECT_ROOT / "schemas"
+COLLECTION_NAMES = {
+    "cpu": "cpu_collection",
+    "gpu": "gpu_collection",
+    "phone": "phone_collection"
+}
+
 # 采集器模块配置
 SCRAPER_MODULES = {
     "cpu": "scrapers.cpu",
@@ -50,6 +60,203 @@ DATA_SOURCE_CONFIG = {
     "timeout": 30  # 超时时间（秒）
 }
 
+# 跨数据源实体识别配置
+ENTITY_RESOLUTION_CONFIG = {
+    "threshold": 0.6,       # 同一分块内名称 3-gram Jaccard 相似度阈值
+    "num_perm": 64,         # MinHash 排列数
+    "bands": 16,            # LSH 分段数（每段 num_perm / bands 行）
+    "lsh_min_block": 32,    # 超过该大小的分块改用 LSH 生成候选对
+    "id_map_dir": CACHE_DIR / "entities"
+}
+
+# CPU 多数据源合并配置
+CPU_SOURCE_CONFIG = {
+    # 启用的数据源，顺序即未单独配置字段时的默认优先级
+    # passmark 需要 selenium 和 Chrome，在 ISOLATION_CONFIG 的内存上限下无法启动浏览器，
+    # 默认不启用，可通过 --sources ... passmark 指定（指定后按 field_precedence 优先取其价格）
+    "sources": ["wikipedia", "ryzen", "techpowerup", "github"],
+    # 只用来补全字段的数据源：其记录只在与其他数据源合并到同一型号时使用，不单独产出型号
+    # （GitHub/Intel 数据集有约 4000 个其他数据源没有的型号，缺少价格、频率等字段）
+    "fill_only_sources": ["github"],
+    # 字段级优先级：列表中靠前的数据源优先，未列出的数据源按默认顺序排在后面
+    "field_precedence": {
+        "model": ["wikipedia", "techpowerup_detail", "techpowerup", "ryzen", "github"],  # PassMark 型号带 "@ 3.20GHz" 后缀
+        "baseClock": ["techpowerup_detail", "techpowerup", "ryzen", "wikipedia"],
+        "boostClock": ["techpowerup_detail", "techpowerup", "ryzen", "wikipedia"],
+        "cache": ["techpowerup_detail", "techpowerup", "ryzen", "wikipedia"],
+        "tdp": ["techpowerup_detail", "techpowerup", "ryzen", "wikipedia"],
+        "socket": ["techpowerup_detail", "techpowerup", "github"],
+        "price": ["passmark", "ryzen"],
+        "releaseDate": ["wikipedia", "ryzen", "github"]
+    },
+    "max_workers": 4,  # 并发采集的数据源数
+    "cache_dir": CACHE_DIR / "cpu_sources",  # 每个数据源的标准化结果缓存
+    # 合并结果的字段来源（型号 ID -> {"sources", "fields"}），不写入前端数据文件
+    "provenance_path": CACHE_DIR / "cpu_sources" / "provenance.json",
+    "cache_ttl_hours": DATA_SOURCE_CONFIG["cache_ttl_hours"],
+    # 直接读取已有 JSON 文件的数据源
+    "files": {
+        "github": Path(__file__).parent / "output" / "github_cpu_data.json"
+    }
+}
+
+# 增量采集配置（详情页 URL 边界）
+FRONTIER_CONFIG = {
+    "path": CACHE_DIR / "frontier.sqlite3",
+    # 按发布时长决定详情页的重新采集间隔：(发布不超过多少天, 间隔天数)，按顺序匹配
+    "refresh_policy": [
+        (180, 3),      # 半年内的新品：规格和价格仍在变化
+        (730, 30),     # 两年内
+        (None, 180)    # 更老的型号很少变化
+    ],
+    "unknown_age_days": 7,  # 发布日期未知时的间隔
+    "commit_every": 50      # 每多少次更新提交一次
+}
+
+# TechPowerUp 全量分区采集配置（cpu-specs 列表页的查询参数组合）
+TECHPOWERUP_CRAWL_CONFIG = {
+    "full_crawl": False,  # CpuScraper 默认是否使用分区全量采集（命令行 --full 可临时开启）
+    "manufacturers": ["AMD", "Intel"],
+    "first_year": 2000,
+    # 细分市场过滤：桌面 / 移动 / 服务器
+    "segments": [
+        {"mobile": "No", "server": "No"},
+        {"mobile": "Yes"},
+        {"server": "Yes"}
+    ],
+    "max_workers": 4,          # 并发采集的分区数
+    "min_interval": 1.0,       # 同一主机两次请求的最小间隔（秒）
+    "jitter": 1.0,             # 间隔的随机抖动上限（秒）
+    "partition_max_rows": 100,   # 列表页最多显示的行数：分区行数达到该值时视为被截断
+    # 被截断的分区依次按这些过滤条件继续切分（过滤参数, 取值列表）；切分用尽仍被截断、
+    # 或子分区没有覆盖父分区的全部型号时，本次采集记为不完整
+    "split_filters": [
+        ("cores", ["1", "2", "3", "4", "6", "8", "10", "12", "14", "16", "18", "20", "22", "24",
+                   "26", "28", "32", "36", "40", "48", "56", "60", "64", "96", "128", "144", "192"]),
+        ("igpu", ["Yes", "No"]),
+    ],
+    # 全量采集的暂存目录库：分区完成即写入，采集结束后从中读回本次的记录再做实体识别去重
+    "catalog_path": CACHE_DIR / "techpowerup_catalog.sqlite3",
+    "catalog_batch_size": 100    # 每批 upsert 的记录数（约一个分区）
+}
+
+# 表格区域指纹缓存配置（表格未变化时跳过解析）
+TABLE_CACHE_CONFIG = {
+    "enabled": True,
+    "path": CACHE_DIR / "table_fingerprints.sqlite3",
+    # 区域名: (元素标签, class 名)
+    "regions": {
+        "techpowerup": ("table", "items-desktop-table"),
+        "wikitable": ("table", "wikitable"),
+        "jd": ("li", "gl-item")
+    }
+}
+
+# 维基百科修订号增量获取配置（MediaWiki API）
+WIKI_REVISION_CONFIG = {
+    "enabled": True,
+    "api_url": "https://en.wikipedia.org/w/api.php",  # 可指向本地替身接口
+    "store_path": CACHE_DIR / "wiki_revisions.sqlite3",
+    "max_changed_ratio": 0.5,  # 受影响章节超过该比例时整页获取
+    "timeout": 30,
+    "user_agent": "HardwareCatalogBot/1.0 (hardware spec data pipeline) python-requests"
+}
+
+# 本地目录库配置（SQLite，流式入库使用）
+CATALOG_DB_CONFIG = {
+    "path": Path(__file__).parent / "output" / "catalog.sqlite3",
+    "batch_size": 500  # 每批 upsert 提交的记录数
+}
+
+# 命令行入口配置（hwpipe.py）
+CLI_CONFIG = {
+    # 快速命令的导入耗时上限（秒，python -X importtime 统计），超出视为回归
+    "import_budget": 0.3,
+    # 快速命令不应导入的重依赖
+    "heavy_modules": ["pandas", "numpy", "bs4", "requests", "lxml", "selenium",
+                      "webdriver_manager", "PIL", "icrawler"],
+    # 参与导入耗时检查的命令
+    "quick_commands": [["validate"], ["diff", "cpu", str(TARGET_FILES["cpu"])]]
+}
+
+# 跨进程共享的按主机自适应限速配置（rate_limiter.SharedRateLimiter）
+RATE_LIMIT_CONFIG = {
+    "enabled": True,
+    "path": CACHE_DIR / "rate_limits.sqlite3",
+    "defaults": {
+        "initial_rate": 0.5,     # 初始速率（请求/秒）
+        "min_rate": 0.05,
+        "max_rate": 2.0,
+        "burst": 2,              # 令牌桶容量
+        "increase": 0.05,        # 每次成功请求增加的速率
+        "decrease": 0.5,         # 限流或变慢时速率乘以该系数
+        "latency_target": 3.0,   # 响应超过该秒数且明显慢于平均值时视为变慢
+        "latency_factor": 2.0,   # 明显变慢：超过平均响应时间的倍数
+        "max_pause": 600         # Retry-After 最长遵守的秒数
+    },
+    # 按主机覆盖默认参数
+    "hosts": {
+        "search.jd.com": {"initial_rate": 0.3, "max_rate": 1.0}
+    }
+}
+
+# 统一 HTTP 传输层配置（http_transport.py，所有脚本共用连接池、重试策略和压缩解码）
+HTTP_CONFIG = {
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "timeout": 30,
+    "pool_connections": 10,      # 缓存连接池的主机数
+    "pool_maxsize": 10,          # 每个主机保持的空闲连接数（不小于并发线程数）
+    "http2": True,               # 安装了 httpx 和 h2 时使用 HTTP/2
+    "verify_tls": True,
+    # 运行结束时导出的按主机请求指标（耗时直方图、响应大小、重试与等待时间）
+    "metrics_path": Path(__file__).parent / "logs" / "http_metrics.json",
+    "retry": {
+        "total": 3,              # 连接错误和下列状态码的最大重试次数
+        "status": [500, 502, 503, 504],
+        "backoff": 1.0,          # 第 n 次重试前等待 backoff * 2^(n-1) 秒
+        "max_wait": 60           # Retry-After 最长遵守的秒数
+    }
+}
+
+# 按主机 / 数据源的熔断器配置（circuit_breaker.py，状态跨进程、跨运行保存）
+CIRCUIT_BREAKER_CONFIG = {
+    "enabled": True,
+    "path": CACHE_DIR / "source_health.sqlite3",
+    "failure_threshold": 3,      # 连续失败次数达到该值时熔断
+    "cooldown": 300,             # 熔断后多少秒再放行一个探测请求
+    "max_cooldown": 6 * 3600,    # 探测连续失败时冷却期加倍的上限
+    "probe_timeout": 120,        # 探测请求超过该秒数未报告结果时允许新的探测
+    "health_alpha": 0.2          # 健康分（成功 1 / 失败 0 的指数滑动平均）的平滑系数
+}
+
+# 时间预算配置（秒，None 表示不限时）
+DEADLINE_CONFIG = {
+    "run_seconds": 2 * 3600,     # 整次 update_db 运行的预算
+    "category_seconds": {        # 每个类别最多占用的预算（不超过剩余的整体预算）
+        "cpu": 3600,
+        "gpu": 1800,
+        "phone": 1800
+    },
+    "reserve_seconds": 60        # 留给校验、对比与保存的时间，剩余不足时不再发起请求
+}
+
+# 最近一次成功发布的数据快照配置（last_good.py）
+LAST_GOOD_CONFIG = {
+    "dir": CACHE_DIR / "last_good",
+    "max_drop_ratio": 0.2,       # 新数据比上次发布少了超过该比例时拒绝发布（--force 跳过）
+    "refresh_log": Path(__file__).parent / "logs" / "background_refresh.log"  # 后台刷新进程的输出
+}
+
+# 采集器子进程隔离配置（isolated_runner.py）
+ISOLATION_CONFIG = {
+    "enabled": False,            # True 时 update_db 默认在子进程中运行每个采集器（也可用 --isolated）
+    "memory_mb": 2048,           # 子进程地址空间上限（Selenium 启动的浏览器同样受限）
+    "cpu_seconds": 1800,         # 子进程 CPU 时间上限
+    "timeout": 3600,             # 墙钟超时（不超过剩余的时间预算），超时后终止整个进程组
+    "grace_seconds": 30,         # 子进程的时间预算比墙钟超时少这么多，让采集器先正常结束
+    "metrics_dir": Path(__file__).parent / "logs" / "isolated"  # 子进程的 HTTP 指标
+}
+
 # 数据验证配置
 VALIDATION_CONFIG = {
     "required_fields": ["id", "model", "brand", "price"],
@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+"""
+CPU 多数据源采集与合并
+并发运行各数据源适配器，按规范型号合并结果：
+- wikipedia:          scrapers/cpu_production.py（Intel Core / AMD Ryzen 维基百科表格）
+- ryzen:              scrape_amd_ryzen_wikipedia.py（AMD Ryzen 完整列表）
+- passmark:           passmark_cpu_scraper.py（跑分和美元价格，需要 selenium 和 Chrome，默认不启用）
+- techpowerup:        scrapers/cpu_scraper.py（TechPowerUp 列表页）
+- techpowerup_detail: techpowerup_cpu_scraper_enhanced.py（含详情页，耗时数小时，默认不启用）
+- github:             已导出的 GitHub/Intel 数据集（CPU_SOURCE_CONFIG["files"]，与 github_ingest 相同的标准化）
+
+每个数据源的标准化结果单独缓存，刷新一个数据源不需要重新运行其他数据源；
+合并时按 CPU_SOURCE_CONFIG["field_precedence"] 逐字段选取取值，并在 _provenance 中记录来源；
+fill_only_sources（默认 github）只为其他数据源也有的型号补全字段，不单独产出型号；
+字段来源另存到 CPU_SOURCE_CONFIG["provenance_path"]，不进入前端数据文件。
+
+使用方法：
+python cpu_sources.py                          # 只采集缓存过期的数据源并合并
+python cpu_sources.py --sources wikipedia ryzen passmark techpowerup github --refresh passmark
+                                               # 启用并强制刷新 PassMark，其余数据源使用缓存
+python cpu_sources.py --cached-only -o output/cpu_merged.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import importlib
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import CPU_SOURCE_CONFIG, SCRAPERS_DIR
+from circuit_breaker import CircuitBreaker, open_circuit_breaker
+from date_normalizer import normalize_date
+from deadline import Deadline, current_deadline
+from json_stream import detect_array_key, iter_json_items
+from entity_resolution import EntityResolver, canonicalize_brand, load_id_map, save_id_map
+from unit_parser import parse_cache, parse_clock, parse_power, parse_process
+
+
+# 与 cpu_production 一致的美元兑人民币汇率
+USD_EXCHANGE_RATE = 7.2
+
+_MISSING_VALUES = (None, '', 'N/A', 'NA', '-')
+
+_BRAND_NAMES = {
+    'intel': 'Intel', 'amd': 'AMD', 'apple': 'Apple', 'qualcomm': 'Qualcomm', 'mediatek': 'MediaTek'
+}
+
+# 缓存格式版本：适配器的标准化逻辑变化时递增，旧版本的缓存视为过期（仍可作为失败时的旧缓存）
+CACHE_VERSION = "2"
+
+# 合并时不参与字段选择的元数据
+_META_FIELDS = {'id', 'source', '_provenance', '_sources'}
+
+
+def _is_missing(value: Any) -> bool:
+    return value in _MISSING_VALUES if not isinstance(value, (list, dict)) else not value
+
+
+def _import_scraper(module_name: str):
+    """导入 scrapers 目录下的模块（该目录没有 __init__.py）"""
+    scrapers_dir = str(SCRAPERS_DIR)
+    if scrapers_dir not in sys.path:
+        sys.path.append(scrapers_dir)
+    return importlib.import_module(module_name)
+
+
+def _usd_to_cny(text: Any) -> Optional[float]:
+    """"$1,299" / "299.99" -> 人民币价格"""
+    if _is_missing(text):
+        return None
+    try:
+        return round(float(str(text).replace('$', '').replace(',', '').strip()) * USD_EXCHANGE_RATE, 2)
+    except ValueError:
+        return None
+
+
+def finalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    统一字段类型：频率 GHz、缓存 MB、功耗 W 为数值，制程为 "x nm"，日期为 ISO，去掉缺失值
+
+    Args:
+        record: 适配器输出的驼峰字段记录
+
+    Returns:
+        标准化后的记录
+    """
+    item = {k: v for k, v in record.items() if not _is_missing(v)}
+    for field, parser in (('baseClock', parse_clock), ('boostClock', parse_clock)):
+        if field in item:
+            item[field] = parser(item[field], 'GHz')
+    if 'cache' in item:
+        item['cache'] = parse_cache(item['cache'], 'MB')
+    if 'tdp' in item:
+        item['tdp'] = parse_power(item['tdp'], 'W')
+    if 'process' in item:
+        process = parse_process(item['process'], 'nm')
+        item['process'] = f"{process:g} nm" if process is not None else None
+    if 'releaseDate' in item:
+        release = normalize_date(item['releaseDate'])
+        item['releaseDate'] = release.iso
+        if release.valid:
+            item['releaseDatePrecision'] = release.precision
+    if 'brand' not in item and item.get('model'):
+        brand = canonicalize_brand(None, item['model'])
+        if brand:
+            item['brand'] = _BRAND_NAMES.get(brand, brand)
+    for field in ('cores', 'threads'):
+        if field in item:
+            item[field] = str(item[field])
+    return {k: v for k, v in item.items() if not _is_missing(v)}
+
+
+class CpuSource:
+    """数据源适配器基类：fetch() 获取原始记录，normalize() 转换为前端字段"""
+
+    name = ""
+
+    def fetch(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def normalize(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return record
+
+    def load(self) -> List[Dict[str, Any]]:
+        """获取并标准化，丢弃没有型号的记录"""
+        records = []
+        for raw in self.fetch() or []:
+            item = self.normalize(raw)
+            if item and item.get('model'):
+                records.append(finalize_record(item))
+        return records
+
+
+class WikipediaSource(CpuSource):
+    name = "wikipedia"
+
+    def fetch(self):
+        return _import_scraper('cpu_production').run()
+
+
+class RyzenSource(CpuSource):
+    name = "ryzen"
+
+    def fetch(self):
+        from scrape_amd_ryzen_wikipedia import AmdRyzenScraper
+        return AmdRyzenScraper().fetch_cpu_data()
+
+    def normalize(self, record):
+        return {
+            'model': record.get('model'),
+            'brand': 'AMD',
+            'cores': record.get('cores'),
+            'threads': record.get('threads'),
+            'baseClock': record.get('base_clock'),
+            'boostClock': record.get('boost_clock'),
+            'cache': record.get('cache'),
+            'tdp': record.get('tdp'),
+            'socket': record.get('socket'),
+            'releaseDate': record.get('release_date'),
+            'price': _usd_to_cny(record.get('price')),
+            'series': record.get('series'),
+            'source': 'Wikipedia'
+        }
+
+
+class PassMarkSource(CpuSource):
+    name = "passmark"
+
+    def fetch(self):
+        from passmark_cpu_scraper import scrape_passmark
+        return scrape_passmark()
+
+    def normalize(self, record):
+        score = str(record.get('passmark_score') or '').replace(',', '')
+        return {
+            'model': record.get('model'),
+            'cores': record.get('cores'),
+            'price': _usd_to_cny(record.get('price_usd')),
+            'passmarkScore': int(score) if score.isdigit() else None,
+            'source': 'PassMark'
+        }
+
+
+class TechPowerUpSource(CpuSource):
+    name = "techpowerup"
+
+    def fetch(self):
+        return _import_scraper('cpu_scraper').CpuScraper().scrape()
+
+    def normalize(self, record):
+        # 备用数据不是采集结果；价格和发布日期是按型号估算的，不参与合并
+        if record.get('source') != 'TechPowerUp':
+            return None
+        return {k: v for k, v in record.items() if k not in ('id', 'price', 'releaseDate', 'description')}
+
+
+class TechPowerUpDetailSource(CpuSource):
+    name = "techpowerup_detail"
+
+    def fetch(self):
+        from techpowerup_cpu_scraper_enhanced import scrape_all_cpus_with_details
+        return scrape_all_cpus_with_details()
+
+    def normalize(self, record):
+        return {
+            'model': record.get('model'),
+            'cores': record.get('cores'),
+            'baseClock': record.get('base_clock_ghz'),
+            'boostClock': record.get('turbo_clock_ghz'),
+            'cache': record.get('l3_cache_mb'),
+            'process': record.get('process_nm'),
+            'tdp': record.get('tdp_w'),
+            'releaseDate': record.get('release_date'),
+            'socket': record.get('socket'),
+            'memoryTypes': record.get('memory_type'),
+            'instructionSets': record.get('instruction_sets'),
+            'source': 'TechPowerUp'
+        }
+
+
+class FileSource(CpuSource):
+    """读取已导出的 JSON 文件"""
+
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = Path(path)
+
+    def fetch(self):
+        # 逐条读取，大型导出文件不必整个载入内存
+        return iter_json_items(self.path, detect_array_key(self.path))
+
+    def normalize(self, record):
+        return {k: v for k, v in record.items() if k != 'id'}
+
+
+class GitHubSource(FileSource):
+    """GitHub/Intel 数据集：与 github_ingest 入库使用同一个标准化函数，两条路径的字段类型一致"""
+
+    def load(self):
+        # github_ingest 导入了本模块的 finalize_record，这里延迟导入；
+        # normalize_github_record 已经调用 finalize_record，不再重复标准化（否则季度日期的精度会被改写）
+        from github_ingest import iter_normalized
+        return [{k: v for k, v in record.items() if k != 'id'} for record in iter_normalized(self.path)]
+
+
+# 使用专用适配器的文件数据源，其余文件数据源使用 FileSource
+FILE_SOURCE_CLASSES = {'github': GitHubSource}
+
+SOURCE_CLASSES = {
+    cls.name: cls for cls in (WikipediaSource, RyzenSource, PassMarkSource, TechPowerUpSource, TechPowerUpDetailSource)
+}
+
+
+def build_source(name: str) -> CpuSource:
+    """按名称创建数据源适配器"""
+    if name in SOURCE_CLASSES:
+        return SOURCE_CLASSES[name]()
+    files = CPU_SOURCE_CONFIG.get("files", {})
+    if name in files:
+        return FILE_SOURCE_CLASSES.get(name, FileSource)(name, files[name])
+    raise ValueError(f"未知的数据源: {name}")
+
+
+class SourceCache:
+    """每个数据源一个缓存文件：{"source", "version", "fetched_at", "records"}"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, ttl_hours: Optional[float] = None):
+        self.cache_dir = Path(cache_dir or CPU_SOURCE_CONFIG["cache_dir"])
+        self.ttl = timedelta(hours=CPU_SOURCE_CONFIG["cache_ttl_hours"] if ttl_hours is None else ttl_hours)
+
+    def path(self, name: str) -> Path:
+        return self.cache_dir / f"{name}.json"
+
+    def read(self, name: str) -> Optional[Dict[str, Any]]:
+        path = self.path(name)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def is_fresh(self, entry: Optional[Dict[str, Any]], source_mtime: Optional[float] = None) -> bool:
+        """缓存版本一致、未超过 TTL，且（文件数据源）晚于源文件的修改时间"""
+        if not entry or entry.get('version') != CACHE_VERSION:
+            return False
+        try:
+            fetched_at = datetime.fromisoformat(entry['fetched_at'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        if source_mtime is not None and fetched_at.timestamp() < source_mtime:
+            return False
+        return datetime.now() - fetched_at < self.ttl
+
+    def write(self, name: str, records: List[Dict[str, Any]]) -> Path:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(name)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'source': name, 'version': CACHE_VERSION, 'fetched_at': datetime.now().isoformat(),
+                       'records': records}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+
+def _stale_records(cache: SourceCache, name: str) -> List[Dict[str, Any]]:
+    """读取数据源的旧缓存（即使已过期），没有缓存时为空列表"""
+    entry = cache.read(name)
+    return entry.get('records', []) if entry else []
+
+
+def collect_sources(names: Optional[Iterable[str]] = None, refresh: Iterable[str] = (),
+                    cached_only: bool = False, max_workers: Optional[int] = None,
+                    cache: Optional[SourceCache] = None,
+                    breaker: Optional[CircuitBreaker] = None,
+                    deadline: Optional[Deadline] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    并发采集各数据源：缓存未过期且不在 refresh 中的数据源直接读取缓存
+
+    每个网络数据源的成败记入熔断器（键为 "source:名称"，跨运行保存）：连续失败而熔断中的数据源
+    不再采集、直接使用旧缓存（refresh 中的数据源除外）；其余数据源按健康分从高到低提交。
+
+    时间预算即将用尽时网络数据源不再采集；预算内没有完成的数据源同样退回旧缓存，不等待其线程结束。
+
+    Args:
+        names: 数据源名称（默认 CPU_SOURCE_CONFIG["sources"]）
+        refresh: 强制重新采集的数据源
+        cached_only: 只读取缓存，不发起采集
+        max_workers: 并发数
+        cache: 缓存对象
+        breaker: 熔断器，默认按 CIRCUIT_BREAKER_CONFIG 打开
+        deadline: 时间预算，默认使用当前生效的预算（见 deadline.activate）
+
+    Returns:
+        {数据源名称: 标准化记录列表}，顺序与 names 一致；失败且无缓存的数据源为空列表
+    """
+    names = list(names or CPU_SOURCE_CONFIG["sources"])
+    refresh = set(refresh)
+    cache = cache or SourceCache()
+    breaker = breaker or open_circuit_breaker()
+    deadline = deadline or current_deadline()
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    pending = []
+
+    files = CPU_SOURCE_CONFIG.get("files", {})
+    for name in names:
+        entry = cache.read(name)
+        # 文件数据源读取本地文件，不受 cached_only 限制
+        local = name in files
+        source_mtime = Path(files[name]).stat().st_mtime if local and Path(files[name]).exists() else None
+        fresh = name not in refresh and cache.is_fresh(entry, source_mtime)
+        if entry and (fresh or (cached_only and not local)):
+            results[name] = entry.get('records', [])
+            print(f"📦 {name}: 使用缓存 {len(results[name])} 条（{entry.get('fetched_at', '?')}）")
+        elif cached_only and not local:
+            print(f"⚠️  {name}: 没有缓存，跳过")
+            results[name] = []
+        elif breaker is not None and not local and name not in refresh and not breaker.allow(f"source:{name}"):
+            results[name] = _stale_records(cache, name)
+            print(f"⏸️  {name}: 连续采集失败，熔断中，使用旧缓存 {len(results[name])} 条")
+        else:
+            pending.append(name)
+
+    if breaker is not None:
+        pending.sort(key=lambda name: -breaker.health(f"source:{name}"))
+
+    if deadline is not None and deadline.low() and any(name not in files for name in pending):
+        # 预算不足以再发起采集：网络数据源与 cached_only 一样使用（可能过期的）旧缓存
+        deadline.mark_exhausted()
+        for name in [name for name in pending if name not in files]:
+            pending.remove(name)
+            results[name] = _stale_records(cache, name)
+            print(f"⏱️  {name}: 时间预算即将用尽，使用旧缓存 {len(results[name])} 条")
+
+    if pending:
+        workers = min(max_workers or CPU_SOURCE_CONFIG["max_workers"], len(pending))
+        print(f"🚀 并发采集 {len(pending)} 个数据源: {', '.join(pending)}（{workers} 个线程）")
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = {executor.submit(build_source(name).load): name for name in pending}
+        timeout = None if deadline is None else max(0.0, deadline.remaining() - deadline.reserve)
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                name = futures[future]
+                local = name in files
+                try:
+                    records = future.result()
+                    if not records and not local:
+                        # 网站不可用时各采集器返回空列表而不是抛出异常
+                        raise RuntimeError("没有采集到数据")
+                    cache.write(name, records)
+                    results[name] = records
+                    if breaker is not None and not local:
+                        breaker.record_success(f"source:{name}")
+                    print(f"✅ {name}: 采集 {len(records)} 条")
+                except Exception as e:
+                    if breaker is not None and not local:
+                        breaker.record_failure(f"source:{name}", str(e))
+                    # 采集失败时退回旧缓存（即使已过期）
+                    results[name] = _stale_records(cache, name)
+                    print(f"❌ {name}: 采集失败（{e}），使用旧缓存 {len(results[name])} 条")
+        except FuturesTimeout:
+            # 预算内没有完成：不计入熔断（不是数据源的错），退回旧缓存
+            deadline.mark_exhausted()
+            for name in pending:
+                if name not in results:
+                    results[name] = _stale_records(cache, name)
+                    print(f"⏱️  {name}: 时间预算用尽仍未完成，使用旧缓存 {len(results[name])} 条")
+        finally:
+            # 预算用尽时不等待仍在运行的线程（它们受同一预算限制，不会再发出新请求）
+            executor.shutdown(wait=deadline is None or not deadline.exhausted, cancel_futures=True)
+
+    return {name: results.get(name, []) for name in names}
+
+
+def _source_ranker(field: str, default_order: List[str], precedence: Dict[str, List[str]]):
+    """返回 数据源 -> 排名 的函数：字段优先级列表在前，其余按默认顺序"""
+    preferred = [name for name in precedence.get(field, []) if name in default_order]
+    order = preferred + [name for name in default_order if name not in preferred]
+    ranks = {name: rank for rank, name in enumerate(order)}
+    return ranks.__getitem__
+
+
+def merge_sources(results: Dict[str, List[Dict[str, Any]]],
+                  precedence: Optional[Dict[str, List[str]]] = None,
+                  id_map: Optional[Dict[str, str]] = None,
+                  fill_only: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    按规范型号合并各数据源的记录
+
+    Args:
+        results: collect_sources() 的结果（字典顺序即默认优先级）
+        precedence: 字段级优先级，默认 CPU_SOURCE_CONFIG["field_precedence"]
+        id_map: 历史规范 ID 映射
+        fill_only: 只用来补全字段的数据源，默认 CPU_SOURCE_CONFIG["fill_only_sources"]；
+            型号的记录全部来自这些数据源时不产出该型号
+
+    Returns:
+        {"records": 合并后的记录列表, "id_map": 更新后的 ID 映射}
+    """
+    precedence = CPU_SOURCE_CONFIG["field_precedence"] if precedence is None else precedence
+    fill_only = set(CPU_SOURCE_CONFIG.get("fill_only_sources", []) if fill_only is None else fill_only)
+    if fill_only.issuperset(results):
+        # 只选择了补全用的数据源（如 --sources github）时照常产出
+        fill_only = set()
+    default_order = list(results)
+    records, origins = [], []
+    for name, items in results.items():
+        records.extend(items)
+        origins.extend([name] * len(items))
+
+    resolution = EntityResolver("cpu", id_map=id_map).resolve(records)
+    rankers: Dict[str, Any] = {}
+
+    merged = []
+    for members in resolution.clusters:
+        if all(origins[i] in fill_only for i in members):
+            continue
+        fields: Dict[str, None] = {}
+        for index in members:
+            fields.update(dict.fromkeys(records[index]))
+
+        item: Dict[str, Any] = {'id': resolution.canonical_ids[members[0]]}
+        provenance: Dict[str, str] = {}
+        for field in fields:
+            if field in _META_FIELDS or field == 'releaseDatePrecision':
+                continue
+            ranker = rankers.get(field)
+            if ranker is None:
+                ranker = rankers[field] = _source_ranker(field, default_order, precedence)
+            candidates = [i for i in members if not _is_missing(records[i].get(field))]
+            if not candidates:
+                continue
+            best = min(candidates, key=lambda i: (ranker(origins[i]), i))
+            item[field] = records[best][field]
+            provenance[field] = origins[best]
+            if field == 'releaseDate' and 'releaseDatePrecision' in records[best]:
+                item['releaseDatePrecision'] = records[best]['releaseDatePrecision']
+
+        sources = list(dict.fromkeys(origins[i] for i in members))
+        labels = list(dict.fromkeys(records[i].get('source') or origins[i] for i in members))
+        item['source'] = ' / '.join(labels)
+        item['_sources'] = sources
+        item['_provenance'] = provenance
+        merged.append(item)
+
+    return {'records': merged, 'id_map': resolution.id_map}
+
+
+def save_provenance(records: List[Dict[str, Any]], path: Optional[Path] = None) -> Path:
+    """
+    把合并记录的字段来源写入单独的文件（型号 ID -> {"sources", "fields"}）
+
+    Args:
+        records: merge_sources() 合并后的记录
+        path: 输出路径，默认 CPU_SOURCE_CONFIG["provenance_path"]
+
+    Returns:
+        文件路径
+    """
+    path = Path(path or CPU_SOURCE_CONFIG["provenance_path"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    provenance = {
+        item['id']: {'sources': item.get('_sources', []), 'fields': item.get('_provenance', {})}
+        for item in records
+    }
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(provenance, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def collect_cpu_data(names: Optional[Iterable[str]] = None, refresh: Iterable[str] = (),
+                     cached_only: bool = False, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+    """
+    采集（或读取缓存）并合并全部 CPU 数据源，沿用并更新持久化的规范 ID
+
+    Args:
+        names: 数据源名称（默认 CPU_SOURCE_CONFIG["sources"]）
+        refresh: 强制重新采集的数据源
+        cached_only: 只读取缓存，不发起采集
+        deadline: 时间预算（见 collect_sources）
+
+    Returns:
+        合并后的 CPU 记录列表
+    """
+    results = collect_sources(names, refresh=refresh, cached_only=cached_only, deadline=deadline)
+    merged = merge_sources(results, id_map=load_id_map("cpu"))
+    save_id_map("cpu", merged['id_map'])
+    save_provenance(merged['records'])
+
+    total = sum(len(items) for items in results.values())
+    print(f"🔗 {total} 条记录 -> {len(merged['records'])} 个型号")
+    return merged['records']
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='并发采集并合并 CPU 多数据源')
+    parser.add_argument('--sources', nargs='+', help=f"数据源（默认 {' '.join(CPU_SOURCE_CONFIG['sources'])}）")
+    parser.add_argument('--refresh', nargs='*', default=[], help='强制重新采集的数据源（不带参数表示全部）')
+    parser.add_argument('--cached-only', action='store_true', help='只使用缓存，不发起采集')
+    parser.add_argument('-o', '--output', help='合并结果输出路径')
+    parser.add_argument('--list', action='store_true', help='列出可用数据源')
+    args = parser.parse_args()
+
+    if args.list:
+        for name in list(SOURCE_CLASSES) + list(CPU_SOURCE_CONFIG.get("files", {})):
+            print(f"  {name}")
+        return
+
+    names = args.sources or CPU_SOURCE_CONFIG["sources"]
+    # "--refresh" 不带参数时刷新所有数据源
+    refresh = args.refresh if args.refresh else (names if '--refresh' in sys.argv else [])
+    records = collect_cpu_data(names, refresh=refresh, cached_only=args.cached_only)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+        print(f"💾 合并结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
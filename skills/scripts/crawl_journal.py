@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+采集断点续传日志
+长时间采集过程中，每完成一个工作单元（列表页、详情页 URL、图标系列等）就向 JSON Lines
+日志追加一行，并定期 fsync。进程中途退出后，以 resume 模式重新打开日志即可回放已完成的
+单元并跳过它们，只重做未完成的部分。
+
+日志格式（每行一个 JSON 对象）：
+{"unit": "detail:https://...", "kind": "detail", "data": {...}, "ts": "2026-01-01T00:00:00"}
+
+使用方法：
+with CrawlJournal(journal_path("techpowerup"), resume=True) as journal:
+    if not journal.is_done(url):
+        journal.record(url, fetch(url), kind="detail")
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+try:
+    from config import CACHE_DIR
+except ImportError:
+    CACHE_DIR = Path(__file__).parent / ".cache"
+
+
+JOURNAL_DIR = CACHE_DIR / "journals"
+
+
+def journal_path(name: str) -> Path:
+    """默认日志路径：.cache/journals/<name>.jsonl"""
+    return JOURNAL_DIR / f"{name}.jsonl"
+
+
+class CrawlJournal:
+    """只追加的工作单元日志"""
+
+    def __init__(self, path: Union[str, Path], resume: bool = False,
+                 fsync_every: int = 20, fsync_interval: float = 5.0):
+        """
+        Args:
+            path: 日志文件路径
+            resume: True 时回放已有日志并在其后追加；False 时清空旧日志重新开始
+            fsync_every: 每追加多少条强制落盘一次
+            fsync_interval: 距上次落盘超过多少秒时强制落盘
+        """
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and self.path.exists():
+            self._replay()
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _replay(self) -> None:
+        """读取已有日志；崩溃时写了一半的最后一行直接忽略"""
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                self._entries[entry['unit']] = entry
+                valid_bytes += len(line)
+        # 截掉不完整的尾部，保证后续追加的行可以被正确解析
+        if valid_bytes < self.path.stat().st_size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_bytes)
+
+    @property
+    def completed(self) -> int:
+        """已完成的单元数"""
+        return len(self._entries)
+
+    def is_done(self, unit: str) -> bool:
+        """该单元是否已完成"""
+        return unit in self._entries
+
+    def get(self, unit: str, default: Any = None) -> Any:
+        """已完成单元记录的数据"""
+        entry = self._entries.get(unit)
+        return entry.get('data') if entry else default
+
+    def records(self, kind: Optional[str] = None) -> Iterator[Any]:
+        """按写入顺序遍历已完成单元的数据，可按 kind 过滤"""
+        for entry in list(self._entries.values()):
+            if kind is None or entry.get('kind') == kind:
+                yield entry.get('data')
+
+    def record(self, unit: str, data: Any = None, kind: Optional[str] = None) -> None:
+        """
+        记录一个已完成的单元
+
+        Args:
+            unit: 单元标识（URL、页码、系列代码等）
+            data: 需要在续传时回放的数据
+            kind: 单元类型
+        """
+        entry = {'unit': unit, 'kind': kind, 'data': data, 'ts': datetime.now().isoformat(timespec='seconds')}
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._entries[unit] = entry
+            self._pending += 1
+            if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync_locked()
+
+    def _sync_locked(self) -> None:
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self) -> None:
+        """强制落盘"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._sync_locked()
+
+    def close(self) -> None:
+        """落盘并关闭日志"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._sync_locked()
+                self._file.close()
+
+    def finish(self) -> None:
+        """采集全部完成后关闭并删除日志，下次运行从头开始"""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
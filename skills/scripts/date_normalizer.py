@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+统一的发布日期解析
+将各数据源中出现的日期写法统一转换为 ISO 日期和精度标记：
+- ISO / MongoDB 导出:  "2024-01-01", "2024-01-01T00:00:00Z", {"$date": ...}
+- Intel ARK / GitHub:   "Q2'22", "Q1 2020", "2Q18", "Q216", "7/27/2017", "05/2020"
+- Wikipedia 文本:       "January 4, 2022", "4 January 2022", "September 2022", "2021"
+
+季度、月份和年份精度的日期取该区间第一天（Q2'22 -> 2022-04-01）。
+解析结果按原始字符串缓存，同一数据集中反复出现的写法只解析一次。
+
+使用方法：
+python date_normalizer.py "Q2'22" "7/27/2017" "N/A"
+"""
+
+import re
+import sys
+from datetime import datetime, date, timezone
+from functools import lru_cache
+from typing import Any, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+
+PRECISION_DAY = "day"
+PRECISION_MONTH = "month"
+PRECISION_QUARTER = "quarter"
+PRECISION_YEAR = "year"
+
+# 精度编码（向量化结果使用，-1 表示无法解析）
+PRECISION_CODES = {
+    PRECISION_DAY: 0,
+    PRECISION_MONTH: 1,
+    PRECISION_QUARTER: 2,
+    PRECISION_YEAR: 3
+}
+
+MIN_YEAR = 1950
+MAX_YEAR = 2100
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+_MONTH_NAME = r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?'
+
+_MISSING_TEXT = {'', 'n/a', 'na', 'none', 'null', 'unknown', 'tba', 'tbd', '-', '—', '?'}
+
+# 按优先级排列的 (正则, 解析函数)；使用 search，可从 "Channel: 7/7/2019, OEM: ..." 这类文本中取首个日期
+_ISO_DAY = re.compile(r'(?<!\d)(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?!\d)')
+_ISO_MONTH = re.compile(r'(?<!\d)(\d{4})-(\d{1,2})(?![\d-])')
+_US_DAY = re.compile(r'(?<!\d)(\d{1,2})/(\d{1,2})/(\d{4}|\d{2})(?![\d/])')
+_US_MONTH = re.compile(r'(?<![\d/])(\d{1,2})/(\d{4})(?![\d/])')
+# "10/18" 与核心/线程数 "8/16" 形式相同：只在已知是日期的值（如发布日期字段）整体为该形式时接受，
+# find_date 扫描任意单元格时不接受
+_US_MONTH_SHORT = re.compile(r'^(\d{1,2})/(\d{2})$')
+_QUARTER_FIRST = re.compile(r"(?<![a-z])q([1-4])\s*(?:'|’|/|-)?\s*(\d{4}|\d{2})(?!\d)", re.IGNORECASE)
+_QUARTER_LAST = re.compile(r"(?<!\d)([1-4])q\s*'?\s*(\d{4}|\d{2})(?!\d)", re.IGNORECASE)
+_NAME_DAY_YEAR = re.compile(_MONTH_NAME + r'\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})', re.IGNORECASE)
+_DAY_NAME_YEAR = re.compile(r'(?<!\d)(\d{1,2})\s+' + _MONTH_NAME + r',?\s+(\d{4})', re.IGNORECASE)
+_NAME_YEAR = re.compile(_MONTH_NAME + r',?\s+(\d{4})', re.IGNORECASE)
+_YEAR = re.compile(r'(?<!\d)((?:19|20)\d{2})(?!\d)')
+
+
+class NormalizedDate(NamedTuple):
+    """解析结果：ISO 日期字符串和精度（day/month/quarter/year），无法解析时均为 None"""
+    iso: Optional[str]
+    precision: Optional[str]
+
+    @property
+    def valid(self) -> bool:
+        return self.iso is not None
+
+    def to_date(self) -> Optional[date]:
+        return date.fromisoformat(self.iso) if self.iso else None
+
+
+MISSING = NormalizedDate(None, None)
+
+
+def _full_year(text: str) -> int:
+    """两位年份按 strptime 的 %y 规则展开（00-68 -> 20xx，69-99 -> 19xx）"""
+    year = int(text)
+    if len(text) == 2:
+        year += 2000 if year < 69 else 1900
+    return year
+
+
+def _build(year: int, month: int, day: int, precision: str) -> NormalizedDate:
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        return MISSING
+    try:
+        return NormalizedDate(date(year, month, day).isoformat(), precision)
+    except ValueError:
+        return MISSING
+
+
+def _iso_day(m):
+    return _build(int(m.group(1)), int(m.group(2)), int(m.group(3)), PRECISION_DAY)
+
+
+def _iso_month(m):
+    return _build(int(m.group(1)), int(m.group(2)), 1, PRECISION_MONTH)
+
+
+def _us_day(m):
+    return _build(_full_year(m.group(3)), int(m.group(1)), int(m.group(2)), PRECISION_DAY)
+
+
+def _us_month(m):
+    return _build(_full_year(m.group(2)), int(m.group(1)), 1, PRECISION_MONTH)
+
+
+def _quarter(m):
+    quarter, year = m.group(1), m.group(2)
+    return _build(_full_year(year), (int(quarter) - 1) * 3 + 1, 1, PRECISION_QUARTER)
+
+
+def _name_day_year(m):
+    return _build(int(m.group(3)), _MONTHS[m.group(1).lower()], int(m.group(2)), PRECISION_DAY)
+
+
+def _day_name_year(m):
+    return _build(int(m.group(3)), _MONTHS[m.group(2).lower()], int(m.group(1)), PRECISION_DAY)
+
+
+def _name_year(m):
+    return _build(int(m.group(2)), _MONTHS[m.group(1).lower()], 1, PRECISION_MONTH)
+
+
+def _year(m):
+    return _build(int(m.group(1)), 1, 1, PRECISION_YEAR)
+
+
+_PATTERNS = (
+    (_ISO_DAY, _iso_day),
+    (_ISO_MONTH, _iso_month),
+    (_US_DAY, _us_day),
+    (_QUARTER_FIRST, _quarter),
+    (_QUARTER_LAST, _quarter),
+    (_NAME_DAY_YEAR, _name_day_year),
+    (_DAY_NAME_YEAR, _day_name_year),
+    (_NAME_YEAR, _name_year),
+    (_US_MONTH, _us_month),
+    (_US_MONTH_SHORT, _us_month),
+    (_YEAR, _year),
+)
+_STRICT_PATTERNS = tuple(entry for entry in _PATTERNS if entry[0] is not _US_MONTH_SHORT)
+
+
+@lru_cache(maxsize=16384)
+def _normalize_text(text: str, short_month: bool = True) -> NormalizedDate:
+    """解析单个日期字符串（带缓存）"""
+    text = text.strip()
+    if text.lower() in _MISSING_TEXT:
+        return MISSING
+    for pattern, handler in (_PATTERNS if short_month else _STRICT_PATTERNS):
+        match = pattern.search(text)
+        if match:
+            result = handler(match)
+            if result.valid:
+                return result
+    return MISSING
+
+
+def normalize_date(value: Any, short_month: bool = True) -> NormalizedDate:
+    """
+    将任意已知写法的发布日期转换为 NormalizedDate
+
+    Args:
+        value: 字符串、date/datetime、MongoDB {"$date": ...} 对象、年份或毫秒时间戳
+        short_month: 是否接受 "10/18" 形式（value 不一定是日期时传 False，避免把 "8/16" 核心/线程数当成日期）
+
+    Returns:
+        NormalizedDate(iso, precision)，无法解析时为 (None, None)
+    """
+    if value is None or isinstance(value, bool):
+        return MISSING
+    if isinstance(value, str):
+        return _normalize_text(value, short_month)
+    if isinstance(value, dict):
+        return normalize_date(value.get('$date'), short_month)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return _build(value.year, value.month, value.day, PRECISION_DAY)
+    if isinstance(value, date):
+        return _build(value.year, value.month, value.day, PRECISION_DAY)
+    if isinstance(value, (int, float)):
+        if MIN_YEAR <= value <= MAX_YEAR and float(value).is_integer():
+            return _build(int(value), 1, 1, PRECISION_YEAR)
+        # MongoDB 导出中的毫秒时间戳
+        try:
+            moment = datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return MISSING
+        return _build(moment.year, moment.month, moment.day, PRECISION_DAY)
+    return MISSING
+
+
+def parse_date(value: Any) -> Optional[date]:
+    """解析为 date 对象，无法解析时返回 None"""
+    return normalize_date(value).to_date()
+
+
+def to_iso(value: Any, default: Optional[str] = None) -> Optional[str]:
+    """
+    解析为 ISO 日期字符串
+
+    Args:
+        value: 原始日期值
+        default: 无法解析时的返回值
+
+    Returns:
+        "YYYY-MM-DD" 字符串或 default
+    """
+    return normalize_date(value).iso or default
+
+
+def find_date(texts: Iterable[Any], default: Optional[str] = None) -> Optional[str]:
+    """
+    在多个文本（如表格一行的各个单元格）中查找第一个可解析的日期
+
+    单元格不一定是日期，因此不接受 "10/18" 这种与核心/线程数 "8/16" 无法区分的写法。
+
+    Args:
+        texts: 文本序列
+        default: 都无法解析时的返回值
+
+    Returns:
+        ISO 日期字符串或 default
+    """
+    for text in texts:
+        if text is None:
+            continue
+        result = normalize_date(text if isinstance(text, (str, dict)) else str(text), short_month=False)
+        if result.valid:
+            return result.iso
+    return default
+
+
+def _cache_key(value: Any) -> Any:
+    if isinstance(value, dict):
+        value = value.get('$date')
+    if isinstance(value, (str, int, float, date)) or value is None:
+        return value
+    return str(value)
+
+
+def normalize_dates(values: Iterable[Any]) -> List[NormalizedDate]:
+    """批量解析，重复值只解析一次"""
+    seen = {}
+    results = []
+    for value in values:
+        key = _cache_key(value)
+        result = seen.get(key)
+        if result is None:
+            result = seen[key] = normalize_date(key)
+        results.append(result)
+    return results
+
+
+def normalize_array(values: Iterable[Any]) -> Tuple[Any, Any]:
+    """
+    向量化解析：先对原始值去重编码，只解析唯一值，再按编码映射回整列
+
+    Args:
+        values: 日期值序列或数组
+
+    Returns:
+        (datetime64[D] 数组（无法解析为 NaT）, int8 精度编码数组（无法解析为 -1）)
+    """
+    if not HAS_NUMPY:
+        raise ImportError("向量化日期解析需要 numpy，请先安装: pip install numpy")
+
+    codes_by_key = {}
+    inverse = []
+    for value in values:
+        key = _cache_key(value)
+        code = codes_by_key.get(key)
+        if code is None:
+            code = codes_by_key[key] = len(codes_by_key)
+        inverse.append(code)
+
+    unique = [normalize_date(key) for key in codes_by_key]
+    unique_dates = np.array([r.iso if r.valid else 'NaT' for r in unique], dtype='datetime64[D]')
+    unique_precision = np.array([PRECISION_CODES.get(r.precision, -1) for r in unique], dtype='i1')
+    inverse = np.asarray(inverse, dtype=np.intp)
+    return unique_dates[inverse], unique_precision[inverse]
+
+
+def cache_info():
+    """返回字符串解析缓存的命中统计"""
+    return _normalize_text.cache_info()
+
+
+def clear_cache() -> None:
+    """清空字符串解析缓存"""
+    _normalize_text.cache_clear()
+
+
+def main():
+    """命令行：打印每个参数的解析结果"""
+    for text in sys.argv[1:] or ["Q2'22", "7/27/2017", "January 4, 2022", "N/A"]:
+        result = normalize_date(text)
+        print(f"{text!r:30} -> {result.iso or '无法解析'} ({result.precision or '-'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+整次运行的时间预算
+update_db.main() 创建一个 Deadline，每个类别再从中分出子预算，沿 run_scraper → 采集模块 run() →
+HardwareScraper.run → fetch_page → 传输层逐级传递。剩余时间不足 reserve（留给校验、对比、保存）时：
+
+- 传输层不再发出新请求（抛出 DeadlineExceeded），单个请求的超时也不超过剩余时间
+- 采集器停止请求、返回已经拿到的数据，并标记预算已用尽（exhausted）
+- update_db 把部分结果与上次的数据合并，整体预算用尽后剩余类别保留现有数据
+
+没有显式传参的代码（如 cpu_sources 线程池中的各数据源）通过 activate() 设置的当前预算获得同样的限制。
+
+使用方法：
+deadline = Deadline(3600, reserve=60)
+with activate(deadline.child(1200, name="cpu")) as budget:
+    data = module.run(deadline=budget)
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+
+class DeadlineExceeded(Exception):
+    """时间预算已用尽，未发出新的请求"""
+
+
+class Deadline:
+    """基于单调时钟的截止时间（seconds 为 None 表示不限时）"""
+
+    def __init__(self, seconds: Optional[float] = None, reserve: float = 0.0, name: str = "run",
+                 parent: Optional['Deadline'] = None):
+        """
+        Args:
+            seconds: 从现在起的预算秒数，None 表示不限时（但不超过 parent）
+            reserve: 预留秒数，剩余时间不足该值时视为预算即将用尽，不再发起新请求
+            name: 名称（用于日志）
+            parent: 上级预算，子预算的截止时间不晚于上级
+        """
+        self.name = name
+        self.reserve = reserve
+        self.parent = parent
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        if parent is not None and parent.expires_at is not None:
+            self.expires_at = parent.expires_at if self.expires_at is None else min(self.expires_at, parent.expires_at)
+        self.exhausted = False
+
+    def remaining(self) -> float:
+        """剩余秒数（不限时为 inf）"""
+        if self.expires_at is None:
+            return float('inf')
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def low(self) -> bool:
+        """剩余时间不足预留时间：不应再发起新的请求"""
+        return self.remaining() <= self.reserve
+
+    def timeout(self, default: float) -> float:
+        """单个请求的超时：不超过默认值，也不超过预留之外的剩余时间"""
+        return max(0.1, min(default, self.remaining() - self.reserve))
+
+    def child(self, seconds: Optional[float] = None, name: Optional[str] = None) -> 'Deadline':
+        """分出一个子预算（继承预留时间，截止时间不晚于本预算）"""
+        return Deadline(seconds, reserve=self.reserve, name=name or self.name, parent=self)
+
+    def mark_exhausted(self) -> None:
+        """记录预算曾经不足（上级预算同样标记）"""
+        deadline = self
+        while deadline is not None:
+            deadline.exhausted = True
+            deadline = deadline.parent
+
+    def check(self, what: str = "") -> None:
+        """
+        预算即将用尽时抛出 DeadlineExceeded 并标记 exhausted
+
+        Args:
+            what: 被放弃的操作（用于异常消息）
+        """
+        if self.low():
+            self.mark_exhausted()
+            raise DeadlineExceeded(f"{self.name} 时间预算即将用尽（剩余 {self.remaining():.0f}s），"
+                                   f"跳过{what or '新请求'}")
+
+    def __repr__(self) -> str:
+        remaining = self.remaining()
+        return f"Deadline({self.name!r}, remaining={'∞' if remaining == float('inf') else f'{remaining:.0f}s'})"
+
+
+# 当前生效的预算栈（进程内共享：线程池中的采集线程同样受限）
+_active: List[Deadline] = []
+_active_lock = threading.Lock()
+
+
+def current_deadline() -> Optional[Deadline]:
+    """当前生效的预算（最内层 activate 的预算），没有时返回 None"""
+    with _active_lock:
+        return _active[-1] if _active else None
+
+
+@contextmanager
+def activate(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """在 with 块内把 deadline 设为当前预算（None 时不改变）"""
+    if deadline is None:
+        yield None
+        return
+    with _active_lock:
+        _active.append(deadline)
+    try:
+        yield deadline
+    finally:
+        with _active_lock:
+            _active.remove(deadline)
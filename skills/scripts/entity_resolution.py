@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+跨数据源的硬件型号实体识别
+TechPowerUp、Wikipedia、PassMark、GitHub/Intel 数据集和 Ryzen 脚本各自使用不同的 ID
+（generate_id 的 md5、cpu-{md5(model)}、amd-{md5(section-model)}），只按 ID 去重无法
+合并同一型号。本模块：
+1. 规范化型号名称（去掉 ®/™、Processor、厂商前缀、"@ 3.60GHz" 等后缀，统一大小写和分隔符）
+2. 按 (品牌, 主型号数字的前两位) 分块，块内逐对校验；大块使用 MinHash/LSH 生成候选对
+3. 用并查集合并匹配，生成稳定的规范 ID，并持久化 ID 映射以保证多次运行结果一致
+
+使用方法：
+python entity_resolution.py output/web_cpu_data_raw.json output/github_cpu_data.json -o output/cpu_merged.json
+"""
+
+import re
+import json
+import zlib
+import hashlib
+import argparse
+from collections import defaultdict
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+from config import ENTITY_RESOLUTION_CONFIG
+
+
+_TRADEMARKS = re.compile(r'[®™©]|\((?:r|tm|c)\)', re.IGNORECASE)
+_CLOCK_SUFFIX = re.compile(r'\s*@.*$')                       # PassMark: "... @ 3.60GHz"
+_GRAPHICS_SUFFIX = re.compile(r'\s+w(?:ith|/)\s+((?:radeon|.*graphics).*)$', re.IGNORECASE)
+# 核显后缀中区分 SKU 的词："with Radeon RX Vega M GL" 与 "with Radeon Pro WX Vega M GL" 是不同型号
+_GRAPHICS_SKU_WORDS = {'pro', 'rx', 'wx', 'gl', 'gh'}
+_DIGITS = re.compile(r'\d+')
+_VERSION_TOKEN = re.compile(r'^v\d+$')                      # Xeon "v4"
+_TIER_DIGIT = re.compile(r'^\d$')                            # Ryzen 7 / Pentium 4 的档次数字
+_GLUED_FAMILY = re.compile(r'\bcore(?=\d)', re.IGNORECASE)   # "Core2 Duo" -> "Core 2 Duo"
+_CORE_COUNT = re.compile(r'\b\d+[- ]core\b', re.IGNORECASE)   # "6-Core"
+_BRACKETS = re.compile(r'\[.*?\]|\((?!\d)[^)]*\)')            # 引用标记 [1]、"(Alder Lake)"
+_SEPARATORS = re.compile(r'[\s\-_/,]+')
+# "4790 K" -> "4790k"，"7950X 3D" -> "7950x3d"
+_DETACHED_SUFFIX = re.compile(r'(\d[a-z]*) (3d|[a-z]{1,2})(?= |$)')
+_ROMAN_GENERATIONS = {'ii', 'iii', 'iv'}                     # Pentium II / III
+
+# 规范化时直接去掉的词（厂商前缀和不区分型号的描述词）
+NOISE_WORDS = {
+    'intel', 'amd', 'apple', 'qualcomm', 'mediatek', 'processor', 'processors', 'cpu',
+    'desktop', 'boxed', 'box', 'tray', 'oem', 'core', 'series', 'unlocked'
+}
+
+# 区分不同 SKU 的词：两条记录中这些词必须完全一致才可能是同一型号
+DISCRIMINATIVE_WORDS = {
+    'pro', 'mobile', 'extreme', 'lv', 'ulv', 'phi', 'ultra', 'duo', 'quad', 'solo',
+    'gold', 'silver', 'bronze', 'platinum', 'xeon', 'pentium', 'celeron', 'athlon', 'rx', 'wx',
+    'ryzen', 'threadripper', 'epyc', 'atom', 'itanium', 'phenom', 'opteron', 'sempron'
+}
+
+BRAND_KEYWORDS = {
+    'intel': ('intel', 'core', 'xeon', 'pentium', 'celeron', 'atom', 'itanium'),
+    'amd': ('amd', 'ryzen', 'athlon', 'threadripper', 'epyc', 'phenom', 'opteron', 'sempron', 'turion'),
+    'apple': ('apple',),
+    'qualcomm': ('qualcomm', 'snapdragon'),
+    'mediatek': ('mediatek', 'dimensity', 'helio')
+}
+
+# Mersenne 素数 2^31-1：a*h (h < 2^32) 不会超出 uint64
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+def _graphics_suffix(match: 're.Match') -> str:
+    """去掉通用的核显后缀（"with Radeon Graphics"），保留含 SKU 区分词的核显型号"""
+    words = _SEPARATORS.split(match.group(1).lower())
+    if _GRAPHICS_SKU_WORDS.intersection(words):
+        return ' ' + ' '.join(w for w in words if w and w != 'graphics')
+    return ''
+
+
+def canonicalize_model(model: Any) -> str:
+    """
+    规范化型号名称
+
+    Args:
+        model: 原始型号，如 "Intel® Core™ i9-14900K Processor @ 3.20GHz"
+
+    Returns:
+        规范化字符串，如 "i9 14900k"
+    """
+    if not isinstance(model, str):
+        return ''
+    text = _TRADEMARKS.sub(' ', model)
+    text = _GLUED_FAMILY.sub('core ', text)
+    text = _CLOCK_SUFFIX.sub('', text)
+    text = _GRAPHICS_SUFFIX.sub(_graphics_suffix, text)
+    text = _CORE_COUNT.sub(' ', text)
+    text = _BRACKETS.sub(' ', text)
+    tokens = [t for t in _SEPARATORS.split(text.lower()) if t and t not in NOISE_WORDS]
+    return _DETACHED_SUFFIX.sub(r'\1\2', ' '.join(tokens))
+
+
+def canonicalize_brand(brand: Any, model: Any = None) -> str:
+    """规范化品牌；缺失或不在已知列表中时根据型号关键词推断"""
+    text = brand.strip().lower() if isinstance(brand, str) else ''
+    if text in BRAND_KEYWORDS:
+        return text
+    # 按词匹配，避免 "8-Core" 中的 core 被当成 Intel 关键词
+    haystack = _CORE_COUNT.sub(' ', _TRADEMARKS.sub(' ', f"{text} {model or ''}"))
+    tokens = set(_SEPARATORS.split(haystack.lower()))
+    for name, keywords in BRAND_KEYWORDS.items():
+        if tokens.intersection(keywords):
+            return name
+    return text
+
+
+def model_tokens(canonical: str) -> Tuple[str, ...]:
+    """型号中所有含数字的词和代数罗马数字（排序后），如 "xeon e5 2690 v4" -> ("2690", "e5", "v4")"""
+    return tuple(sorted(t for t in canonical.split() if t in _ROMAN_GENERATIONS or any(c.isdigit() for c in t)))
+
+
+def block_number(canonical: str) -> str:
+    """
+    分块用的主型号数字：型号中最长数字串的前两位，如 "i9 14900k" -> "14"、"xeon e5 2690 v4" -> "26"
+
+    同一代的不同写法（带或不带系列号、后缀）落在同一块；没有数字时返回空字符串（不参与分块）
+    """
+    runs = [run for token in canonical.split() if not _VERSION_TOKEN.match(token)
+            for run in _DIGITS.findall(token)]
+    return max(runs, key=len)[:2] if runs else ''
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    compact = text.replace(' ', '')
+    if len(compact) <= size:
+        return {compact}
+    return {compact[i:i + size] for i in range(len(compact) - size + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class UnionFind:
+    """并查集（路径压缩 + 按大小合并）"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+
+class MinHashLSH:
+    """MinHash 签名 + 分段 LSH，用于在大分块中生成近似重复候选对"""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if not HAS_NUMPY:
+            raise ImportError("MinHash/LSH 需要 numpy，请先安装: pip install numpy")
+        if num_perm % bands:
+            raise ValueError("num_perm 必须是 bands 的整数倍")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+
+    def signature(self, shingles: Iterable[str]):
+        """计算 MinHash 签名（shingle 用 crc32 哈希，跨进程稳定）"""
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64)
+        if not len(hashes):
+            hashes = np.zeros(1, dtype=np.uint64)
+        return ((self._a * hashes + self._b) % _MERSENNE_PRIME).min(axis=1)
+
+    def candidate_pairs(self, shingle_sets: Sequence[set]) -> set:
+        """返回至少在一个 band 上签名相同的 (i, j) 对"""
+        buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        for index, shingles in enumerate(shingle_sets):
+            sig = self.signature(shingles)
+            for band in range(self.bands):
+                chunk = sig[band * self.rows:(band + 1) * self.rows]
+                buckets[(band, chunk.tobytes())].append(index)
+        pairs = set()
+        for members in buckets.values():
+            if len(members) > 1:
+                pairs.update(combinations(members, 2))
+        return pairs
+
+
+class Resolution:
+    """实体识别结果"""
+
+    def __init__(self, clusters: List[List[int]], canonical_ids: List[str], id_map: Dict[str, str]):
+        self.clusters = clusters              # 每个实体包含的记录下标
+        self.canonical_ids = canonical_ids    # 每条记录对应的规范 ID
+        self.id_map = id_map                  # "品牌|规范型号" -> 规范 ID
+
+    @property
+    def duplicates(self) -> int:
+        return len(self.canonical_ids) - len(self.clusters)
+
+
+class EntityResolver:
+    """
+    基于分块 + MinHash/LSH + 并查集的实体识别
+
+    - 规范化名称完全相同的记录直接合并；规范化后为空的名称（如 "Intel Core Processor"）只按原文合并
+    - (品牌, 主型号数字前两位) 分块：小块逐对校验，大块（超过 lsh_min_block）只校验 LSH 候选对
+    - 校验条件：区分词（PRO、RX、Mobile、Extreme 等）和代数（v4、III）一致，含数字的型号词一致
+      （忽略单独的一位数档次词，"ryzen 7 7700x" 与 "ryzen 7700x" 可以匹配，"14900k" 与 "14900kf" 不匹配），
+      名称 3-gram Jaccard 不低于 threshold
+    """
+
+    def __init__(self, category: str = "cpu", threshold: Optional[float] = None,
+                 num_perm: Optional[int] = None, bands: Optional[int] = None,
+                 lsh_min_block: Optional[int] = None, id_map: Optional[Dict[str, str]] = None):
+        config = ENTITY_RESOLUTION_CONFIG
+        self.category = category
+        self.threshold = config["threshold"] if threshold is None else threshold
+        self.num_perm = num_perm or config["num_perm"]
+        self.bands = bands or config["bands"]
+        self.lsh_min_block = lsh_min_block or config["lsh_min_block"]
+        self.id_map: Dict[str, str] = dict(id_map or {})
+
+    def entity_key(self, record: Dict[str, Any]) -> str:
+        """记录的实体键："品牌|规范型号" """
+        model = record.get('model') or record.get('name')
+        brand = canonicalize_brand(record.get('brand'), model)
+        canonical = canonicalize_model(model)
+        if not canonical:
+            # 名称只剩厂商前缀和描述词：按原文区分，不与其他同样为空的名称合并
+            raw = ' '.join(_SEPARATORS.split(_TRADEMARKS.sub(' ', str(model or '')).lower())).strip()
+            return f"{brand}|#{raw}"
+        return f"{brand}|{canonical}"
+
+    def make_id(self, key: str) -> str:
+        """由实体键生成规范 ID（与 generate_id 相同的 类别-8位md5 形式）"""
+        return f"{self.category}-{hashlib.md5(key.encode('utf-8')).hexdigest()[:8]}"
+
+    def _is_match(self, a: tuple, b: tuple) -> bool:
+        words_a, versions_a, numbers_a, shingles_a = a
+        words_b, versions_b, numbers_b, shingles_b = b
+        if words_a != words_b or versions_a != versions_b:
+            return False
+        if numbers_a != numbers_b:
+            # 一位数的档次词（Ryzen 7、Pentium 4）可能只在一个数据源中出现，去掉后再比较；
+            # 去掉后为空（如 "pentium 4" 与 "pentium 3"）时仍要求完全一致
+            loose_a = frozenset(t for t in numbers_a if not _TIER_DIGIT.match(t))
+            loose_b = frozenset(t for t in numbers_b if not _TIER_DIGIT.match(t))
+            if not loose_a or loose_a != loose_b:
+                return False
+        return _jaccard(shingles_a, shingles_b) >= self.threshold
+
+    def resolve(self, records: Sequence[Dict[str, Any]]) -> Resolution:
+        """
+        对记录列表做实体识别
+
+        Args:
+            records: 各数据源的记录（需包含 model，可选 brand）
+
+        Returns:
+            Resolution 对象
+        """
+        # 1. 按实体键去重：相同键的记录必属同一实体，后续只处理唯一键
+        keys = [self.entity_key(record) for record in records]
+        key_index: Dict[str, int] = {}
+        for key in keys:
+            key_index.setdefault(key, len(key_index))
+        unique_keys = list(key_index)
+
+        # 2. 分块：品牌 + 主型号数字前两位（同一代的型号进入同一块，大块由 LSH 生成候选对）
+        features = []
+        blocks: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for index, key in enumerate(unique_keys):
+            brand, canonical = key.split('|', 1)
+            tokens = model_tokens(canonical)
+            words = frozenset(canonical.split()) & DISCRIMINATIVE_WORDS
+            versions = frozenset(t for t in tokens if t in _ROMAN_GENERATIONS or _VERSION_TOKEN.match(t))
+            features.append((words, versions, frozenset(tokens) - versions, _shingles(canonical)))
+            number = block_number(canonical) if not canonical.startswith('#') else ''
+            if number:
+                blocks[(brand, number)].append(index)
+
+        union_find = UnionFind(len(unique_keys))
+        lsh = None
+        for members in blocks.values():
+            if len(members) < 2:
+                continue
+            if len(members) <= self.lsh_min_block or not HAS_NUMPY:
+                pairs = combinations(members, 2)
+            else:
+                if lsh is None:
+                    lsh = MinHashLSH(self.num_perm, self.bands)
+                local = lsh.candidate_pairs([features[i][3] for i in members])
+                pairs = ((members[i], members[j]) for i, j in local)
+            for i, j in pairs:
+                if self._is_match(features[i], features[j]):
+                    union_find.union(i, j)
+
+        # 3. 分配规范 ID：优先沿用历史映射，否则取实体内最小键生成
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for index in range(len(unique_keys)):
+            groups[union_find.find(index)].append(index)
+
+        key_ids: Dict[str, str] = {}
+        for members in groups.values():
+            member_keys = sorted(unique_keys[i] for i in members)
+            known = sorted({self.id_map[k] for k in member_keys if k in self.id_map})
+            canonical_id = known[0] if known else self.make_id(member_keys[0])
+            for key in member_keys:
+                key_ids[key] = canonical_id
+                self.id_map[key] = canonical_id
+
+        canonical_ids = [key_ids[key] for key in keys]
+        clusters_by_id: Dict[str, List[int]] = defaultdict(list)
+        for index, canonical_id in enumerate(canonical_ids):
+            clusters_by_id[canonical_id].append(index)
+        return Resolution(list(clusters_by_id.values()), canonical_ids, dict(self.id_map))
+
+
+def merge_records(records: Sequence[Dict[str, Any]], resolution: Resolution,
+                  assign_ids: bool = True) -> List[Dict[str, Any]]:
+    """
+    按实体合并记录：以实体中第一条记录为准，缺失字段由后续记录补全
+
+    Args:
+        records: 原始记录（顺序即数据源优先级）
+        resolution: resolve() 的结果
+        assign_ids: 是否将 id 替换为规范 ID
+
+    Returns:
+        合并后的记录列表（保持首次出现的顺序）
+    """
+    merged = []
+    for members in resolution.clusters:
+        item = dict(records[members[0]])
+        for index in members[1:]:
+            for field, value in records[index].items():
+                if item.get(field) in (None, '', 'N/A') and value not in (None, '', 'N/A'):
+                    item[field] = value
+        if assign_ids:
+            item['id'] = resolution.canonical_ids[members[0]]
+        merged.append(item)
+    return merged
+
+
+def id_map_path(category: str) -> Path:
+    """规范 ID 映射文件路径"""
+    return Path(ENTITY_RESOLUTION_CONFIG["id_map_dir"]) / f"{category}_entity_ids.json"
+
+
+def load_id_map(category: str) -> Dict[str, str]:
+    """加载历史 ID 映射，不存在时返回空字典"""
+    path = id_map_path(category)
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_id_map(category: str, id_map: Dict[str, str]) -> Path:
+    """保存 ID 映射"""
+    path = id_map_path(category)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(id_map, f, ensure_ascii=False, indent=1, sort_keys=True)
+    return path
+
+
+def deduplicate_records(records: Sequence[Dict[str, Any]], category: str = "cpu") -> List[Dict[str, Any]]:
+    """
+    采集器内部使用的去重：合并近似重复的型号，保留首条记录的 id
+
+    Args:
+        records: 数据列表
+        category: 数据类型
+
+    Returns:
+        去重后的数据列表
+    """
+    resolution = EntityResolver(category).resolve(records)
+    return merge_records(records, resolution, assign_ids=False)
+
+
+def _load_records(path: Path) -> List[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        # Ryzen 脚本输出 {"all_cpus": [...]}，其他脚本可能输出 {"data": [...]}
+        for field in ('all_cpus', 'data', 'items'):
+            if isinstance(data.get(field), list):
+                return data[field]
+        return []
+    return data
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='跨数据源合并同一型号的记录')
+    parser.add_argument('inputs', nargs='+', help='各数据源的 JSON 文件（按优先级排列）')
+    parser.add_argument('-o', '--output', help='合并结果输出路径')
+    parser.add_argument('--category', default='cpu', help='数据类型（默认 cpu）')
+    parser.add_argument('--threshold', type=float, help='名称相似度阈值（默认读取配置）')
+    args = parser.parse_args()
+
+    records = []
+    for path in args.inputs:
+        items = _load_records(Path(path))
+        print(f"📂 {path}: {len(items)} 条")
+        records.extend(items)
+
+    resolver = EntityResolver(args.category, threshold=args.threshold, id_map=load_id_map(args.category))
+    resolution = resolver.resolve(records)
+    merged = merge_records(records, resolution)
+    map_file = save_id_map(args.category, resolution.id_map)
+
+    print(f"🔗 {len(records)} 条记录 -> {len(merged)} 个实体（合并 {resolution.duplicates} 条重复）")
+    print(f"💾 ID 映射已保存: {map_file}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2)
+        print(f"💾 合并结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
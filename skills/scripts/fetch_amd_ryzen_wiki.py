@@ -6,44 +6,43 @@ AMD Ryzen 处理器数据抓取脚本
 数据源: https://en.wikipedia.org/wiki/List_of_AMD_Ryzen_processors
 """
 
-import pandas as pd
 import json
 import os
-import ssl
-import urllib.request
-from io import StringIO
 from datetime import datetime
 from typing import List, Dict, Any
 
+from http_transport import get_transport
+from wikitable import WikiTable, extract_wikitables
 
-def fetch_ryzen_tables(url: str) -> List[pd.DataFrame]:
+
+# 常见的处理器表格列名关键词
+PROCESSOR_KEYWORDS = ['model', 'core', 'thread', 'frequency', 'tdp', 'cache', 'socket']
+
+
+def fetch_ryzen_tables(url: str) -> List[WikiTable]:
     """
-    从维基百科获取所有表格
+    从维基百科获取处理器表格
     
     Args:
         url: 维基百科页面URL
         
     Returns:
-        表格列表
+        表头包含处理器相关列名的 wikitable 列表
     """
     print(f"📡 正在获取数据: {url}")
     try:
-        # 禁用 SSL 证书验证（仅用于开发环境）
-        ssl._create_default_https_context = ssl._create_unverified_context
-        
         # 设置 User-Agent 避免被维基百科拒绝
         headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        req = urllib.request.Request(url, headers=headers)
+        # 先获取HTML内容（共享传输层负责连接复用、压缩解码和重试）
+        response = get_transport().get(url, headers=headers)
+        response.raise_for_status()
+        html_content = response.text
         
-        # 先获取HTML内容
-        with urllib.request.urlopen(req) as response:
-            html_content = response.read().decode('utf-8')
-        
-        # 从HTML内容中解析表格
-        tables = pd.read_html(StringIO(html_content))
+        # 只为表头匹配的表格构建数据行
+        tables = extract_wikitables(html_content, signature=PROCESSOR_KEYWORDS)
         print(f"✅ 成功获取 {len(tables)} 个表格")
         return tables
     except Exception as e:
@@ -51,7 +50,7 @@ def fetch_ryzen_tables(url: str) -> List[pd.DataFrame]:
         return []
 
 
-def analyze_tables(tables: List[pd.DataFrame]) -> None:
+def analyze_tables(tables: List[WikiTable]) -> None:
     """
     分析表格结构，帮助识别目标表格
     
@@ -62,19 +61,18 @@ def analyze_tables(tables: List[pd.DataFrame]) -> None:
     print("📊 表格结构分析")
     print("="*80)
     
-    for idx, table in enumerate(tables):
-        print(f"\n表格 #{idx}")
-        print(f"  行数: {len(table)}")
-        print(f"  列数: {len(table.columns)}")
-        print(f"  列名: {list(table.columns[:5])}{'...' if len(table.columns) > 5 else ''}")
+    for table in tables:
+        print(f"\n表格 #{table.index}")
+        print(f"  行数: {len(table.rows)}")
+        print(f"  列数: {table.width}")
+        print(f"  列名: {table.headers[:5]}{'...' if len(table.headers) > 5 else ''}")
         
         # 显示前2行数据示例
-        if len(table) > 0:
-            print(f"  示例数据:")
-            print(table.head(2).to_string(max_cols=5, index=False))
+        for row in table.rows[:2]:
+            print(f"  示例数据: {row[:5]}")
 
 
-def extract_ryzen_data(tables: List[pd.DataFrame]) -> List[Dict[str, Any]]:
+def extract_ryzen_data(tables: List[WikiTable]) -> List[Dict[str, Any]]:
     """
     从表格中提取 Ryzen 处理器数据
     
@@ -86,52 +84,22 @@ def extract_ryzen_data(tables: List[pd.DataFrame]) -> List[Dict[str, Any]]:
     """
     all_processors = []
     
-    for idx, table in enumerate(tables):
+    for table in tables:
         # 跳过太小的表格（可能不是处理器数据）
-        if len(table) < 3 or len(table.columns) < 5:
+        if len(table.rows) < 3 or table.width < 5:
             continue
         
-        # 检查是否包含处理器相关列
-        columns_lower = [str(col).lower() for col in table.columns]
-        
-        # 常见的处理器表格列名关键词
-        keywords = ['model', 'core', 'thread', 'frequency', 'tdp', 'cache', 'socket']
-        has_keywords = any(keyword in ' '.join(columns_lower) for keyword in keywords)
-        
-        if not has_keywords:
-            continue
+        print(f"\n🔍 处理表格 #{table.index} (共 {len(table.rows)} 行)")
         
-        print(f"\n🔍 处理表格 #{idx} (共 {len(table)} 行)")
+        # 多行表头已按列合并为 "上级 - 下级" 形式，空单元格记为 None
+        records = table.records()
+        for record in records:
+            all_processors.append({
+                'source_table': table.index,
+                'data': {k: (v if v != '' else None) for k, v in record.items()}
+            })
         
-        # 转换为字典列表
-        try:
-            records = table.to_dict('records')
-            
-            for record in records:
-                # 清理数据：移除 NaN 值，并将元组键转换为字符串
-                cleaned_record = {}
-                for k, v in record.items():
-                    # 将元组键转换为字符串
-                    if isinstance(k, tuple):
-                        key = ' - '.join(str(x) for x in k if str(x).strip())
-                    else:
-                        key = str(k)
-                    
-                    # 移除 NaN 值
-                    if pd.notna(v):
-                        cleaned_record[key] = v
-                    else:
-                        cleaned_record[key] = None
-                
-                all_processors.append({
-                    'source_table': idx,
-                    'data': cleaned_record
-                })
-            
-            print(f"  ✅ 提取 {len(records)} 条记录")
-            
-        except Exception as e:
-            print(f"  ⚠️  处理失败: {e}")
+        print(f"  ✅ 提取 {len(records)} 条记录")
     
     return all_processors
 
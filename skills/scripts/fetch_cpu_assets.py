@@ -11,6 +11,7 @@ CPU 徽标资源下载脚本
 
 使用方法：
 python fetch_cpu_assets.py
+python fetch_cpu_assets.py --resume   # 中断后继续，跳过已完成的系列
 
 依赖库：
 pip install --trusted-host pypi.tuna.tsinghua.edu.cn --trusted-host files.pythonhosted.org icrawler Pillow
@@ -19,10 +20,13 @@ pip install --trusted-host pypi.tuna.tsinghua.edu.cn --trusted-host files.python
 import os
 import sys
 import time
+import argparse
 from typing import Dict, List
 from PIL import Image
 from icrawler.builtin import GoogleImageCrawler, BingImageCrawler
 
+from crawl_journal import CrawlJournal
+
 
 # 目标清单：映射我们的代码到搜索关键词
 TARGETS = {
@@ -75,6 +79,7 @@ TARGETS = {
 DOWNLOAD_COUNT = 5  # 每个型号下载前 5 张图片（增加可选数量）
 OUTPUT_DIR = "temp_assets"  # 输出目录
 SEARCH_ENGINE = "google"  # 默认搜索引擎：google 或 bing
+JOURNAL_FILE = os.path.join(OUTPUT_DIR, ".fetch_journal.jsonl")  # 断点续传日志
 
 
 def ensure_directory(path: str) -> None:
@@ -203,9 +208,12 @@ def get_brand_color(series_code: str) -> str:
     return '#808080'  # 默认灰色
 
 
-def fetch_cpu_assets() -> None:
+def fetch_cpu_assets(resume: bool = False) -> None:
     """
     主函数：下载并处理 CPU 徽标图片
+
+    Args:
+        resume: 是否从断点续传日志继续，跳过已完成的系列
     """
     print("开始下载 CPU 徽标图片...")
     print(f"目标型号数量: {len(TARGETS)}")
@@ -215,9 +223,15 @@ def fetch_cpu_assets() -> None:
     
     # 确保输出目录存在
     ensure_directory(OUTPUT_DIR)
+    journal = CrawlJournal(JOURNAL_FILE, resume=resume)
+    if journal.completed:
+        print(f"从断点继续：已完成 {journal.completed} 个系列")
     
     # 遍历目标清单
     for code, keyword in TARGETS.items():
+        if journal.is_done(code):
+            print(f"\n跳过已完成: {code}")
+            continue
         print(f"\n处理: {code}")
         print(f"搜索关键词: {keyword}")
         
@@ -324,8 +338,10 @@ def fetch_cpu_assets() -> None:
                 os.remove(input_path)
                 print(f"删除原文件: {file_name}")
         
+        journal.record(code, {"downloaded": downloaded_count}, kind="series")
         print(f"完成: {code}")
     
+    journal.finish()
     print("=" * 60)
     print("所有型号处理完成！")
     print(f"\n后续操作建议：")
@@ -340,10 +356,14 @@ def main() -> None:
     """
     主入口
     """
+    parser = argparse.ArgumentParser(description="下载并处理 CPU 徽标图片")
+    parser.add_argument("--resume", action="store_true", help="从断点续传日志继续，跳过已完成的系列")
+    args = parser.parse_args()
+
     try:
-        fetch_cpu_assets()
+        fetch_cpu_assets(resume=args.resume)
     except KeyboardInterrupt:
-        print("\n用户中断操作")
+        print("\n用户中断操作，使用 --resume 可从断点继续")
         sys.exit(1)
     except Exception as e:
         print(f"发生错误: {e}")
@@ -17,11 +17,12 @@ pip install --trusted-host pypi.tuna.tsinghua.edu.cn --trusted-host files.python
 
 import os
 import sys
-import requests
 from typing import Dict, List
 from PIL import Image
 from io import BytesIO
 
+from http_transport import get_transport
+
 
 # 直接图片 URL 列表 (从可靠来源)
 CPU_ICON_URLS = {
@@ -88,14 +89,8 @@ def download_image(url: str, save_path: str, timeout: int = 30) -> bool:
             "Accept": "image/webp,image/apng,image/*,*/*;q=0.8",
         }
         
-        response = requests.get(url, headers=headers, timeout=timeout, stream=True)
-        response.raise_for_status()
-        
-        with open(save_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-        
+        # 共享连接池：同一主机的多张图片复用连接
+        get_transport().download(url, save_path, headers=headers, timeout=timeout)
         return True
     except Exception as e:
         print(f"  ⚠️  下载失败: {e}")
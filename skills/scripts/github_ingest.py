@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+GitHub/Intel CPU 数据集流式入库
+逐条读取 output/github_cpu_data.json（json_stream，内存占用与文件大小无关），
+边读边标准化，再分批 upsert 到本地目录库（catalog_db）：
+- "N/A"、"Name Unknown" 等占位值转为 null
+- 季度日期 "Q2'22" -> "2022-04-01"（releaseDatePrecision = quarter）
+- 缓存 "16MB" + cacheInfo "Intel Smart Cache" -> cache 16.0、cacheType "Intel Smart Cache"
+- 核显名称 -> integratedGraphics true + graphicsModel
+
+使用方法：
+python github_ingest.py                             # 读取配置中的 GitHub 数据文件
+python github_ingest.py output/github_cpu_data.json --batch 1000
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+from catalog_db import CatalogDB
+from config import CATALOG_DB_CONFIG, CPU_SOURCE_CONFIG
+from cpu_sources import finalize_record
+from json_stream import detect_array_key, iter_json_items
+
+
+# Intel ARK 导出中表示“无此项”的写法（不区分大小写）
+_NULL_TOKENS = {'', 'n/a', 'na', 'none', 'null', '-', 'name unknown'}
+
+
+def _clean(value: Any) -> Any:
+    """占位字符串转为 None，其余去掉首尾空白"""
+    if isinstance(value, str):
+        value = value.strip()
+        return None if value.lower() in _NULL_TOKENS else value
+    return value
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_github_record(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    标准化一条 GitHub/Intel 数据集记录
+
+    Args:
+        raw: 原始记录
+
+    Returns:
+        前端字段记录；没有型号时返回 None
+    """
+    item = {key: _clean(value) for key, value in raw.items()}
+    if not item.get('model'):
+        return None
+
+    # 核显：有名称时记录型号；"Name Unknown" 表示有核显但型号未知；"N/A" 表示没有核显
+    graphics = raw.get('integratedGraphics')
+    if item.get('integratedGraphics'):
+        item['graphicsModel'] = item['integratedGraphics']
+        item['integratedGraphics'] = True
+    elif isinstance(graphics, str) and graphics.strip().lower() == 'name unknown':
+        item['integratedGraphics'] = True
+    elif isinstance(graphics, str) and graphics.strip():
+        item['integratedGraphics'] = False
+
+    # 缓存：cache 为容量（"16MB"），cacheInfo 为缓存类型
+    cache_type = item.pop('cacheInfo', None)
+    if cache_type:
+        item['cacheType'] = cache_type
+
+    if item.get('maxMemoryChannels') is not None:
+        item['maxMemoryChannels'] = _to_int(item['maxMemoryChannels'])
+
+    # 频率、缓存容量、季度日期等通用字段交给 cpu_sources 的统一标准化
+    record = finalize_record(item)
+    return record if record.get('id') else None
+
+
+def iter_normalized(path: Union[str, Path], stats: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    流式读取并标准化数据集
+
+    Args:
+        path: 数据文件路径（顶层数组或 {"all_cpus": [...]}）
+        stats: 可选的计数字典，累计 read / skipped
+
+    Yields:
+        标准化后的记录
+    """
+    stats = stats if stats is not None else {}
+    for raw in iter_json_items(path, detect_array_key(path)):
+        stats['read'] = stats.get('read', 0) + 1
+        record = normalize_github_record(raw) if isinstance(raw, dict) else None
+        if record is None:
+            stats['skipped'] = stats.get('skipped', 0) + 1
+            continue
+        yield record
+
+
+def ingest(path: Union[str, Path], catalog: CatalogDB, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    将数据集流式写入目录库的 cpu 类别
+
+    Args:
+        path: 数据文件路径
+        catalog: 目录库
+        batch_size: 每批提交的记录数
+
+    Returns:
+        {"read", "written", "skipped", "seconds"}
+    """
+    stats = {'read': 0, 'skipped': 0}
+    start = time.perf_counter()
+    stats['written'] = catalog.upsert_many('cpu', iter_normalized(path, stats), batch_size)
+    stats['seconds'] = round(time.perf_counter() - start, 2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GitHub/Intel CPU 数据集流式入库")
+    parser.add_argument('path', nargs='?', default=str(CPU_SOURCE_CONFIG["files"]["github"]),
+                        help='数据文件路径')
+    parser.add_argument('--db', help='目录库路径（默认读取配置）')
+    parser.add_argument('--batch', type=int, default=CATALOG_DB_CONFIG["batch_size"], help='每批提交的记录数')
+    args = parser.parse_args()
+
+    print(f"📥 流式读取: {args.path}")
+    with CatalogDB(args.db) as catalog:
+        stats = ingest(args.path, catalog, args.batch)
+        print(f"✅ 读取 {stats['read']} 条，写入 {stats['written']} 条，"
+              f"跳过 {stats['skipped']} 条，用时 {stats['seconds']}s")
+        print(f"🗂️  目录库: {catalog.path}（cpu 共 {catalog.counts().get('cpu', 0)} 条）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+HTTP 请求指标
+按主机统计各阶段耗时直方图（connect = DNS + TCP、tls、ttfb、total）、响应大小、状态码分布、
+错误与重试次数，以及我们自己主动等待的时间（politeness = 随机延迟 / 限速器排队，
+backoff = 重试前的退避）。对比网络耗时与主动等待，可以判断运行变慢是远端主机造成的
+还是自己的延迟造成的。只依赖标准库。
+
+使用方法：
+metrics = get_transport().metrics
+metrics.record_sleep(url, 1.5)           # 记录一次礼貌等待
+print(metrics.format_table())
+metrics.export("logs/http_metrics.json")
+
+python http_metrics.py logs/http_metrics.json   # 以表格显示导出的指标
+"""
+
+import json
+import threading
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from rate_limiter import host_of
+
+# 耗时直方图的桶上界（秒）与响应大小直方图的桶上界（字节）
+TIME_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BOUNDS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+PHASES = ('connect', 'tls', 'ttfb', 'total')
+
+
+class Histogram:
+    """固定桶的直方图，记录次数、总和、最值，分位数按桶上界估计"""
+
+    __slots__ = ('bounds', 'buckets', 'count', 'total', 'min', 'max')
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)   # 最后一个桶收集超过最大上界的值
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float) -> None:
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """第 q 分位数（0-100）所在桶的上界，落在最后一个桶时返回最大值"""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count, "sum": self.total, "min": self.min, "max": self.max,
+            "p50": self.percentile(50), "p90": self.percentile(90), "p99": self.percentile(99),
+            "bounds": list(self.bounds), "buckets": list(self.buckets)
+        }
+
+
+class _HostStats:
+    __slots__ = ('requests', 'errors', 'retries', 'status', 'phases', 'bytes', 'sleep')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = Counter()
+        self.retries = 0
+        self.status = Counter()
+        self.phases = {phase: Histogram(TIME_BOUNDS) for phase in PHASES}
+        self.bytes = Histogram(SIZE_BOUNDS)
+        self.sleep = Counter()
+
+
+class TransportMetrics:
+    """线程安全的按主机请求指标"""
+
+    def __init__(self):
+        self._hosts: Dict[str, _HostStats] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> _HostStats:
+        host = host_of(url)
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = self._hosts[host] = _HostStats()
+        return stats
+
+    def record_response(self, url: str, status: int, timings: Dict[str, float], size: Optional[int] = None) -> None:
+        """
+        记录一次收到响应的请求
+
+        Args:
+            url: 请求 URL
+            status: HTTP 状态码
+            timings: 阶段耗时（秒），键为 PHASES 中的阶段；复用连接时没有 connect/tls
+            size: 解压后的响应体字节数
+        """
+        with self._lock:
+            stats = self._host(url)
+            stats.requests += 1
+            stats.status[str(status)] += 1
+            for phase, seconds in timings.items():
+                if seconds is not None and phase in stats.phases:
+                    stats.phases[phase].add(seconds)
+            if size is not None:
+                stats.bytes.add(size)
+
+    def record_error(self, url: str, kind: str) -> None:
+        """记录一次没有收到响应的请求（kind: timeout / connection）"""
+        with self._lock:
+            stats = self._host(url)
+            stats.requests += 1
+            stats.errors[kind] += 1
+
+    def record_retry(self, url: str) -> None:
+        with self._lock:
+            self._host(url).retries += 1
+
+    def record_sleep(self, url: str, seconds: float, kind: str = 'politeness') -> None:
+        """记录主动等待的时间（kind: politeness / backoff）"""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._host(url).sleep[kind] += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+    def __bool__(self) -> bool:
+        return bool(self._hosts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """按主机导出全部指标"""
+        with self._lock:
+            return {
+                host: {
+                    "requests": stats.requests,
+                    "errors": dict(stats.errors),
+                    "retries": stats.retries,
+                    "status": dict(stats.status),
+                    "phases": {phase: hist.to_dict() for phase, hist in stats.phases.items()},
+                    "bytes": stats.bytes.to_dict(),
+                    "sleep": {kind: round(seconds, 3) for kind, seconds in stats.sleep.items()},
+                }
+                for host, stats in sorted(self._hosts.items())
+            }
+
+    def format_table(self) -> str:
+        return format_table(self.to_dict())
+
+    def export(self, path: Union[str, Path]) -> Path:
+        """把指标写为 JSON 文件"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"hosts": self.to_dict()}, f, ensure_ascii=False, indent=2)
+        return path
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return '-' if seconds is None else f"{seconds * 1000:.0f}"
+
+
+def format_table(hosts: Dict[str, Any]) -> str:
+    """
+    把 to_dict() 的结果格式化为表格：每个主机一行请求概况，随后是各阶段耗时分位数
+
+    Returns:
+        多行文本
+    """
+    if not hosts:
+        return "（没有 HTTP 请求）"
+    lines: List[str] = [
+        f"{'主机':<28}{'请求':>6}{'错误':>6}{'重试':>6}{'平均KB':>9}{'网络s':>9}{'礼貌等待s':>11}{'退避s':>8}  状态码"
+    ]
+    for host, stats in hosts.items():
+        total = stats["phases"]["total"]
+        mean_kb = stats["bytes"]["sum"] / stats["bytes"]["count"] / 1024 if stats["bytes"]["count"] else 0
+        status = ' '.join(f"{code}×{n}" for code, n in sorted(stats["status"].items()))
+        lines.append(
+            f"{host[:27]:<28}{stats['requests']:>6}{sum(stats['errors'].values()):>6}{stats['retries']:>6}"
+            f"{mean_kb:>9.1f}{total['sum']:>9.1f}{stats['sleep'].get('politeness', 0):>11.1f}"
+            f"{stats['sleep'].get('backoff', 0):>8.1f}  {status}"
+        )
+        for phase in PHASES:
+            hist = stats["phases"][phase]
+            if hist["count"]:
+                lines.append(f"    {phase:<8} n={hist['count']:<5} p50={_ms(hist['p50'])}ms "
+                             f"p90={_ms(hist['p90'])}ms p99={_ms(hist['p99'])}ms max={_ms(hist['max'])}ms")
+    return '\n'.join(lines)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="显示导出的 HTTP 请求指标")
+    parser.add_argument('path', help='http_metrics.json')
+    args = parser.parse_args()
+    with open(args.path, 'r', encoding='utf-8') as f:
+        print(format_table(json.load(f)["hosts"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""
+统一的 HTTP 传输层
+所有脚本通过同一个进程级 Transport 发起请求，共享：
+
+- 连接池与 keep-alive：同一主机的请求复用 TCP/TLS 连接，线程安全
+- HTTP/2：安装了 httpx 和 h2 时自动使用（pip install httpx[http2]），否则使用 requests
+- 压缩解码：gzip/deflate 总是支持，安装了 brotli 时才声明并解码 br，不会收到无法解压的内容
+- 重试策略：连接错误和 HTTP_CONFIG["retry"]["status"] 中的状态码按指数退避重试，遵守 Retry-After
+- 缓存钩子：传入实现 get(key) / set(key, response) 的对象，GET 请求命中时不访问网络
+- 请求指标：transport.metrics 按主机记录各阶段耗时直方图、响应大小、状态码、重试与退避等待
+  （见 http_metrics.py），运行结束时用 export_metrics() 导出
+- 熔断：默认 Transport 使用 circuit_breaker，主机连续失败后在冷却期内直接抛出 CircuitOpenError
+- 时间预算：传入或 activate() 生效的 Deadline 即将用尽时不再发请求（DeadlineExceeded），
+  超时和重试等待都不超过剩余时间
+
+使用方法：
+from http_transport import get_transport
+response = get_transport().get("https://en.wikipedia.org/wiki/Ryzen", timeout=30)
+response.raise_for_status()
+html = response.text
+
+get_transport().download(image_url, "temp_assets/i9.png")   # 流式下载到文件
+"""
+
+import re
+import time
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config import HTTP_CONFIG
+from circuit_breaker import CircuitBreaker, open_circuit_breaker
+from deadline import Deadline, current_deadline
+from http_metrics import TransportMetrics
+from rate_limiter import parse_retry_after
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+try:
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+try:
+    import brotli  # noqa: F401
+    HAS_BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        HAS_BROTLI = True
+    except ImportError:
+        HAS_BROTLI = False
+
+
+_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+
+class TransportError(Exception):
+    """请求失败（连接错误、超时或 raise_for_status 时的错误状态码）"""
+
+    def __init__(self, message: str, response: Optional['HttpResponse'] = None):
+        super().__init__(message)
+        self.response = response
+
+
+class TransportTimeout(TransportError):
+    """连接或读取超时"""
+
+
+class HTTPStatusError(TransportError):
+    """响应状态码为 4xx/5xx"""
+
+
+class CircuitOpenError(TransportError):
+    """主机熔断中，请求未发出"""
+
+
+class HttpResponse:
+    """与后端无关的响应（内容已完整读取并解压）"""
+
+    __slots__ = ('url', 'status_code', 'headers', 'content', 'http_version', 'elapsed', 'from_cache')
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes,
+                 http_version: str = 'HTTP/1.1', elapsed: float = 0.0):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.http_version = http_version
+        self.elapsed = elapsed
+        self.from_cache = False
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def encoding(self) -> str:
+        """Content-Type 中的 charset，其次是 HTML 中的 <meta charset>，都没有时按 UTF-8"""
+        match = re.search(r'charset=["\']?([\w-]+)', self.headers.get('Content-Type', ''), re.I)
+        if match:
+            return match.group(1)
+        match = _CHARSET.search(self.content[:2048])
+        return match.group(1).decode('ascii') if match else 'utf-8'
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.content.decode(self.encoding, errors='replace')
+        except LookupError:
+            return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise HTTPStatusError(f"HTTP {self.status_code}: {self.url}", response=self)
+
+
+# 当前线程正在发送的请求的阶段耗时（连接由 urllib3 在发送请求的线程中建立）
+_phase_times = threading.local()
+
+
+def _phase_timings() -> Optional[Dict[str, float]]:
+    return getattr(_phase_times, 'timings', None)
+
+
+class _ConnectTimingMixin:
+    """记录新建连接耗时（DNS 解析 + TCP 握手）"""
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            timings = _phase_timings()
+            if timings is not None:
+                timings['connect'] = time.perf_counter() - started
+
+
+class _TimedHTTPConnection(_ConnectTimingMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_ConnectTimingMixin, HTTPSConnection):
+    """TLS 握手耗时为 connect() 总耗时减去建立 TCP 连接的部分"""
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        timings = _phase_timings()
+        if timings is not None:
+            timings['tls'] = time.perf_counter() - started - timings.get('connect', 0.0)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """连接池使用带计时的连接类"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+class _RequestsBackend:
+    """requests + urllib3 连接池（HTTP/1.1 keep-alive）"""
+
+    http_version = 'HTTP/1.1'
+
+    def __init__(self, config: Dict[str, Any]):
+        self.session = requests.Session()
+        # 重试由 Transport 统一处理，适配器只负责连接池
+        adapter = _TimedAdapter(pool_connections=config["pool_connections"],
+                              pool_maxsize=config["pool_maxsize"], max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # 按请求传入 verify：会话级设置会被 REQUESTS_CA_BUNDLE 等环境变量覆盖
+        self.verify = config["verify_tls"]
+        self.session.headers.update({
+            'User-Agent': config["user_agent"],
+            # urllib3 能解码的编码（安装 brotli 后包含 br）
+            'Accept-Encoding': DEFAULT_ACCEPT_ENCODING,
+        })
+
+    def send(self, method: str, url: str, stream: bool = False, **kwargs):
+        """发送请求，返回 (原始响应, 阶段耗时)"""
+        timings = _phase_times.timings = {}
+        try:
+            raw = self.session.request(method, url, stream=stream, verify=self.verify, **kwargs)
+        except requests.exceptions.Timeout as e:
+            raise TransportTimeout(str(e)) from e
+        except requests.exceptions.RequestException as e:
+            raise TransportError(str(e)) from e
+        finally:
+            _phase_times.timings = None
+        # requests 的 elapsed 为发出请求到解析完响应头（含新建连接）
+        timings['ttfb'] = raw.elapsed.total_seconds()
+        return raw, timings
+
+    def to_response(self, raw, elapsed: float) -> HttpResponse:
+        try:
+            content = raw.content
+        except requests.exceptions.RequestException as e:
+            raise TransportError(str(e)) from e
+        return HttpResponse(raw.url, raw.status_code, raw.headers, content, self.http_version, elapsed)
+
+    def iter_bytes(self, raw, chunk_size: int):
+        return raw.iter_content(chunk_size=chunk_size)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class _HttpxBackend:
+    """httpx 连接池，支持 HTTP/2"""
+
+    _TRACE_PHASES = {
+        'connection.connect_tcp': 'connect',
+        'connection.start_tls': 'tls',
+    }
+
+    def __init__(self, config: Dict[str, Any]):
+        limits = httpx.Limits(max_connections=config["pool_maxsize"] * config["pool_connections"],
+                              max_keepalive_connections=config["pool_maxsize"])
+        # httpx 按已安装的解码器自动设置 Accept-Encoding
+        self.client = httpx.Client(http2=True, limits=limits, verify=config["verify_tls"],
+                                   follow_redirects=True, headers={'User-Agent': config["user_agent"]})
+
+    def send(self, method: str, url: str, stream: bool = False, **kwargs):
+        """发送请求，返回 (原始响应, 阶段耗时)；阶段耗时来自 httpcore 的 trace 事件"""
+        timings: Dict[str, float] = {}
+        started_at: Dict[str, float] = {}
+        sent = time.perf_counter()
+
+        def trace(event: str, info: Dict[str, Any]) -> None:
+            name, _, state = event.rpartition('.')
+            if state == 'started':
+                started_at[name] = time.perf_counter()
+            elif state == 'complete':
+                if name in self._TRACE_PHASES and name in started_at:
+                    timings[self._TRACE_PHASES[name]] = time.perf_counter() - started_at[name]
+                elif name.endswith('receive_response_headers'):
+                    timings['ttfb'] = time.perf_counter() - sent
+
+        try:
+            request = self.client.build_request(method, url, extensions={'trace': trace}, **kwargs)
+            return self.client.send(request, stream=stream), timings
+        except httpx.TimeoutException as e:
+            raise TransportTimeout(str(e)) from e
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+
+    def to_response(self, raw, elapsed: float) -> HttpResponse:
+        try:
+            content = raw.read()
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+        return HttpResponse(str(raw.url), raw.status_code, raw.headers, content, raw.http_version, elapsed)
+
+    def iter_bytes(self, raw, chunk_size: int):
+        return raw.iter_bytes(chunk_size=chunk_size)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class Transport:
+    """带连接池、统一重试策略和缓存钩子的 HTTP 客户端（线程安全）"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, cache=None,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            config: 传输配置，默认 HTTP_CONFIG
+            cache: 缓存钩子，需实现 get(key) -> HttpResponse|None 和 set(key, response)；
+                只缓存状态码 200 的 GET 响应
+            breaker: 按主机熔断器；连接错误、超时和 5xx 计为失败
+        """
+        self.config = config or HTTP_CONFIG
+        self.cache = cache
+        self.breaker = breaker
+        if self.config["http2"] and HAS_HTTPX and HAS_H2:
+            self._backend = _HttpxBackend(self.config)
+        else:
+            self._backend = _RequestsBackend(self.config)
+        self.stats = {"requests": 0, "retries": 0, "cache_hits": 0}
+        self.metrics = TransportMetrics()
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        return 'httpx (HTTP/2)' if isinstance(self._backend, _HttpxBackend) else 'requests (HTTP/1.1)'
+
+    @staticmethod
+    def cache_key(method: str, url: str, params: Optional[Dict] = None) -> str:
+        if not params:
+            return f"{method} {url}"
+        return f"{method} {url}?{json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)}"
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _retry_wait(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        retry = self.config["retry"]
+        wait = retry["backoff"] * (2 ** attempt)
+        pause = parse_retry_after(retry_after) if retry_after else None
+        if pause is not None:
+            wait = max(wait, pause)
+        return min(wait, retry["max_wait"])
+
+    def circuit_open(self, url: str) -> bool:
+        """该主机是否熔断中（只查询，不占用探测名额）"""
+        return self.breaker is not None and self.breaker.is_open(url)
+
+    def _backoff(self, url: str, wait: float) -> None:
+        self._count("retries")
+        self.metrics.record_retry(url)
+        self.metrics.record_sleep(url, wait, 'backoff')
+        time.sleep(wait)
+
+    @staticmethod
+    def _can_wait(deadline: Optional[Deadline], wait: float) -> bool:
+        """重试等待之后是否还有预算再发一次请求"""
+        return deadline is None or wait < deadline.remaining() - deadline.reserve
+
+    def _send(self, method: str, url: str, retries: Optional[int], stream: bool,
+              deadline: Optional[Deadline] = None, **kwargs) -> Tuple[Any, float, Dict[str, float]]:
+        """发送请求并按重试策略重试，返回 (后端原始响应, 开始时间, 阶段耗时)"""
+        retry = self.config["retry"]
+        retries = retry["total"] if retries is None else retries
+        timeout = kwargs.pop('timeout', None) or self.config["timeout"]
+        deadline = deadline or current_deadline()
+        breaker = self.breaker
+        for attempt in range(retries + 1):
+            if deadline is not None:
+                deadline.check(f"请求 {url}")
+            kwargs['timeout'] = timeout if deadline is None else deadline.timeout(timeout)
+            if breaker is not None and not breaker.allow(url):
+                raise CircuitOpenError(f"主机熔断中，跳过请求: {url}")
+            self._count("requests")
+            started = time.perf_counter()
+            try:
+                raw, timings = self._backend.send(method, url, stream=stream, **kwargs)
+            except TransportError as e:
+                self.metrics.record_error(url, 'timeout' if isinstance(e, TransportTimeout) else 'connection')
+                if breaker is not None:
+                    breaker.record_failure(url, str(e))
+                wait = self._retry_wait(attempt)
+                if attempt >= retries or not self._can_wait(deadline, wait):
+                    raise
+                self._backoff(url, wait)
+                continue
+            if breaker is not None:
+                # 4xx 说明主机可用；5xx 与连接错误一样计为失败
+                if raw.status_code >= 500:
+                    breaker.record_failure(url, f"HTTP {raw.status_code}")
+                else:
+                    breaker.record_success(url)
+            if raw.status_code in retry["status"] and attempt < retries:
+                wait = self._retry_wait(attempt, raw.headers.get('Retry-After'))
+                if self._can_wait(deadline, wait):
+                    raw.close()
+                    timings['total'] = time.perf_counter() - started
+                    self.metrics.record_response(url, raw.status_code, timings)
+                    self._backoff(url, wait)
+                    continue
+            return raw, started, timings
+
+    def _finish(self, url: str, status: int, started: float, timings: Dict[str, float], size: int) -> float:
+        """记录读取完响应体的请求，返回总耗时"""
+        timings['total'] = time.perf_counter() - started
+        self.metrics.record_response(url, status, timings, size)
+        return timings['total']
+
+    def request(self, method: str, url: str, params: Optional[Dict] = None, data: Any = None,
+                headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                retries: Optional[int] = None, deadline: Optional[Deadline] = None) -> HttpResponse:
+        """
+        发送请求并读取完整响应
+
+        Args:
+            method: HTTP 方法
+            url: 目标 URL
+            params: 查询参数
+            data: 请求体（表单字典或 bytes）
+            headers: 额外请求头（覆盖默认的 User-Agent 等）
+            timeout: 超时秒数，默认 HTTP_CONFIG["timeout"]
+            retries: 重试次数，默认 HTTP_CONFIG["retry"]["total"]；调用方自己重试时传 0
+            deadline: 时间预算，默认 deadline.current_deadline()
+
+        Returns:
+            HttpResponse（重试用尽后的错误状态码也会返回，由调用方 raise_for_status）
+
+        Raises:
+            TransportTimeout: 超时
+            TransportError: 连接错误
+            DeadlineExceeded: 时间预算即将用尽，请求未发出
+        """
+        method = method.upper()
+        key = None
+        if self.cache is not None and method == 'GET':
+            key = self.cache_key(method, url, params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count("cache_hits")
+                cached.from_cache = True
+                return cached
+
+        raw, started, timings = self._send(method, url, retries, False, deadline, params=params, data=data,
+                                           headers=headers, timeout=timeout)
+        response = self._backend.to_response(raw, 0.0)
+        response.elapsed = self._finish(url, response.status_code, started, timings, len(response.content))
+        if key is not None and response.status_code == 200:
+            self.cache.set(key, response)
+        return response
+
+    def get(self, url: str, **kwargs) -> HttpResponse:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> HttpResponse:
+        return self.request('POST', url, **kwargs)
+
+    def download(self, url: str, path: Union[str, Path], headers: Optional[Dict[str, str]] = None,
+                 timeout: Optional[float] = None, chunk_size: int = 65536,
+                 deadline: Optional[Deadline] = None) -> int:
+        """
+        流式下载到文件（先写临时文件，完成后再替换，失败不会留下残缺文件）
+
+        Returns:
+            写入的字节数
+
+        Raises:
+            TransportError: 请求失败或状态码为 4xx/5xx
+        """
+        path = Path(path)
+        raw, started, timings = self._send('GET', url, None, True, deadline, headers=headers, timeout=timeout)
+        tmp_path = path.with_name(path.name + '.part')
+        written = 0
+        try:
+            if raw.status_code >= 400:
+                elapsed = self._finish(url, raw.status_code, started, timings, 0)
+                raise HTTPStatusError(f"HTTP {raw.status_code}: {url}",
+                                      response=HttpResponse(url, raw.status_code, raw.headers, b'', elapsed=elapsed))
+            with open(tmp_path, 'wb') as f:
+                for chunk in self._backend.iter_bytes(raw, chunk_size):
+                    f.write(chunk)
+                    written += len(chunk)
+            tmp_path.replace(path)
+            self._finish(url, raw.status_code, started, timings, written)
+        except Exception as e:
+            tmp_path.unlink(missing_ok=True)
+            if isinstance(e, (TransportError, OSError)):
+                raise
+            raise TransportError(str(e)) from e
+        finally:
+            raw.close()
+        return written
+
+    def close(self) -> None:
+        self._backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+_default_transport: Optional[Transport] = None
+_default_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """进程内共享的默认 Transport（第一次调用时创建）"""
+    global _default_transport
+    if _default_transport is None:
+        with _default_lock:
+            if _default_transport is None:
+                _default_transport = Transport(breaker=open_circuit_breaker())
+    return _default_transport
+
+
+def export_metrics(path: Optional[Union[str, Path]] = None, show: bool = True) -> Optional[Path]:
+    """
+    运行结束时导出默认 Transport 的请求指标（本进程没有发过请求时不导出）
+
+    Args:
+        path: JSON 文件路径，默认 HTTP_CONFIG["metrics_path"]
+        show: 是否打印表格
+
+    Returns:
+        写入的文件路径，没有指标时为 None
+    """
+    if _default_transport is None or not _default_transport.metrics:
+        return None
+    metrics = _default_transport.metrics
+    written = metrics.export(path or HTTP_CONFIG["metrics_path"])
+    if show:
+        print("📶 HTTP 请求指标（网络 = 请求总耗时，礼貌等待 = 随机延迟/限速排队，退避 = 重试前等待）")
+        print(metrics.format_table())
+        print(f"💾 已导出: {written}")
+    return written
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="统一 HTTP 传输层")
+    parser.add_argument('url', nargs='?', help='请求该 URL 并显示协议、压缩和耗时')
+    args = parser.parse_args()
+
+    transport = get_transport()
+    print(f"🌐 后端: {transport.backend}")
+    print(f"   HTTP/2: {'可用' if HAS_HTTPX and HAS_H2 else '不可用（pip install httpx[http2]）'}")
+    print(f"   brotli: {'可用' if HAS_BROTLI else '不可用（pip install brotli）'}")
+    if args.url:
+        response = transport.get(args.url)
+        print(f"   {response.http_version} {response.status_code}  "
+              f"Content-Encoding: {response.headers.get('Content-Encoding', '-')}  "
+              f"{len(response.content)} 字节  {response.elapsed:.2f}s")
+        print(transport.metrics.format_table())
+
+
+if __name__ == "__main__":
+    main()
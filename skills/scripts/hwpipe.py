@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+硬件数据管道统一命令行入口
+各子命令只在执行时导入自己需要的模块：validate、diff 等快速命令不会加载 requests、bs4、
+pandas、numpy，采集器通过 scraper_registry 按类别懒加载。
+
+使用方法：
+python hwpipe.py update [cpu gpu phone]        # 更新本地 JSON 数据库（update_db.py）
+python hwpipe.py update --budget 1800          # 整次更新最多 30 分钟，超时的类别保留旧数据
+python hwpipe.py update --background           # 立即返回，后台刷新通过检查后才替换数据文件
+python hwpipe.py update --isolated             # 每个采集器在资源受限的子进程中运行
+python hwpipe.py scrape gpu -o gpu.json        # 只运行一个采集器
+python hwpipe.py validate [cpu]                # 校验 mock 数据文件
+python hwpipe.py diff cpu new_cpu.json         # 对比新数据与 mock 数据
+python hwpipe.py sources --refresh techpowerup # 多数据源采集（cpu_sources.py 的参数原样传入）
+python hwpipe.py ingest                        # GitHub 数据集流式入库（github_ingest.py）
+python hwpipe.py snapshot cpu --report         # 列式快照（catalog_snapshot.py）
+python hwpipe.py importtime                    # 快速命令导入耗时回归检查
+"""
+
+import sys
+import argparse
+from typing import Dict, List, Optional
+
+from config import CLI_CONFIG, TARGET_FILES
+
+# 子命令 -> (脚本模块, 说明)，参数原样传给该脚本的 main()
+_DELEGATED = {
+    'sources': ('cpu_sources', 'CPU 多数据源采集与合并'),
+    'ingest': ('github_ingest', 'GitHub 数据集流式入库'),
+    'snapshot': ('catalog_snapshot', '生成列式快照'),
+}
+
+
+def _delegate(module_name: str, prog: str, argv: List[str]) -> int:
+    """以给定参数调用其他脚本的 main()"""
+    import importlib
+    module = importlib.import_module(module_name)
+    saved = sys.argv
+    sys.argv = [prog] + list(argv)
+    try:
+        result = module.main()
+    except SystemExit as e:
+        result = e.code
+    finally:
+        sys.argv = saved
+    return result if isinstance(result, int) else 0
+
+
+def cmd_update(args) -> int:
+    import update_db
+    if args.background:
+        return update_db.start_background_refresh(args.types or None, args.budget, args.force, args.isolated)
+    return update_db.main(args.types or None, args.budget, args.force, args.isolated)
+
+
+def cmd_scrape(args) -> int:
+    from scraper_registry import load_scraper
+    from http_transport import export_metrics
+    data = load_scraper(args.type).run()
+    export_metrics()
+    if not data:
+        print(f"❌ {args.type.upper()}采集器返回空数据")
+        return 1
+    print(f"✅ {args.type.upper()}采集完成: {len(data)}个项目")
+    if args.output:
+        from utils import save_json
+        from pathlib import Path
+        return 0 if save_json(data, Path(args.output)) else 1
+    return 0
+
+
+def cmd_validate(args) -> int:
+    from utils import DataValidator, load_json
+    failed = 0
+    for data_type in args.types or list(TARGET_FILES):
+        target = TARGET_FILES[data_type]
+        data = load_json(target)
+        if data is None:
+            print(f"⚠️  {data_type.upper()}: 文件不存在或无法读取 {target}")
+            failed += 1
+            continue
+        is_valid, errors = DataValidator.validate_data_list(data, data_type)
+        if is_valid:
+            print(f"✅ {data_type.upper()}: {len(data)}个项目全部通过")
+            continue
+        failed += 1
+        print(f"❌ {data_type.upper()}: {len(errors)}个错误")
+        for error in errors[:5]:
+            print(f"  - {error}")
+        if len(errors) > 5:
+            print(f"  ... 还有 {len(errors) - 5} 个错误")
+    return 1 if failed else 0
+
+
+def cmd_diff(args) -> int:
+    from utils import DataComparator, load_json
+    from json_stream import detect_array_key, iter_json_items
+    old_data = load_json(TARGET_FILES[args.type]) or []
+    new_data = iter_json_items(args.path, detect_array_key(args.path))
+    stats = DataComparator.compare_data(old_data, new_data)
+    DataComparator.print_comparison(args.type, stats)
+    return 0
+
+
+def import_profile(argv: List[str]) -> Dict[str, object]:
+    """
+    用 python -X importtime 运行一条子命令，统计导入耗时
+
+    Args:
+        argv: 子命令及参数（如 ["validate"]）
+
+    Returns:
+        {"seconds": 顶层导入累计耗时, "modules": 导入的模块名集合, "returncode": 退出码}
+    """
+    import subprocess
+    from pathlib import Path
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(Path(__file__).resolve())] + list(argv),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace'
+    )
+    total_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        modules.add(name.strip())
+        # 没有缩进的是顶层导入，其累计耗时已包含子模块
+        if not name[1:].startswith(' '):
+            total_us += int(parts[1])
+    return {"seconds": total_us / 1e6, "modules": modules, "returncode": proc.returncode}
+
+
+def check_import_time(commands: Optional[List[List[str]]] = None, budget: Optional[float] = None) -> List[str]:
+    """
+    快速命令导入耗时回归检查
+
+    Args:
+        commands: 要检查的子命令列表，默认 CLI_CONFIG["quick_commands"]
+        budget: 耗时上限（秒），默认 CLI_CONFIG["import_budget"]
+
+    Returns:
+        问题列表，为空表示通过
+    """
+    commands = commands or CLI_CONFIG["quick_commands"]
+    budget = budget if budget is not None else CLI_CONFIG["import_budget"]
+    heavy = CLI_CONFIG["heavy_modules"]
+    problems = []
+    for argv in commands:
+        profile = import_profile(argv)
+        name = ' '.join(argv[:2])
+        loaded = sorted(m for m in heavy if m in profile["modules"])
+        print(f"⏱️  {name}: 导入 {profile['seconds'] * 1000:.0f} ms，{len(profile['modules'])} 个模块")
+        if profile["seconds"] > budget:
+            problems.append(f"{name}: 导入耗时 {profile['seconds']:.2f}s 超过 {budget}s")
+        if loaded:
+            problems.append(f"{name}: 导入了重依赖 {', '.join(loaded)}")
+    return problems
+
+
+def cmd_importtime(args) -> int:
+    problems = check_import_time(budget=args.budget)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print("✅ 快速命令导入耗时正常")
+    return 1 if problems else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='hwpipe', description="硬件数据管道命令行入口")
+    sub = parser.add_subparsers(dest='command', required=True)
+    types = list(TARGET_FILES)
+
+    p = sub.add_parser('update', help='更新本地 JSON 数据库')
+    p.add_argument('types', nargs='*', metavar='TYPE', help=f"数据类型（{', '.join(types)}，默认全部）")
+    p.add_argument('--budget', type=float, metavar='SECONDS', help='整次运行的时间预算（秒，默认见 DEADLINE_CONFIG）')
+    p.add_argument('--background', action='store_true', help='继续使用上次发布的数据，在后台进程中刷新')
+    p.add_argument('--force', action='store_true', help='跳过数量回退检查（允许新数据明显少于上次）')
+    p.add_argument('--isolated', action='store_true', default=None,
+                   help='每个采集器在有内存 / CPU / 超时上限的子进程中运行（默认见 ISOLATION_CONFIG）')
+    p.set_defaults(func=cmd_update)
+
+    p = sub.add_parser('scrape', help='运行单个采集器')
+    p.add_argument('type', choices=types)
+    p.add_argument('-o', '--output', help='结果写入的 JSON 文件')
+    p.set_defaults(func=cmd_scrape)
+
+    p = sub.add_parser('validate', help='校验 mock 数据文件')
+    p.add_argument('types', nargs='*', metavar='TYPE', help=f"数据类型（{', '.join(types)}，默认全部）")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser('diff', help='对比新数据文件与 mock 数据')
+    p.add_argument('type', choices=types)
+    p.add_argument('path', help='新数据 JSON 文件')
+    p.set_defaults(func=cmd_diff)
+
+    # 转发给其他脚本的命令在 main() 中直接分发，这里只用于帮助信息
+    for name, (module, help_text) in _DELEGATED.items():
+        sub.add_parser(name, help=f'{help_text}（参数原样传给 {module}.py）', add_help=False)
+
+    p = sub.add_parser('importtime', help='快速命令导入耗时回归检查')
+    p.add_argument('--budget', type=float, help=f"耗时上限（秒，默认 {CLI_CONFIG['import_budget']}）")
+    p.set_defaults(func=cmd_importtime)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in _DELEGATED:
+        module = _DELEGATED[argv[0]][0]
+        return _delegate(module, f"{module}.py", argv[1:])
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    unknown = [t for t in getattr(args, 'types', None) or [] if t not in TARGET_FILES]
+    if unknown:
+        parser.error(f"未知的数据类型: {', '.join(unknown)}（可选: {', '.join(TARGET_FILES)}）")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
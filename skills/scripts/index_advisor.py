@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+云数据库索引顾问
+根据记录的查询模式（或内置的小程序查询定义）和目录数据分布，
+推荐组合索引并估算选择度，输出与 cpu_series_schema.json 相同格式的集合 Schema
+
+查询日志格式（JSONL，每行一个查询，与前端 CloudQueryOptions 一致）：
+{"collection": "cpu_collection", "where": {"brand": "Intel", "price": {"$gte": 1000}},
+ "orderBy": {"field": "releaseDate", "order": "desc"}, "count": 12}
+
+使用方法：
+python index_advisor.py                              # 使用内置查询定义
+python index_advisor.py --query-log logs/queries.jsonl
+python index_advisor.py --output-dir ../schemas --dry-run
+"""
+
+import json
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from config import TARGET_FILES, COLLECTION_NAMES, SCHEMA_DIR
+
+
+# 小程序页面中实际使用的查询（index/ranking/compare/detail 页面）
+# 值为 None 表示占位条件，选择度按数据分布估算
+STATIC_QUERY_PATTERNS = [
+    # 列表页、排行页、对比页：按发布日期倒序分页
+    {"orderBy": {"field": "releaseDate", "order": "desc"}, "count": 100},
+    # 详情页：按业务ID查询
+    {"where": {"id": None}, "count": 50},
+    # 品牌筛选 + 发布日期排序
+    {"where": {"brand": None}, "orderBy": {"field": "releaseDate", "order": "desc"}, "count": 30},
+    # 品牌 + 价格区间筛选，按价格排序
+    {"where": {"brand": None, "price": {"$gte": None, "$lte": None}},
+     "orderBy": {"field": "price", "order": "asc"}, "count": 20},
+]
+
+# 范围条件操作符
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "gt", "gte", "lt", "lte"}
+# 无法使用索引的操作符（正则模糊搜索等）
+SCAN_OPERATORS = {"$regex", "regexp", "$nin", "$ne", "neq"}
+
+# 无具体取值时范围条件的默认选择度
+DEFAULT_RANGE_SELECTIVITY = 1 / 3
+
+# 字段说明（与 src/types/hardware.ts 保持一致）
+FIELD_DESCRIPTIONS = {
+    "id": "业务主键，如 'cpu-8b77be34'",
+    "model": "型号名称",
+    "brand": "品牌：Intel, AMD, NVIDIA, Apple, Xiaomi, Huawei, Samsung 等",
+    "releaseDate": "发布日期，格式：YYYY-MM-DD",
+    "price": "参考价格（人民币）",
+    "description": "描述信息",
+    "cores": "核心配置，例如 '8P+16E'",
+    "threads": "线程数",
+    "baseClock": "基础频率，单位：GHz",
+    "boostClock": "最大加速频率，单位：GHz",
+    "socket": "接口类型，例如 LGA1700, AM5",
+    "tdp": "热设计功耗，单位：W",
+    "cache": "缓存大小，单位：MB",
+    "integratedGraphics": "是否集成显卡",
+    "process": "制程工艺",
+    "vram": "显存大小，单位：GB",
+    "busWidth": "显存位宽，单位：bit",
+    "cudaCores": "CUDA核心数（NVIDIA）或流处理器数（AMD）",
+    "coreClock": "核心频率，单位：MHz",
+    "memoryClock": "显存频率，单位：MHz",
+    "powerConsumption": "功耗，单位：W",
+    "rayTracing": "是否支持光线追踪",
+    "upscalingTech": "超分辨率技术：DLSS/FSR/XeSS/无",
+    "processor": "处理器型号",
+    "ram": "内存大小，单位：GB",
+    "storage": "存储容量，单位：GB",
+    "screenSize": "屏幕尺寸，单位：英寸",
+    "resolution": "屏幕分辨率，格式：宽度x高度",
+    "refreshRate": "刷新率，单位：Hz",
+    "batteryCapacity": "电池容量，单位：mAh",
+    "camera": "摄像头配置",
+    "os": "操作系统",
+    "support5G": "是否支持5G",
+    "source": "数据来源"
+}
+
+
+class QueryShape:
+    """查询形状：相等条件、范围条件和排序字段（与具体取值无关）"""
+
+    def __init__(self, collection: str, equality: Dict[str, Any], ranges: Dict[str, Dict],
+                 sort: List[Tuple[str, str]], scans: List[str], weight: int = 1):
+        self.collection = collection
+        self.equality = equality
+        self.ranges = ranges
+        self.sort = sort
+        self.scans = scans
+        self.weight = weight
+
+    @property
+    def key(self) -> Tuple:
+        return (self.collection, tuple(sorted(self.equality)), tuple(sorted(self.ranges)),
+                tuple(self.sort), tuple(sorted(self.scans)))
+
+    def describe(self) -> str:
+        """生成可读的查询描述"""
+        parts = [f"{field}=?" for field in sorted(self.equality)]
+        parts += [f"{field} in [?,?]" for field in sorted(self.ranges)]
+        parts += [f"{field} ~ /?/" for field in sorted(self.scans)]
+        text = " AND ".join(parts) or "全部"
+        if self.sort:
+            text += " ORDER BY " + ", ".join(f"{f} {o}" for f, o in self.sort)
+        return text
+
+
+def _split_condition(where: Dict[str, Any]) -> Tuple[Dict, Dict, List[str]]:
+    """
+    将 where 条件拆分为相等条件、范围条件和只能全表扫描的条件
+
+    Returns:
+        (相等条件, 范围条件, 扫描字段列表)
+    """
+    equality, ranges, scans = {}, {}, []
+    for field, cond in (where or {}).items():
+        if isinstance(cond, dict):
+            ops = set(cond)
+            if ops & SCAN_OPERATORS:
+                scans.append(field)
+            elif ops & RANGE_OPERATORS:
+                ranges[field] = cond
+            elif "$in" in ops or "in" in ops:
+                equality[field] = cond.get("$in", cond.get("in"))
+            elif "$eq" in ops or "eq" in ops:
+                equality[field] = cond.get("$eq", cond.get("eq"))
+            else:
+                scans.append(field)
+        else:
+            equality[field] = cond
+    return equality, ranges, scans
+
+
+def parse_query(entry: Dict[str, Any], default_collection: Optional[str] = None) -> List[QueryShape]:
+    """
+    将一条查询记录解析为查询形状（$or 的每个分支单独成形）
+
+    Args:
+        entry: 查询记录
+        default_collection: 记录未指定集合时使用的集合名
+
+    Returns:
+        查询形状列表
+    """
+    collection = entry.get("collection", default_collection)
+    where = entry.get("where") or {}
+    weight = int(entry.get("count", 1))
+
+    order_by = entry.get("orderBy")
+    sort = []
+    if isinstance(order_by, dict) and order_by.get("field"):
+        sort.append((order_by["field"], order_by.get("order", "asc")))
+    elif isinstance(order_by, list):
+        sort = [(o["field"], o.get("order", "asc")) for o in order_by if o.get("field")]
+
+    branches = where.pop("$or", None) if isinstance(where, dict) else None
+    shapes = []
+    for branch in (branches or [{}]):
+        merged = {**where, **branch}
+        equality, ranges, scans = _split_condition(merged)
+        shapes.append(QueryShape(collection, equality, ranges, sort, scans, weight))
+    return shapes
+
+
+def load_query_patterns(query_log: Optional[Path], collections: List[str]) -> List[QueryShape]:
+    """
+    加载查询模式：有日志时读取日志，否则使用内置查询定义
+
+    Args:
+        query_log: 查询日志路径（JSONL）
+        collections: 需要分析的集合列表
+
+    Returns:
+        查询形状列表
+    """
+    shapes = []
+    if query_log:
+        with open(query_log, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    shapes.extend(parse_query(json.loads(line)))
+    else:
+        for collection in collections:
+            for pattern in STATIC_QUERY_PATTERNS:
+                shapes.extend(parse_query(json.loads(json.dumps(pattern)), collection))
+
+    # 合并相同形状的查询，累计权重
+    merged: Dict[Tuple, QueryShape] = {}
+    for shape in shapes:
+        if shape.collection not in collections:
+            continue
+        if shape.key in merged:
+            merged[shape.key].weight += shape.weight
+        else:
+            merged[shape.key] = shape
+    return list(merged.values())
+
+
+class FieldStats:
+    """单个集合的字段分布统计"""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.total = len(records)
+        self.records = records
+        self.counters: Dict[str, Counter] = {}
+        for record in records:
+            for field, value in record.items():
+                key = json.dumps(value, sort_keys=True, ensure_ascii=False) \
+                    if isinstance(value, (dict, list)) else value
+                self.counters.setdefault(field, Counter())[key] += 1
+
+    def distinct(self, field: str) -> int:
+        return len(self.counters.get(field, ()))
+
+    def is_unique(self, field: str) -> bool:
+        counter = self.counters.get(field)
+        return bool(counter) and self.total > 0 and \
+            sum(counter.values()) == self.total and len(counter) == self.total
+
+    def equality_selectivity(self, field: str, value: Any = None) -> float:
+        """相等条件的选择度：有具体取值时按实际命中比例，否则按 Σc²/N² 估算"""
+        counter = self.counters.get(field)
+        if not counter or not self.total:
+            return 1.0
+        if value is not None:
+            values = value if isinstance(value, list) else [value]
+            return min(1.0, sum(counter.get(v, 0) for v in values) / self.total)
+        return sum(c * c for c in counter.values()) / (self.total * self.total)
+
+    def range_selectivity(self, field: str, cond: Dict[str, Any]) -> float:
+        """范围条件的选择度：有具体边界时按实际数据计算，否则使用默认值"""
+        bounds = {op.lstrip('$'): v for op, v in cond.items() if v is not None}
+        if not bounds or not self.total:
+            return DEFAULT_RANGE_SELECTIVITY
+        checks = {
+            "gt": lambda x, b: x > b, "gte": lambda x, b: x >= b,
+            "lt": lambda x, b: x < b, "lte": lambda x, b: x <= b,
+        }
+        matched = 0
+        for record in self.records:
+            value = record.get(field)
+            try:
+                if value is not None and all(checks[op](value, b) for op, b in bounds.items()):
+                    matched += 1
+            except TypeError:
+                continue
+        return matched / self.total
+
+
+class IndexRecommendation:
+    """索引推荐结果"""
+
+    def __init__(self, fields: List[str], unique: bool, selectivity: float,
+                 total: int, queries: List[QueryShape]):
+        self.fields = fields
+        self.unique = unique
+        self.selectivity = selectivity
+        self.total = total
+        self.queries = queries
+
+    @property
+    def weight(self) -> int:
+        return sum(q.weight for q in self.queries)
+
+    @property
+    def estimated_rows(self) -> float:
+        return self.selectivity * self.total
+
+    def to_schema(self) -> Dict[str, Any]:
+        return {"fields": self.fields, "unique": self.unique}
+
+
+def recommend_index(shape: QueryShape, stats: FieldStats) -> Optional[IndexRecommendation]:
+    """
+    按 ESR（相等 → 排序 → 范围）规则为查询形状推荐组合索引
+
+    相等条件按选择度从高到低排列（最能缩小扫描范围的字段在前）
+
+    Args:
+        shape: 查询形状
+        stats: 集合字段分布
+
+    Returns:
+        索引推荐，查询不需要索引时返回None
+    """
+    eq_sel = {f: stats.equality_selectivity(f, v) for f, v in shape.equality.items()}
+    range_sel = {f: stats.range_selectivity(f, c) for f, c in shape.ranges.items()}
+
+    fields = sorted(eq_sel, key=lambda f: (eq_sel[f], f))
+    for field, _ in shape.sort:
+        if field not in fields:
+            fields.append(field)
+    for field in sorted(range_sel, key=lambda f: (range_sel[f], f)):
+        if field not in fields:
+            fields.append(field)
+
+    if not fields:
+        return None
+
+    selectivity = 1.0
+    for value in list(eq_sel.values()) + list(range_sel.values()):
+        selectivity *= value
+
+    unique = len(fields) == 1 and stats.is_unique(fields[0])
+    return IndexRecommendation(fields, unique, selectivity, stats.total, [shape])
+
+
+def merge_recommendations(recs: List[IndexRecommendation]) -> List[IndexRecommendation]:
+    """合并重复索引，并去掉被更长组合索引前缀覆盖的索引（唯一索引保留）"""
+    by_fields: Dict[Tuple, IndexRecommendation] = {}
+    for rec in recs:
+        key = tuple(rec.fields)
+        if key in by_fields:
+            existing = by_fields[key]
+            existing.queries.extend(rec.queries)
+            existing.selectivity = min(existing.selectivity, rec.selectivity)
+        else:
+            by_fields[key] = rec
+
+    result = []
+    for key, rec in by_fields.items():
+        covering = next((other for other_key, other in by_fields.items()
+                         if len(other_key) > len(key) and other_key[:len(key)] == key), None)
+        if covering and not rec.unique:
+            covering.queries.extend(rec.queries)
+            continue
+        result.append(rec)
+    return sorted(result, key=lambda r: -r.weight)
+
+
+def infer_field_type(values: List[Any]) -> str:
+    """根据字段取值推断云数据库字段类型"""
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return "Boolean"
+        if isinstance(value, (int, float)):
+            return "Number"
+        if isinstance(value, dict):
+            return "Date" if "$date" in value else "Object"
+        if isinstance(value, list):
+            return "Array"
+        return "String"
+    return "String"
+
+
+def build_schema(collection: str, records: List[Dict[str, Any]],
+                 recommendations: List[IndexRecommendation]) -> Dict[str, Any]:
+    """
+    生成集合 Schema（格式与 skills/schemas/cpu_series_schema.json 一致）
+
+    Args:
+        collection: 集合名称
+        records: 集合数据
+        recommendations: 索引推荐列表
+
+    Returns:
+        Schema 字典
+    """
+    field_order: List[str] = []
+    for record in records:
+        for field in record:
+            if field not in field_order:
+                field_order.append(field)
+
+    fields = []
+    for name in field_order:
+        values = [r.get(name) for r in records]
+        entry = {
+            "name": name,
+            "type": infer_field_type(values),
+            "description": FIELD_DESCRIPTIONS.get(name, name),
+            "required": all(name in r and r[name] is not None for r in records)
+        }
+        if name == "id":
+            entry["unique"] = True
+        fields.append(entry)
+
+    return {
+        "collectionName": collection,
+        "fields": fields,
+        "indexes": [rec.to_schema() for rec in recommendations]
+    }
+
+
+def print_report(collection: str, stats: FieldStats, shapes: List[QueryShape],
+                 recommendations: List[IndexRecommendation]):
+    """打印索引推荐报告"""
+    print(f"\n📚 集合: {collection} ({stats.total} 条数据)")
+    for rec in recommendations:
+        flag = "唯一" if rec.unique else "组合" if len(rec.fields) > 1 else "单列"
+        print(f"  ✅ [{flag}] {rec.fields}  选择度≈{rec.selectivity:.4f}  "
+              f"预计扫描≈{rec.estimated_rows:.1f}/{stats.total} 行  覆盖查询权重: {rec.weight}")
+        for query in rec.queries:
+            print(f"       - {query.describe()} (x{query.weight})")
+
+    for shape in shapes:
+        if shape.scans:
+            print(f"  ⚠️  无法使用索引的条件（全表扫描）: {', '.join(shape.scans)} "
+                  f"— {shape.describe()} (x{shape.weight})")
+
+
+def advise(query_log: Optional[Path] = None, data_files: Optional[Dict[str, Path]] = None,
+           output_dir: Optional[Path] = SCHEMA_DIR, dry_run: bool = False) -> Dict[str, Dict]:
+    """
+    运行索引顾问
+
+    Args:
+        query_log: 查询日志路径，None时使用内置查询定义
+        data_files: 集合数据文件映射（数据类型 -> 文件路径），默认使用 TARGET_FILES
+        output_dir: Schema 输出目录
+        dry_run: 只打印报告，不写文件
+
+    Returns:
+        集合名 -> Schema 字典
+    """
+    data_files = data_files or TARGET_FILES
+    collections = {COLLECTION_NAMES[t]: path for t, path in data_files.items() if t in COLLECTION_NAMES}
+    shapes = load_query_patterns(query_log, list(collections))
+
+    schemas = {}
+    for collection, path in collections.items():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  无法加载 {collection} 数据 ({path}): {e}")
+            continue
+
+        stats = FieldStats(records)
+        collection_shapes = [s for s in shapes if s.collection == collection]
+        recs = [r for r in (recommend_index(s, stats) for s in collection_shapes) if r]
+        recommendations = merge_recommendations(recs)
+        print_report(collection, stats, collection_shapes, recommendations)
+
+        schema = build_schema(collection, records, recommendations)
+        schemas[collection] = schema
+
+        if not dry_run and output_dir:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            output_file = output_dir / f"{collection}_schema.json"
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(schema, f, ensure_ascii=False, indent=2)
+            print(f"  💾 Schema 已保存: {output_file}")
+
+    return schemas
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='云数据库索引顾问')
+    parser.add_argument('--query-log', type=Path, default=None,
+                        help='查询日志路径（JSONL），默认使用内置的小程序查询定义')
+    parser.add_argument('--data', action='append', default=[], metavar='TYPE=PATH',
+                        help='指定数据文件，例如 cpu=output/github_cpu_data.json（可重复）')
+    parser.add_argument('--output-dir', type=Path, default=SCHEMA_DIR,
+                        help='Schema 输出目录')
+    parser.add_argument('--dry-run', action='store_true', help='只打印报告，不写入文件')
+    args = parser.parse_args()
+
+    data_files = dict(TARGET_FILES)
+    for item in args.data:
+        data_type, _, path = item.partition('=')
+        data_files[data_type] = Path(path)
+
+    advise(args.query_log, data_files, args.output_dir, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+在独立子进程中运行采集器
+每个采集器一个子进程，子进程启动时用 resource.setrlimit 设置内存（地址空间）和 CPU 时间上限，
+父进程另设墙钟超时：超时后终止整个进程组（包括 Selenium 启动的浏览器）。结果通过临时 JSON 文件返回。
+BeautifulSoup 树、DataFrame 占用的内存随子进程退出全部释放，泄漏或卡住的数据源被终止并报告原因，
+不影响其他类别的更新。
+
+子进程的时间预算比墙钟超时少 grace_seconds，正常情况下采集器会先停止请求、返回已有的数据。
+熔断器和限速器的状态保存在 SQLite 中，子进程与父进程共用；HTTP 指标由子进程单独导出。
+Windows 等没有 resource 模块的平台只有墙钟超时。
+
+使用方法：
+result = run_isolated("scrapers.gpu", "gpu", deadline)
+if result.ok:
+    data = result.data
+
+python isolated_runner.py scrapers.gpu -o gpu.json --memory-mb 1024   # 单独运行（子进程入口）
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    resource = None
+    HAS_RESOURCE = False
+
+from config import DEADLINE_CONFIG, ISOLATION_CONFIG
+from deadline import Deadline
+
+# 子进程在内存分配失败时使用的退出码
+EXIT_MEMORY = 3
+
+
+class IsolatedResult(NamedTuple):
+    """子进程运行结果"""
+    data: Optional[List[Dict[str, Any]]]
+    returncode: Optional[int]
+    error: Optional[str]          # 失败原因（超时、超过内存 / CPU 上限、异常退出），成功时为 None
+    elapsed: float                # 墙钟耗时（秒）
+    peak_rss_mb: Optional[float]  # 子进程报告的峰值常驻内存
+    exhausted: bool               # 子进程的时间预算是否用尽（数据可能不完整）
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and bool(self.data)
+
+
+def apply_limits(memory_mb: Optional[float] = None, cpu_seconds: Optional[float] = None) -> None:
+    """
+    为当前进程设置资源上限（子进程在导入采集器之前调用）
+
+    Args:
+        memory_mb: 地址空间上限（MB），超过后分配内存抛出 MemoryError
+        cpu_seconds: CPU 时间上限（秒），超过后收到 SIGXCPU，再过 5 秒收到 SIGKILL
+    """
+    if not HAS_RESOURCE:
+        return
+    if memory_mb:
+        limit = int(memory_mb * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_seconds:
+        limit = int(cpu_seconds)
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, limit + 5))
+
+
+def _describe_exit(returncode: int) -> str:
+    """把子进程退出码转换为失败原因"""
+    if returncode == EXIT_MEMORY:
+        return "超过内存上限（MemoryError）"
+    if returncode < 0:
+        signum = -returncode
+        if signum == getattr(signal, 'SIGXCPU', None):
+            return "超过 CPU 时间上限"
+        if signum == getattr(signal, 'SIGKILL', None):
+            return "被 SIGKILL 终止（超过 CPU 时间上限或被系统 OOM 终止）"
+        return f"被信号 {signal.Signals(signum).name} 终止"
+    return f"异常退出（退出码 {returncode}）"
+
+
+def _kill(process: subprocess.Popen) -> None:
+    """终止子进程及其进程组（采集器启动的浏览器等）"""
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+    process.wait()
+
+
+def run_isolated(module_name: str, data_type: str, deadline: Optional[Deadline] = None,
+                 config: Optional[Dict[str, Any]] = None) -> IsolatedResult:
+    """
+    在子进程中运行采集器模块的 run()
+
+    Args:
+        module_name: 模块名称（如 "scrapers.gpu"）
+        data_type: 数据类型（用于临时文件名）
+        deadline: 时间预算，墙钟超时不超过其剩余时间；子进程预算用尽时同样标记为 exhausted
+        config: 资源上限（见 ISOLATION_CONFIG）
+
+    Returns:
+        运行结果；失败时 data 为 None，error 说明原因
+    """
+    config = config or ISOLATION_CONFIG
+    timeout = config["timeout"]
+    if deadline is not None:
+        timeout = min(timeout, deadline.remaining())
+    reserve = deadline.reserve if deadline is not None else DEADLINE_CONFIG["reserve_seconds"]
+
+    fd, output = tempfile.mkstemp(prefix=f"{data_type}.", suffix='.json')
+    os.close(fd)
+    command = [sys.executable, str(Path(__file__).resolve()), module_name, '--output', output,
+               '--budget', f"{max(0.0, timeout - config['grace_seconds']):.1f}", '--reserve', str(reserve)]
+    if config.get("memory_mb"):
+        command += ['--memory-mb', str(config["memory_mb"])]
+    if config.get("cpu_seconds"):
+        command += ['--cpu-seconds', str(config["cpu_seconds"])]
+
+    started = time.monotonic()
+    # 新的进程组：超时时连同采集器启动的子进程一起终止；输出直接显示在父进程的控制台
+    process = subprocess.Popen(command, stdin=subprocess.DEVNULL, start_new_session=True)
+    error = None
+    try:
+        returncode = process.wait(timeout=timeout)
+        if returncode != 0:
+            error = _describe_exit(returncode)
+    except subprocess.TimeoutExpired:
+        _kill(process)
+        error = f"超过 {timeout:.0f}s 仍未完成，已终止"
+    finally:
+        # 父进程被中断时不留下孤儿进程
+        if process.poll() is None:
+            _kill(process)
+    elapsed = time.monotonic() - started
+
+    payload: Dict[str, Any] = {}
+    try:
+        with open(output, 'r', encoding='utf-8') as f:
+            payload = json.load(f) or {}
+    except (OSError, json.JSONDecodeError):
+        pass
+    finally:
+        Path(output).unlink(missing_ok=True)
+
+    exhausted = bool(payload.get("exhausted"))
+    if exhausted and deadline is not None:
+        deadline.mark_exhausted()
+    return IsolatedResult(
+        data=payload.get("data") if error is None else None,
+        returncode=process.returncode,
+        error=error,
+        elapsed=elapsed,
+        peak_rss_mb=payload.get("peak_rss_mb"),
+        exhausted=exhausted,
+    )
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if not HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def main():
+    """子进程入口：设置资源上限，运行采集器并把结果写入 --output"""
+    import argparse
+    parser = argparse.ArgumentParser(description="在资源受限的进程中运行采集器")
+    parser.add_argument('module', help='采集器模块（如 scrapers.gpu）')
+    parser.add_argument('-o', '--output', required=True, help='结果 JSON 文件')
+    parser.add_argument('--budget', type=float, help='时间预算（秒）')
+    parser.add_argument('--reserve', type=float, default=DEADLINE_CONFIG["reserve_seconds"], help='预留时间（秒）')
+    parser.add_argument('--memory-mb', type=float, help='内存（地址空间）上限（MB）')
+    parser.add_argument('--cpu-seconds', type=float, help='CPU 时间上限（秒）')
+    args = parser.parse_args()
+
+    apply_limits(args.memory_mb, args.cpu_seconds)
+    try:
+        from deadline import activate
+        from scraper_registry import load_module
+        deadline = Deadline(args.budget, reserve=args.reserve, name=args.module)
+        with activate(deadline):
+            data = load_module(args.module).run(deadline=deadline)
+        payload = {"data": data, "exhausted": deadline.exhausted, "peak_rss_mb": _peak_rss_mb()}
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        # 子进程中的请求指标单独导出，不会与父进程的指标合并
+        if 'http_transport' in sys.modules:
+            sys.modules['http_transport'].export_metrics(
+                Path(ISOLATION_CONFIG["metrics_dir"]) / f"{args.module.rsplit('.', 1)[-1]}.json", show=False)
+    except MemoryError:
+        print(f"❌ {args.module}: 超过内存上限", file=sys.stderr)
+        sys.stdout.flush()
+        os._exit(EXIT_MEMORY)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+JSON 数组流式读取
+逐条产出大型 JSON 文件中数组的元素，内存占用与文件大小无关。
+安装了 ijson 时使用 ijson，否则使用基于 json.JSONDecoder.raw_decode 的分块解析。
+
+支持两种文件结构：
+[ {...}, {...} ]                      # 顶层数组
+{"all_cpus": [ {...}, {...} ], ...}  # 对象中的数组字段（指定 key）
+
+另提供对应的流式写出 write_json_items：逐条写入临时文件，完成后原子替换目标文件，
+输出与 json.dump(records, f, ensure_ascii=False, indent=2) 逐字节相同。
+
+使用方法：
+for record in iter_json_items("output/github_cpu_data.json"):
+    ...
+write_json_items(records_iterator, "output/cpu_data.json")
+
+依赖库（可选）：
+pip install ijson
+"""
+
+import os
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+
+CHUNK_SIZE = 64 * 1024
+_WHITESPACE = ' \t\r\n'
+
+
+class _ChunkReader:
+    """带缓冲区的分块读取"""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """读入下一块并丢弃已消费的部分，到达文件末尾时返回 False"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """跳过空白，返回下一个字符（文件结束时为空字符串）"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"JSON 结构不符合预期：位置 {self.pos} 处应为 {char!r}")
+        self.pos += 1
+
+
+def _seek_array(reader: _ChunkReader, key: Optional[str]) -> None:
+    """定位到数组的 '[' 之后"""
+    first = reader.peek()
+    if first == '[' and key is None:
+        reader.pos += 1
+        return
+    if first != '{' or key is None:
+        raise ValueError("文件顶层不是数组；对象结构需要指定数组字段 key")
+    # 在对象中查找 "key": [
+    marker = json.dumps(key)
+    while True:
+        index = reader.buffer.find(marker, reader.pos)
+        if index >= 0:
+            reader.pos = index + len(marker)
+            reader.expect(':')
+            reader.expect('[')
+            return
+        # 保留末尾可能被截断的一段后继续读取
+        reader.pos = max(reader.pos, len(reader.buffer) - len(marker))
+        if not reader.fill():
+            raise ValueError(f"文件中找不到数组字段: {key}")
+
+
+def _iter_raw_decode(f, key: Optional[str], chunk_size: int) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    reader = _ChunkReader(f, chunk_size)
+    _seek_array(reader, key)
+    if reader.peek() == ']':
+        return
+    while True:
+        reader.peek()
+        try:
+            item, end = decoder.raw_decode(reader.buffer, reader.pos)
+            # 数字等标量可能恰好被块边界截断：后面必须还有分隔符才算完整
+            if end >= len(reader.buffer) and not reader.eof:
+                raise json.JSONDecodeError("incomplete", reader.buffer, end)
+        except json.JSONDecodeError:
+            if not reader.fill():
+                raise ValueError(f"JSON 在位置 {reader.pos} 处不完整")
+            continue
+        reader.pos = end
+        yield item
+        separator = reader.peek()
+        if separator == ',':
+            reader.pos += 1
+        elif separator == ']':
+            return
+        else:
+            raise ValueError(f"JSON 结构不符合预期：位置 {reader.pos} 处应为 ',' 或 ']'")
+
+
+def iter_json_items(path: Union[str, Path], key: Optional[str] = None,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    逐条读取 JSON 文件中数组的元素
+
+    Args:
+        path: JSON 文件路径
+        key: 数组所在的顶层字段名；None 表示文件本身就是数组
+        chunk_size: 每次读取的字符数（仅内置解析器使用）
+
+    Yields:
+        数组元素
+    """
+    if HAS_IJSON:
+        with open(path, 'rb') as f:
+            # use_float 避免小数被解析为 Decimal，与 json.load 的结果保持一致
+            yield from ijson.items(f, f"{key}.item" if key else 'item', use_float=True)
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from _iter_raw_decode(f, key, chunk_size)
+
+
+def write_json_items(items: Iterable[Any], path: Union[str, Path], indent: Optional[int] = 2) -> int:
+    """
+    逐条写出 JSON 数组
+
+    先写入同目录下的临时文件，全部写完后替换目标文件；迭代过程中出错时目标文件保持原样。
+
+    Args:
+        items: 数组元素迭代器
+        path: 目标文件路径
+        indent: 缩进（与 json.dump 相同，None 表示紧凑格式）
+
+    Returns:
+        写出的元素数
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 与 json.dump 的排版一致：有缩进时每个元素另起一行并整体缩进一级
+    prefix = '\n' + ' ' * indent if indent is not None else ''
+    separator = ',' if indent is not None else ', '
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=str(path.parent))
+    count = 0
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for item in items:
+                text = json.dumps(item, ensure_ascii=False, indent=indent)
+                if prefix:
+                    text = prefix + text.replace('\n', prefix)
+                f.write(separator + text if count else text)
+                count += 1
+            if count and indent is not None:
+                f.write('\n')
+            f.write(']')
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+    return count
+
+
+def detect_array_key(path: Union[str, Path], candidates=('all_cpus', 'items', 'records', 'data')) -> Optional[str]:
+    """根据文件开头判断数组位置：顶层数组返回 None，否则返回第一个出现的候选字段名"""
+    with open(path, 'r', encoding='utf-8') as f:
+        head = f.read(CHUNK_SIZE)
+    stripped = head.lstrip()
+    if stripped.startswith('['):
+        return None
+    for key in candidates:
+        if json.dumps(key) in head:
+            return key
+    raise ValueError(f"无法判断 {path} 中数组的位置")
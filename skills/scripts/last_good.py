@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+最近一次通过校验的数据快照（last-good）
+每次 update_db 发布新数据后，把同一份数据另存到 .cache/last_good/<类别>.json，并记录条数和发布时间。
+
+- 发布前的数量回退检查：新数据比上次发布的数据少了超过 max_drop_ratio 时拒绝发布
+  （例如采集失败后只剩采集器内置的几条备用数据），前端继续使用上次的数据
+- 前端数据文件丢失或损坏时，直接从快照恢复，不必等待采集完成
+- hwpipe update --background 先恢复快照、再在后台进程中刷新（stale-while-revalidate）
+
+使用方法：
+python last_good.py              # 查看各类别快照的条数与发布时间
+python last_good.py --restore    # 用快照恢复丢失或损坏的数据文件
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from config import LAST_GOOD_CONFIG, TARGET_FILES
+from json_stream import write_json_items
+
+
+class LastGoodStore:
+    """每个类别一份最近一次成功发布的数据"""
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            directory: 快照目录
+            config: 参数（见 LAST_GOOD_CONFIG）
+        """
+        self.config = config or LAST_GOOD_CONFIG
+        self.directory = Path(directory or self.config["dir"])
+
+    def path(self, data_type: str) -> Path:
+        return self.directory / f"{data_type}.json"
+
+    def meta_path(self, data_type: str) -> Path:
+        return self.directory / f"{data_type}.meta.json"
+
+    def info(self, data_type: str) -> Optional[Dict[str, Any]]:
+        """快照信息 {"count", "published_at"}，没有快照时返回 None"""
+        try:
+            with open(self.meta_path(data_type), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return meta if self.path(data_type).exists() else None
+
+    def load(self, data_type: str) -> Optional[List[Dict[str, Any]]]:
+        """读取快照数据，没有或损坏时返回 None"""
+        try:
+            with open(self.path(data_type), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return data if isinstance(data, list) else None
+
+    def save(self, data_type: str, data: List[Dict[str, Any]]) -> Path:
+        """记录一次成功发布的数据（先写数据再写信息，两者都是写临时文件后替换）"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        count = write_json_items(data, self.path(data_type), indent=None)
+        meta = {"count": count, "published_at": datetime.now().isoformat(timespec='seconds')}
+        tmp_path = self.meta_path(data_type).with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        tmp_path.replace(self.meta_path(data_type))
+        return self.path(data_type)
+
+    def check_regression(self, data_type: str, new_count: int, fallback_count: int = 0) -> Optional[str]:
+        """
+        发布前的数量回退检查
+
+        Args:
+            data_type: 数据类型
+            new_count: 待发布的条数
+            fallback_count: 还没有快照时作为基线的条数（通常是当前数据文件的条数）
+
+        Returns:
+            拒绝发布的原因，通过时返回 None
+        """
+        info = self.info(data_type)
+        baseline = info["count"] if info else fallback_count
+        if not baseline:
+            return None
+        minimum = baseline * (1 - self.config["max_drop_ratio"])
+        if new_count < minimum:
+            source = f"上次发布（{info['published_at']}）" if info else "现有数据"
+            return (f"新数据只有 {new_count} 条，比{source}的 {baseline} 条少了 "
+                    f"{(1 - new_count / baseline):.0%}（上限 {self.config['max_drop_ratio']:.0%}）")
+        return None
+
+    def restore(self, data_type: str, target_file: Path) -> bool:
+        """
+        数据文件丢失、损坏或为空时用快照恢复
+
+        Returns:
+            是否从快照恢复了数据文件
+        """
+        try:
+            with open(target_file, 'r', encoding='utf-8') as f:
+                if json.load(f):
+                    return False
+        except (OSError, json.JSONDecodeError):
+            pass
+        data = self.load(data_type)
+        if not data:
+            return False
+        write_json_items(data, target_file)
+        return True
+
+
+def main():
+    """命令行：查看快照或恢复数据文件"""
+    import argparse
+    parser = argparse.ArgumentParser(description="最近一次通过校验的数据快照")
+    parser.add_argument('--restore', action='store_true', help='用快照恢复丢失或损坏的数据文件')
+    args = parser.parse_args()
+
+    store = LastGoodStore()
+    for data_type, target_file in TARGET_FILES.items():
+        info = store.info(data_type)
+        if info is None:
+            print(f"  {data_type}: （尚无快照）")
+            continue
+        print(f"📦 {data_type}: {info['count']} 条，发布于 {info['published_at']}")
+        if args.restore and store.restore(data_type, target_file):
+            print(f"   ♻️  已恢复 {target_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -104,7 +104,8 @@ def extract_cpu_data(html: str) -> List[Dict]:
     return cpus
 
 
-def main():
+def scrape_passmark() -> List[Dict]:
+    """启动浏览器抓取 PassMark CPU 列表，返回记录列表（不写文件）"""
     driver = None
     try:
         logger.info("Launching Chrome for PassMark scraping...")
@@ -124,6 +125,15 @@ def main():
         cpu_list = extract_cpu_data(full_html)
 
         logger.info(f"Extracted {len(cpu_list)} CPUs from PassMark")
+        return cpu_list
+    finally:
+        if driver:
+            driver.quit()
+
+
+def main():
+    try:
+        cpu_list = scrape_passmark()
         
         # 保存为JSON
         with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
@@ -138,9 +148,6 @@ def main():
     except Exception as e:
         logger.exception(f"Error during PassMark scraping: {e}")
         raise
-    finally:
-        if driver:
-            driver.quit()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+按主机限速
+- HostRateLimiter：进程内多个线程共享，对同一主机的请求按最小间隔（加随机抖动）依次放行，
+  不同主机之间互不影响。等待在锁外进行，线程只预约自己的时间槽。
+- SharedRateLimiter：按主机的令牌桶，状态保存在 SQLite 中，多个线程、多个进程（如同时运行的
+  GPU 和手机爬虫都访问 search.jd.com）共用同一个桶；速率按 AIMD 自适应：请求正常时线性加速，
+  遇到 429/503、Retry-After 或响应明显变慢时成倍减速。
+
+使用方法：
+limiter = HostRateLimiter(min_interval=0.8, jitter=1.0)
+limiter.acquire("https://www.techpowerup.com/cpu-specs/")
+
+limiter = open_shared_rate_limiter()
+limiter.acquire("https://search.jd.com/Search")
+limiter.report("https://search.jd.com/Search", status=429, latency=0.4, retry_after="30")
+
+两种限速器的 acquire 都遵守时间预算：需要等待的时间超过预算剩余（扣除预留）时不等待，抛出 DeadlineExceeded。
+
+python rate_limiter.py            # 查看各主机当前速率
+"""
+
+import time
+import random
+import sqlite3
+import threading
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from urllib.parse import urlsplit
+
+from config import RATE_LIMIT_CONFIG
+from deadline import Deadline, DeadlineExceeded, current_deadline
+
+
+def host_of(url_or_host: str) -> str:
+    """从 URL 中取主机名；传入的已是主机名时原样返回"""
+    return urlsplit(url_or_host).netloc.lower() if '://' in url_or_host else url_or_host.lower()
+
+
+class HostRateLimiter:
+    """线程安全的按主机最小间隔限速器"""
+
+    def __init__(self, min_interval: float = 1.0, jitter: float = 0.0):
+        """
+        Args:
+            min_interval: 同一主机两次请求之间的最小间隔（秒）
+            jitter: 在最小间隔上额外叠加的随机时间上限（秒）
+        """
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self._next_allowed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, url_or_host: str, now: Optional[float] = None) -> float:
+        """
+        预约下一个可用时间槽
+
+        Returns:
+            需要等待的秒数
+        """
+        host = host_of(url_or_host)
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            slot = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = slot + self.min_interval + random.uniform(0, self.jitter)
+        return slot - now
+
+    def acquire(self, url_or_host: str, deadline: Optional[Deadline] = None) -> float:
+        """阻塞到该主机允许下一次请求，返回实际等待的秒数（deadline 默认为当前生效的预算）"""
+        return _wait_for_slot(self.reserve(url_or_host), deadline)
+
+    def report(self, url_or_host: str, status: Optional[int] = None, latency: Optional[float] = None,
+               retry_after: Optional[str] = None) -> None:
+        """固定间隔限速器不根据响应调整速率（与 SharedRateLimiter 接口一致）"""
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    host          TEXT PRIMARY KEY,
+    rate          REAL NOT NULL,
+    tokens        REAL NOT NULL,
+    updated_at    REAL NOT NULL,
+    blocked_until REAL NOT NULL DEFAULT 0,
+    latency       REAL
+)
+"""
+
+# 表示主机过载、需要减速的状态码
+THROTTLE_STATUS = (429, 503)
+
+
+def _wait_for_slot(wait: float, deadline: Optional[Deadline] = None) -> float:
+    """
+    等待预约的时间槽；时间预算不足以等到该时间槽时不等待，直接抛出 DeadlineExceeded
+
+    Returns:
+        实际等待的秒数
+    """
+    deadline = deadline or current_deadline()
+    if wait > 0 and deadline is not None:
+        budget = deadline.remaining() - deadline.reserve
+        if wait > budget:
+            deadline.mark_exhausted()
+            raise DeadlineExceeded(f"{deadline.name} 时间预算不足以等待主机限速"
+                                   f"（需等待 {wait:.0f}s，可用 {max(0.0, budget):.0f}s）")
+    if wait > 0:
+        time.sleep(wait)
+    return wait
+
+
+def parse_retry_after(value: Any, now: Optional[float] = None) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 秒数（"120"）或 HTTP 日期（"Wed, 21 Oct 2026 07:28:00 GMT"）
+        now: 当前时间戳
+
+    Returns:
+        需要等待的秒数，无法解析时返回 None
+    """
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        return None
+    if moment is None:
+        return None
+    return max(0.0, moment.timestamp() - (time.time() if now is None else now))
+
+
+class SharedRateLimiter:
+    """跨线程、跨进程共享的按主机自适应令牌桶（SQLite）"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, host_config: Optional[Dict[str, Dict]] = None,
+                 defaults: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            path: 状态数据库路径，同一路径的所有进程共用限速状态
+            host_config: 按主机覆盖的参数（见 RATE_LIMIT_CONFIG["hosts"]）
+            defaults: 默认参数（见 RATE_LIMIT_CONFIG["defaults"]）
+        """
+        self.path = Path(path or RATE_LIMIT_CONFIG["path"])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.defaults = dict(RATE_LIMIT_CONFIG["defaults"] if defaults is None else defaults)
+        self.host_config = RATE_LIMIT_CONFIG["hosts"] if host_config is None else host_config
+        # isolation_level=None：事务由 BEGIN IMMEDIATE 显式控制，其他进程在写锁上等待
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def settings(self, host: str) -> Dict[str, float]:
+        """某个主机的限速参数"""
+        return {**self.defaults, **self.host_config.get(host, {})}
+
+    def _update(self, host: str, change) -> Any:
+        """在一个写事务中读取、修改并保存主机状态"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT rate, tokens, updated_at, blocked_until, latency FROM hosts WHERE host = ?", (host,)
+                ).fetchone()
+                now = time.time()
+                config = self.settings(host)
+                if row is None:
+                    state = {"rate": config["initial_rate"], "tokens": config["burst"], "updated_at": now,
+                             "blocked_until": 0.0, "latency": None}
+                else:
+                    state = dict(zip(("rate", "tokens", "updated_at", "blocked_until", "latency"), row))
+                # 按当前速率补充令牌（预约产生的负数令牌也在这里逐步还清）
+                elapsed = max(0.0, now - state["updated_at"])
+                state["tokens"] = min(config["burst"], state["tokens"] + elapsed * state["rate"])
+                state["updated_at"] = now
+                result = change(state, config, now)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO hosts (host, rate, tokens, updated_at, blocked_until, latency) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (host, state["rate"], state["tokens"], state["updated_at"], state["blocked_until"],
+                     state["latency"])
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def reserve(self, url_or_host: str) -> float:
+        """
+        取一个令牌（令牌不足时预约未来的令牌）
+
+        Returns:
+            需要等待的秒数
+        """
+        def take(state, config, now):
+            state["tokens"] -= 1
+            wait = -state["tokens"] / state["rate"] if state["tokens"] < 0 else 0.0
+            return max(wait, state["blocked_until"] - now)
+
+        return self._update(host_of(url_or_host), take)
+
+    def acquire(self, url_or_host: str, deadline: Optional[Deadline] = None) -> float:
+        """
+        阻塞到该主机允许下一次请求（包括 Retry-After 暂停），返回实际等待的秒数
+
+        Args:
+            url_or_host: 请求的 URL 或主机名
+            deadline: 时间预算，默认为当前生效的预算；等待超出预算时归还令牌并抛出 DeadlineExceeded
+        """
+        wait = self.reserve(url_or_host)
+        try:
+            return _wait_for_slot(wait, deadline)
+        except DeadlineExceeded:
+            # 不会再发出这次请求：归还预约的令牌，不占用其他爬虫的配额
+            def give_back(state, config, now):
+                state["tokens"] = min(config["burst"], state["tokens"] + 1)
+
+            self._update(host_of(url_or_host), give_back)
+            raise
+
+    def report(self, url_or_host: str, status: Optional[int] = None, latency: Optional[float] = None,
+               retry_after: Optional[str] = None) -> float:
+        """
+        根据一次请求的结果调整该主机的速率（AIMD）
+
+        Args:
+            url_or_host: 请求的 URL 或主机名
+            status: HTTP 状态码；None 表示请求超时
+            latency: 响应耗时（秒）
+            retry_after: Retry-After 响应头
+
+        Returns:
+            调整后的速率（请求/秒）
+        """
+        def adapt(state, config, now):
+            pause = parse_retry_after(retry_after, now)
+            previous = state["latency"]
+            if latency is not None:
+                state["latency"] = latency if previous is None else 0.8 * previous + 0.2 * latency
+            slow = (status is None or
+                    (latency is not None and previous is not None
+                     and latency > max(config["latency_target"], previous * config["latency_factor"])))
+            if status in THROTTLE_STATUS or pause is not None or slow:
+                # 乘性减速：限流或变慢后立即降速，并清空已积累的令牌
+                state["rate"] = max(config["min_rate"], state["rate"] * config["decrease"])
+                state["tokens"] = min(state["tokens"], 0.0)
+                if pause is None and status in THROTTLE_STATUS:
+                    pause = 1.0 / state["rate"]
+                if pause:
+                    state["blocked_until"] = max(state["blocked_until"], now + min(pause, config["max_pause"]))
+            elif status is not None and status < 400:
+                # 加性加速
+                state["rate"] = min(config["max_rate"], state["rate"] + config["increase"])
+            return state["rate"]
+
+        return self._update(host_of(url_or_host), adapt)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """各主机当前状态"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT host, rate, tokens, blocked_until, latency FROM hosts ORDER BY host"
+            ).fetchall()
+        return {host: {"rate": rate, "tokens": tokens, "blocked_until": blocked, "latency": latency}
+                for host, rate, tokens, blocked, latency in rows}
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_shared_rate_limiter() -> Optional[SharedRateLimiter]:
+    """按配置打开共享限速器；关闭时返回 None（使用爬虫自己的随机延迟）"""
+    return SharedRateLimiter() if RATE_LIMIT_CONFIG["enabled"] else None
+
+
+def main():
+    """命令行：查看各主机当前速率"""
+    with SharedRateLimiter() as limiter:
+        states = limiter.snapshot()
+        if not states:
+            print("（尚无限速记录）")
+        now = time.time()
+        for host, state in states.items():
+            blocked = max(0.0, state["blocked_until"] - now)
+            latency = f"{state['latency']:.2f}s" if state["latency"] is not None else "-"
+            print(f"🌐 {host}: {state['rate']:.2f} 请求/秒，平均响应 {latency}"
+                  + (f"，暂停 {blocked:.0f}s" if blocked else ""))
+
+
+if __name__ == "__main__":
+    main()
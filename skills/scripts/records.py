@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+紧凑的硬件记录类型
+与 src/types/hardware.ts 中的 CpuSpecs / GpuSpecs / PhoneSpecs 一一对应，使用 __slots__
+代替逐条记录的字典；品牌、接口、代号、制程、来源等低基数字段的字符串用 sys.intern 驻留，
+数万条记录共享同一个字符串对象。只在读写 JSON 时与字典互相转换：
+
+- 接口中没有的字段（_provenance、_sources 等）放在 extra 字典里，不会丢失
+- 原始记录中没有的字段不占用取值（槽位保持未赋值），to_dict() 时也不会输出
+- 记录原始字典的键顺序（相同顺序的记录共享同一个元组），to_dict() 按原顺序输出，原样写回的记录不产生差异
+- 支持 record["id"]、record.get() 取值，与字典比较时按 to_dict() 比较，可以直接交给按字典编写的对比代码
+
+update_db 用记录类型持有现有数据（采集期间一直在内存中），与新采集的数据对比和合并。
+
+使用方法：
+records = load_records("output/github_cpu_data.json", "cpu")
+dump_records(records, "output/cpu_data.json")
+
+python records.py output/github_cpu_data.json --category cpu   # 对比字典与记录类型的内存占用
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Type, Union
+
+from json_stream import detect_array_key, iter_json_items, write_json_items
+
+
+# 记录的键顺序元组按内容共享：同一数据源的记录键顺序基本相同，每条记录只多一个引用
+_KEY_ORDERS: Dict[tuple, tuple] = {}
+
+
+class HardwareRecord:
+    """硬件记录基类（对应 BaseHardware）"""
+
+    # 接口字段（按 hardware.ts 的顺序；to_dict 按原始字典的键顺序输出）
+    FIELDS = ('id', 'model', 'brand', 'releaseDate', 'price', 'description', 'source')
+    # 取值重复度高、需要驻留的字符串字段
+    INTERNED = frozenset({'brand', 'releaseDate', 'source'})
+
+    __slots__ = FIELDS + ('extra', '_order')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+        # 槽位描述符：读取未赋值的槽位会抛出 AttributeError，用来区分“没有该字段”和 None
+        cls._slots = {name: getattr(cls, name) for name in cls.FIELDS}
+
+    def __init__(self, **values: Any):
+        self.extra = None
+        self._order = ()
+        self.update(values)
+
+    def __getattr__(self, name: str) -> Any:
+        # 只在槽位未赋值时调用：原始记录缺少的接口字段视为 None
+        if name in type(self)._field_set:
+            return None
+        raise AttributeError(f"{type(self).__name__} 没有字段 {name}")
+
+    def update(self, values: Dict[str, Any]) -> None:
+        """按字典更新字段；接口以外的字段放入 extra，新字段按 dict.update 的方式追加到键顺序末尾"""
+        order = self._order
+        keys = tuple(values) if not order else order + tuple(key for key in values if key not in order)
+        if keys != order:
+            self._order = _KEY_ORDERS.setdefault(keys, keys)
+        field_set = self._field_set
+        interned = self.INTERNED
+        for key, value in values.items():
+            if key in field_set:
+                if key in interned and type(value) is str:
+                    value = sys.intern(value)
+                setattr(self, key, value)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HardwareRecord':
+        """由 JSON 字典创建记录"""
+        record = cls.__new__(cls)
+        record.extra = None
+        record._order = ()
+        record.update(data)
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为 JSON 字典（只包含原始记录中存在的字段，按原始字典的键顺序）"""
+        result = {}
+        slots = self._slots
+        extra = self.extra
+        for key in self._order:
+            slot = slots.get(key)
+            if slot is not None:
+                try:
+                    result[key] = slot.__get__(self)
+                except AttributeError:
+                    continue
+            elif extra and key in extra:
+                result[key] = extra[key]
+        return result
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """与 dict.get 相同的取值方式，接口字段和 extra 字段都可以取；字段存在但为 None 时返回 None"""
+        slot = self._slots.get(key)
+        if slot is not None:
+            try:
+                return slot.__get__(self)
+            except AttributeError:
+                return default
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key: str) -> Any:
+        """与字典相同的取值方式，原始记录中没有的字段抛出 KeyError"""
+        if key in self._field_set:
+            try:
+                return getattr(type(self), key).__get__(self)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        if not isinstance(other, HardwareRecord):
+            return NotImplemented
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r}, model={self.model!r})"
+
+
+class CpuSpecs(HardwareRecord):
+    """CPU 规格（GitHub/Intel 数据集及其标准化结果中的 codename、status 等字段也作为常用字段保存）"""
+
+    FIELDS = HardwareRecord.FIELDS + (
+        'cores', 'threads', 'baseClock', 'boostClock', 'socket', 'tdp', 'integratedGraphics',
+        'cache', 'process', 'codename', 'status', 'verticalSegment', 'memoryTypes', 'maxMemoryChannels',
+        'cacheInfo', 'cacheType', 'graphicsModel', 'releaseDatePrecision'
+    )
+    INTERNED = HardwareRecord.INTERNED | {
+        'cores', 'threads', 'socket', 'process', 'codename', 'status', 'verticalSegment', 'memoryTypes',
+        'maxMemoryChannels', 'cacheInfo', 'cacheType', 'graphicsModel', 'releaseDatePrecision',
+        'integratedGraphics', 'baseClock', 'cache'
+    }
+
+    __slots__ = FIELDS[len(HardwareRecord.FIELDS):]
+
+
+class GpuSpecs(HardwareRecord):
+    """GPU 规格"""
+
+    FIELDS = HardwareRecord.FIELDS + (
+        'vram', 'busWidth', 'cudaCores', 'coreClock', 'memoryClock', 'powerConsumption',
+        'rayTracing', 'upscalingTech'
+    )
+    INTERNED = HardwareRecord.INTERNED | {'upscalingTech'}
+
+    __slots__ = FIELDS[len(HardwareRecord.FIELDS):]
+
+
+class PhoneSpecs(HardwareRecord):
+    """手机规格"""
+
+    FIELDS = HardwareRecord.FIELDS + (
+        'processor', 'ram', 'storage', 'screenSize', 'resolution', 'refreshRate',
+        'batteryCapacity', 'camera', 'os', 'support5G'
+    )
+    INTERNED = HardwareRecord.INTERNED | {'processor', 'resolution', 'camera', 'os'}
+
+    __slots__ = FIELDS[len(HardwareRecord.FIELDS):]
+
+
+HardwareRecord._field_set = frozenset(HardwareRecord.FIELDS)
+HardwareRecord._slots = {name: getattr(HardwareRecord, name) for name in HardwareRecord.FIELDS}
+
+RECORD_TYPES: Dict[str, Type[HardwareRecord]] = {
+    'cpu': CpuSpecs,
+    'gpu': GpuSpecs,
+    'phone': PhoneSpecs
+}
+
+
+def record_type(category: str) -> Type[HardwareRecord]:
+    """按类别取记录类型"""
+    try:
+        return RECORD_TYPES[category]
+    except KeyError:
+        raise ValueError(f"未知的硬件类别: {category}") from None
+
+
+def iter_records(path: Union[str, Path], category: str) -> Iterator[HardwareRecord]:
+    """流式读取 JSON 文件并逐条转换为记录类型"""
+    from_dict = record_type(category).from_dict
+    for item in iter_json_items(path, detect_array_key(path)):
+        yield from_dict(item)
+
+
+def load_records(path: Union[str, Path], category: str) -> List[HardwareRecord]:
+    """
+    读取 JSON 文件为记录列表（逐条转换，不会同时持有整份字典数据）
+
+    Args:
+        path: JSON 文件路径（顶层数组或 {"all_cpus": [...]}）
+        category: 类别（cpu, gpu, phone）
+
+    Returns:
+        记录列表
+    """
+    return list(iter_records(path, category))
+
+
+def dump_records(records: Iterable[HardwareRecord], path: Union[str, Path]) -> int:
+    """逐条转换为字典并写出 JSON 数组，返回记录数"""
+    return write_json_items((record.to_dict() for record in records), path)
+
+
+def measure(path: Union[str, Path], category: str) -> Dict[str, Any]:
+    """
+    对比同一份数据以字典列表和记录类型保存时的内存占用（tracemalloc）
+
+    Returns:
+        {"count", "dict_bytes", "record_bytes"}
+    """
+    import gc
+    import json
+    import tracemalloc
+
+    def allocated(load) -> tuple:
+        gc.collect()
+        tracemalloc.start()
+        data = load()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return len(data), size
+
+    def load_dicts():
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        key = detect_array_key(path)
+        return data[key] if key else data
+
+    count, dict_bytes = allocated(load_dicts)
+    _, record_bytes = allocated(lambda: load_records(path, category))
+    return {"count": count, "dict_bytes": dict_bytes, "record_bytes": record_bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比字典与紧凑记录类型的内存占用")
+    parser.add_argument('path', help='JSON 数据文件')
+    parser.add_argument('--category', default='cpu', choices=sorted(RECORD_TYPES), help='硬件类别')
+    args = parser.parse_args()
+
+    result = measure(args.path, args.category)
+    ratio = result['record_bytes'] / result['dict_bytes'] if result['dict_bytes'] else 0
+    print(f"📊 {args.path}: {result['count']} 条记录")
+    print(f"   字典列表: {result['dict_bytes'] / 1024:.0f} KB")
+    print(f"   记录类型: {result['record_bytes'] / 1024:.0f} KB（{ratio:.0%}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,18 @@
 import json
 import os
 import sys
-import ssl
 import re
-from urllib.request import urlopen, Request
-from urllib.error import URLError, HTTPError
+from functools import lru_cache
 from html.parser import HTMLParser
 
-# 创建一个不验证SSL证书的上下文
-ssl_context = ssl.create_default_context()
-ssl_context.check_hostname = False
-ssl_context.verify_mode = ssl.CERT_NONE
+from date_normalizer import normalize_date
+from unit_parser import parse_clock_range, parse_cache, parse_power
+from table_fingerprint import open_table_cache
+from wiki_revision import open_revision_fetcher
+from http_transport import HTTPStatusError, TransportError, get_transport
+
+# 解析器版本：解析逻辑（包括用到的单位、日期解析）变化时递增，使表格缓存中的旧记录失效
+PARSER_VERSION = "3"
 
 class WikipediaTableParser(HTMLParser):
     """维基百科表格解析器"""
@@ -168,6 +170,144 @@ class WikipediaTableParser(HTMLParser):
         except ValueError:
             pass
 
+_HEADER_SEPARATORS = re.compile(r'[ /\-\n\t]')
+# 混在数据行中的表头行：首列为这些值或包含这些关键字
+_HEADER_ROW_CELLS = frozenset(['Model', 'Cores(threads)', 'Base', 'Boost', 'Processorbranding', 'Series',
+                               'Desktop processors', 'Mobile processors'])
+_HEADER_ROW_KEYWORDS = re.compile(r'clock|rate|ghz|cache|tdp|release|date|price|socket|memory|pcie|gpu|graphics', re.I)
+_MODEL_KEYWORDS = re.compile(r'ryzen|threadripper', re.I)
+
+# 同一列的取值在整张表里大量重复（插槽、TDP、发布日期），解析结果按原文缓存
+_parse_clock = lru_cache(maxsize=1024)(parse_clock_range)
+_parse_cache = lru_cache(maxsize=1024)(parse_cache)
+_parse_power = lru_cache(maxsize=1024)(parse_power)
+_normalize_date = lru_cache(maxsize=1024)(normalize_date)
+
+
+def normalize_header(header):
+    """表头统一为小写下划线形式，如 Cores (threads) -> cores_threads"""
+    return _HEADER_SEPARATORS.sub('_', header.lower().replace('(', '').replace(')', ''))
+
+
+def _set_model(cpu_data, value, key):
+    # 过滤掉非型号值
+    if _MODEL_KEYWORDS.search(value):
+        cpu_data['model'] = value
+
+
+def _set_cores_threads(cpu_data, value, key):
+    # 处理核心数和线程数
+    core_thread_match = value.strip('()')
+    if '(' in core_thread_match:
+        parts = core_thread_match.split('(')
+        cores = parts[0].strip()
+        threads = parts[1].strip(')')
+        # 确保是数字
+        if cores.isdigit() or cores.replace('.', '').isdigit():
+            cpu_data['cores'] = cores
+        if threads.isdigit() or threads.replace('.', '').isdigit():
+            cpu_data['threads'] = threads
+
+
+def _set_clock(cpu_data, value, key):
+    # 处理时钟频率（GHz），必须带频率单位
+    base_clock, boost_clock = _parse_clock(value)
+    if base_clock is not None:
+        cpu_data['base_clock'] = base_clock
+    if boost_clock is not None:
+        cpu_data['boost_clock'] = boost_clock
+
+
+def _set_base_clock(cpu_data, value, key):
+    # 单独的基础频率列：取范围的下限
+    base_clock, _ = _parse_clock(value)
+    if base_clock is not None:
+        cpu_data['base_clock'] = base_clock
+
+
+def _set_boost_clock(cpu_data, value, key):
+    # 单独的加速频率列：单个取值即加速频率，范围取上限
+    base_clock, boost_clock = _parse_clock(value)
+    boost_clock = boost_clock if boost_clock is not None else base_clock
+    if boost_clock is not None:
+        cpu_data['boost_clock'] = boost_clock
+
+
+def _set_cache(cpu_data, value, key):
+    # 缓存（MB），必须带容量单位
+    cache = _parse_cache(value)
+    if cache is not None:
+        cpu_data['cache'] = cache
+
+
+def _set_tdp(cpu_data, value, key):
+    # TDP（W），必须带功耗单位
+    tdp = _parse_power(value)
+    if tdp is not None:
+        cpu_data['tdp'] = tdp
+
+
+def _set_release(cpu_data, value, key):
+    # 统一转换为 ISO 日期，并记录精度（day/month/quarter/year）
+    release = _normalize_date(value)
+    if release.valid:
+        cpu_data['release_date'] = release.iso
+        cpu_data['release_date_precision'] = release.precision
+
+
+def _set_price(cpu_data, value, key):
+    # 确保包含价格单位或格式
+    if any(unit in value for unit in ['$', 'usd', 'eur', 'cny', 'jpy']):
+        cpu_data['price'] = value
+
+
+def _set_value(cpu_data, value, key):
+    cpu_data[key] = value
+
+
+_HEADER_TOKENS_BOOST = frozenset(['boost', 'turbo'])
+
+# 表头 -> 字段的匹配规则，按顺序取第一条匹配的规则
+_FIELD_RULES = [
+    (lambda h: 'model' in h, 'model', _set_model),
+    (lambda h: 'cores' in h and 'threads' in h, 'cores_threads', _set_cores_threads),
+    # 基础 / 加速频率分两列时（如 "Clock rate Base (GHz)"、子表头 "Boost"）分别映射，不能互相覆盖
+    (lambda h: _HEADER_TOKENS_BOOST & set(h.split('_')), 'boost_clock', _set_boost_clock),
+    (lambda h: 'base' in h.split('_'), 'base_clock', _set_base_clock),
+    (lambda h: 'clock' in h, 'clock', _set_clock),
+    (lambda h: 'cache' in h, 'cache', _set_cache),
+    (lambda h: 'tdp' in h, 'tdp', _set_tdp),
+    (lambda h: 'release' in h, 'release_date', _set_release),
+    (lambda h: 'price' in h, 'price', _set_price),
+    (lambda h: 'socket' in h, 'socket', _set_value),
+    (lambda h: 'memory' in h, 'memory', _set_value),
+    (lambda h: 'pcie' in h, 'pcie', _set_value),
+    (lambda h: 'gpu' in h or 'graphics' in h, 'gpu', _set_value),
+]
+
+
+def compile_column_plan(headers):
+    """
+    把表头编译为列计划：每列对应一个字段处理函数
+    
+    Args:
+        headers: 表头列表
+        
+    Returns:
+        [(列号, 字段名, 处理函数), ...]；未匹配任何规则的列按规范化表头原样保存
+    """
+    plan = []
+    for i, header in enumerate(headers):
+        normalized = normalize_header(header)
+        for matches, key, handler in _FIELD_RULES:
+            if matches(normalized):
+                plan.append((i, key, handler))
+                break
+        else:
+            plan.append((i, normalized, _set_value))
+    return plan
+
+
 class AmdRyzenScraper:
     """AMD Ryzen处理器维基百科页面爬虫"""
     
@@ -178,11 +318,10 @@ class AmdRyzenScraper:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
             "Upgrade-Insecure-Requests": "1"
         }
         self.cpu_data = []
+        self._plans = {}
     
     def fetch_page(self):
         """
@@ -194,29 +333,16 @@ class AmdRyzenScraper:
         print(f"📄 获取页面: {self.url}")
         
         try:
-            request = Request(self.url, headers=self.headers)
-            with urlopen(request, timeout=30, context=ssl_context) as response:
-                content = response.read()
-                
-                # 检查是否是gzip压缩内容
-                content_encoding = response.info().get('Content-Encoding', '')
-                if 'gzip' in content_encoding:
-                    # 解压缩gzip内容
-                    import gzip
-                    from io import BytesIO
-                    buffer = BytesIO(content)
-                    with gzip.GzipFile(fileobj=buffer, mode='rb') as f:
-                        content = f.read()
+            # 共享传输层负责连接复用、gzip/br 解码、字符集识别和重试
+            response = get_transport().get(self.url, headers=self.headers, timeout=30)
+            response.raise_for_status()
+            return response.text
                 
-                # 解码内容
-                encoding = response.info().get_content_charset('utf-8')
-                return content.decode(encoding)
-                
-        except HTTPError as e:
-            print(f"❌ HTTP错误: {e.code} - {e.reason}")
+        except HTTPStatusError as e:
+            print(f"❌ HTTP错误: {e.response.status_code}")
             return None
-        except URLError as e:
-            print(f"❌ URL错误: {e.reason}")
+        except TransportError as e:
+            print(f"❌ URL错误: {e}")
             return None
         except Exception as e:
             print(f"❌ 处理页面时出错: {e}")
@@ -255,11 +381,12 @@ class AmdRyzenScraper:
                     continue
                 
                 print(f"  ✅ 处理表格")
+                plan = self.column_plan(headers)
                 
                 # 解析每一行
                 for j, row in enumerate(rows):
                     try:
-                        cpu_item = self._parse_cpu_row(row, headers, section_title)
+                        cpu_item = self._parse_cpu_row(row, headers, section_title, plan)
                         if cpu_item:
                             self.cpu_data.append(cpu_item)
                             print(f"    ✅ 解析成功: {cpu_item.get('model', 'Unknown')}")
@@ -280,7 +407,71 @@ class AmdRyzenScraper:
             import traceback
             traceback.print_exc()
     
-    def _parse_cpu_row(self, row, headers, section_title):
+    def fetch_cpu_data(self):
+        """
+        获取并解析页面：修订号未变时直接复用上次的结果，接口不可用时整页下载
+        
+        Returns:
+            CPU数据列表
+        """
+        revisions = open_revision_fetcher()
+        if revisions is not None:
+            def parse(html_content):
+                self.cpu_data = []
+                self.parse_page(html_content)
+                return self.cpu_data or None
+            
+            try:
+                with revisions:
+                    self.cpu_data = revisions.fetch_rows(self.url, parse, version=PARSER_VERSION) or []
+                return self.cpu_data
+            except Exception as e:
+                print(f"⚠️  修订号接口不可用，整页下载: {e}")
+        
+        html_content = self.fetch_page()
+        if html_content:
+            self.parse_page_cached(html_content)
+        return self.cpu_data
+    
+    def parse_page_cached(self, html_content):
+        """
+        wikitable 与上次相同时直接复用上次的解析结果，否则重新解析
+        
+        Args:
+            html_content: 页面HTML内容
+        """
+        table_cache = open_table_cache()
+        if table_cache is None:
+            self.parse_page(html_content)
+            return
+        
+        def parse():
+            self.cpu_data = []
+            self.parse_page(html_content)
+            return self.cpu_data or None
+        
+        with table_cache:
+            self.cpu_data = table_cache.parse(self.url, html_content, "wikitable", parse,
+                                              version=PARSER_VERSION) or []
+    
+    def column_plan(self, headers):
+        """
+        编译表头对应的列计划，相同表头在不同部分复用同一计划
+        
+        Args:
+            headers: 表头列表
+            
+        Returns:
+            [(列号, 字段名, 处理函数), ...]，按列号排列
+        """
+        key = tuple(headers)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = compile_column_plan(headers)
+            self._plans[key] = plan
+        return plan
+    
+    def _parse_cpu_row(self, row, headers, section_title, plan=None):
         """
         解析CPU表格行
         
@@ -288,6 +479,7 @@ class AmdRyzenScraper:
             row: 表格行数据列表
             headers: 表头列表
             section_title: 所属部分标题
+            plan: 预先编译的列计划（默认按表头取缓存）
             
         Returns:
             CPU数据字典
@@ -298,12 +490,11 @@ class AmdRyzenScraper:
         
         # 过滤掉明显是表头的行
         first_cell = row[0].strip()
-        if first_cell in ['Model', 'Cores(threads)', 'Base', 'Boost', 'Processorbranding', 'Series', 'Desktop processors', 'Mobile processors']:
+        if first_cell in _HEADER_ROW_CELLS:
             return None
         
         # 过滤掉包含表头关键字的行
-        header_keywords = ['clock', 'rate', 'ghz', 'cache', 'tdp', 'release', 'date', 'price', 'socket', 'memory', 'pcie', 'gpu', 'graphics']
-        if any(keyword in first_cell.lower() for keyword in header_keywords):
+        if _HEADER_ROW_KEYWORDS.search(first_cell):
             return None
         
         # 创建CPU数据字典
@@ -313,84 +504,24 @@ class AmdRyzenScraper:
             'source': 'Wikipedia'
         }
         
-        # 解析每个单元格，确保只处理行和表头都有的部分
-        min_length = min(len(row), len(headers))
-        for i in range(min_length):
-            header = headers[i]
-            cell_value = row[i]
-            value = cell_value.strip()
-            
+        # 按列计划只处理映射到字段的列（列计划按表头缓存，每张表只编译一次）
+        if plan is None:
+            plan = self.column_plan(headers)
+        row_length = len(row)
+        for i, key, handler in plan:
+            if i >= row_length:
+                break
+            value = row[i].strip()
             # 跳过空值
-            if not value:
-                continue
-            
-            # 根据表头处理不同字段
-            normalized_header = header.lower().replace(' ', '_').replace('(', '').replace(')', '').replace('/', '_').replace('-', '_').replace('\n', '_').replace('\t', '_')
-            
-            # 特殊字段处理
-            if 'branding_and_model' in normalized_header or 'model' in normalized_header:
-                # 过滤掉非型号值
-                if not any(keyword in value.lower() for keyword in ['ryzen', 'threadripper']):
-                    continue
-                cpu_data['model'] = value
-            elif 'cores' in normalized_header and 'threads' in normalized_header:
-                # 处理核心数和线程数
-                core_thread_match = value.strip('()')
-                if '(' in core_thread_match:
-                    parts = core_thread_match.split('(')
-                    cores = parts[0].strip()
-                    threads = parts[1].strip(')')
-                    # 确保是数字
-                    if cores.isdigit() or cores.replace('.', '').isdigit():
-                        cpu_data['cores'] = cores
-                    if threads.isdigit() or threads.replace('.', '').isdigit():
-                        cpu_data['threads'] = threads
-            elif 'clock_rate' in normalized_header or 'clock' in normalized_header:
-                # 处理时钟频率
-                clock_values = value.split('\n')
-                if clock_values:
-                    base_clock = clock_values[0].strip()
-                    # 确保包含频率单位
-                    if any(unit in base_clock for unit in ['ghz', 'mhz', 'g hz']):
-                        cpu_data['base_clock'] = base_clock
-                    if len(clock_values) > 1:
-                        boost_clock = clock_values[1].strip()
-                        if any(unit in boost_clock for unit in ['ghz', 'mhz', 'g hz']):
-                            cpu_data['boost_clock'] = boost_clock
-            elif 'l3_cache' in normalized_header or 'cache' in normalized_header:
-                # 确保包含缓存单位
-                if any(unit in value for unit in ['mb', 'kb', 'gb']):
-                    cpu_data['cache'] = value
-            elif 'tdp' in normalized_header:
-                # 确保包含TDP单位
-                if any(unit in value for unit in ['w', 'watts']):
-                    cpu_data['tdp'] = value
-            elif 'released' in normalized_header or 'release' in normalized_header:
-                # 尝试识别日期格式
-                if any(char in value for char in ['20', '19', '-', '/', '.']):
-                    cpu_data['release_date'] = value
-            elif 'price' in normalized_header:
-                # 确保包含价格单位或格式
-                if any(unit in value for unit in ['$', 'usd', 'eur', 'cny', 'jpy']):
-                    cpu_data['price'] = value
-            elif 'socket' in normalized_header:
-                cpu_data['socket'] = value
-            elif 'memory' in normalized_header:
-                cpu_data['memory'] = value
-            elif 'pcie' in normalized_header:
-                cpu_data['pcie'] = value
-            elif 'gpu' in normalized_header or 'graphics' in normalized_header:
-                cpu_data['gpu'] = value
-            else:
-                # 其他字段直接添加
-                cpu_data[normalized_header] = value
+            if value:
+                handler(cpu_data, value, key)
         
         # 确保至少有model字段
         if not cpu_data.get('model') and row:
             # 尝试从第一列获取型号
             first_cell = row[0].strip()
             # 过滤掉非型号值
-            if any(keyword in first_cell.lower() for keyword in ['ryzen', 'threadripper']):
+            if _MODEL_KEYWORDS.search(first_cell):
                 cpu_data['model'] = first_cell
         
         # 过滤掉没有有效字段的行
@@ -496,14 +627,8 @@ class AmdRyzenScraper:
         """
         print("🚀 开始从维基百科获取AMD Ryzen处理器数据...")
         
-        # 获取页面内容
-        html_content = self.fetch_page()
-        if not html_content:
-            print("❌ 未能获取页面内容，任务失败")
-            return
-        
-        # 解析页面
-        self.parse_page(html_content)
+        # 获取并解析页面
+        self.fetch_cpu_data()
         
         if not self.cpu_data:
             print("❌ 未能提取CPU数据，任务失败")
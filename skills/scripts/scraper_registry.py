@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+采集器注册表
+按 config.SCRAPER_MODULES 在第一次用到某个类别时才导入对应模块（requests、bs4 等重依赖随之加载），
+导入结果缓存，scripts 目录只加入 sys.path 一次。只做校验、对比等不需要采集器的命令因此不必
+承担这些依赖的导入耗时。
+
+使用方法：
+from scraper_registry import load_scraper
+data = load_scraper("gpu").run()
+"""
+
+import sys
+import importlib
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import List
+
+from config import SCRAPER_MODULES
+
+SCRIPTS_DIR = Path(__file__).parent
+
+
+def _ensure_scripts_path() -> None:
+    scripts_dir = str(SCRIPTS_DIR)
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+
+
+def categories() -> List[str]:
+    """已注册的数据类别"""
+    return list(SCRAPER_MODULES)
+
+
+@lru_cache(maxsize=None)
+def load_module(module_name: str) -> ModuleType:
+    """
+    导入采集器模块（同一模块只导入一次）
+
+    Args:
+        module_name: 模块名称（如 "scrapers.cpu"）
+
+    Returns:
+        模块对象
+
+    Raises:
+        ModuleNotFoundError: 模块不存在
+        AttributeError: 模块缺少 run() 函数
+    """
+    _ensure_scripts_path()
+    module = importlib.import_module(module_name)
+    if not hasattr(module, "run"):
+        raise AttributeError(f"模块缺少run()函数: {module_name}")
+    return module
+
+
+def load_scraper(data_type: str) -> ModuleType:
+    """
+    按数据类别取采集器模块
+
+    Args:
+        data_type: 数据类型（cpu/gpu/phone）
+
+    Returns:
+        提供 run() 的模块
+
+    Raises:
+        KeyError: 类别未在 SCRAPER_MODULES 中配置
+    """
+    module_name = SCRAPER_MODULES.get(data_type)
+    if not module_name:
+        raise KeyError(f"未找到{data_type}的scraper配置")
+    return load_module(module_name)
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """
-CPU数据采集总控脚本 - 维基百科对接版
+CPU数据采集总控脚本 - 多数据源版
 功能：
-1. 调用生产级 Wiki 爬虫获取全量 Intel/AMD 数据
+1. 并发采集 Wikipedia / Ryzen / TechPowerUp / GitHub 数据源并按型号合并（cpu_sources.py），
+   不可用时退回生产级 Wiki 爬虫
 2. 执行数据 Schema 校验，确保符合前端 TypeScript 定义
 3. 自动更新本地 mock 文件并统计采集质量
 """
@@ -16,6 +17,8 @@ from typing import List, Dict, Any, Optional
 # 确保可以导入同目录下的爬虫模块
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
+# 多数据源合并模块位于 scripts 目录
+sys.path.append(os.path.dirname(current_dir))
 
 try:
     from cpu_production import run as run_wiki_scraper
@@ -24,56 +27,110 @@ except ImportError as e:
     print(f"[ERROR] 无法导入 cpu_production 模块: {e}")
     HAS_SCRAPER = False
 
+try:
+    from cpu_sources import collect_cpu_data
+    HAS_SOURCES = True
+except ImportError as e:
+    print(f"[WARN] 无法导入 cpu_sources 模块，仅使用维基百科数据: {e}")
+    HAS_SOURCES = False
+
+from deadline import Deadline, activate
+
 # 定义输出路径
 OUTPUT_PATH = os.path.join(os.path.dirname(os.path.dirname(current_dir)), "src", "mock", "cpu_data.json")
 
+# 缺少时丢弃记录的字段
+REQUIRED_FIELDS = ("model", "brand")
+
+def _as_number(value: Any) -> float:
+    """数字保持原类型（整数价格不会变成 5999.0），字符串转为浮点数"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return float(value)
+
+
+# 其余 CpuSpecs 字段及其类型转换；数据源没有的字段保持缺失，不填默认值
+FIELD_TYPES = {
+    "releaseDate": str,
+    "price": _as_number,
+    "description": str,
+    "cores": str,
+    "threads": str,
+    "baseClock": float,
+    "boostClock": float,
+    "socket": str,
+    "tdp": lambda value: int(float(value)),
+    "cache": _as_number,  # 小数 MB（如 1.5）不截断
+    "integratedGraphics": bool,
+    "process": str,
+    "source": str
+}
+
+_MISSING_VALUES = (None, "", "N/A")
+
+
 def validate_and_sanitize(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     清洗并校验数据，确保符合 CpuSpecs 接口规范
+
+    缺少型号或品牌的记录被丢弃；其他缺失的字段保持缺失，无法转换类型的取值同样视为缺失。
     """
     valid_list = []
     seen_ids = set()
+    dropped = 0
 
     for item in data:
-        # 1. 基础字段补全 (确保不缺失必需字段)
+        # 1. 必需字段检查
+        if any(item.get(field) in _MISSING_VALUES for field in REQUIRED_FIELDS):
+            dropped += 1
+            continue
         sanitized = {
-            "id": item.get("id", f"cpu-{hashlib.md5(item.get('model','').encode()).hexdigest()[:8]}"),
-            "model": item.get("model", "Unknown Model"),
-            "brand": item.get("brand", "Other"),
-            "releaseDate": item.get("releaseDate", "2024-01-01"),
-            "price": item.get("price"), # 允许为 None
-            "description": item.get("description", ""),
-            "cores": str(item.get("cores", "4")),
-            "threads": str(item.get("threads", item.get("cores", "4"))),
-            "baseClock": float(item.get("baseClock", 3.0)),
-            "boostClock": float(item.get("boostClock", 4.0)),
-            "socket": item.get("socket", "Generic"),
-            "tdp": int(item.get("tdp", 65)),
-            "cache": int(item.get("cache", 16)),
-            "integratedGraphics": bool(item.get("integratedGraphics", True)),
-            "process": item.get("process", "7 nm"),
-            "source": item.get("source", "Wikipedia")
+            "id": item.get("id") or f"cpu-{hashlib.md5(item['model'].encode()).hexdigest()[:8]}",
+            "model": item["model"],
+            "brand": item["brand"]
         }
+        for field, convert in FIELD_TYPES.items():
+            value = item.get(field)
+            if value in _MISSING_VALUES:
+                continue
+            try:
+                sanitized[field] = convert(value)
+            except (TypeError, ValueError):
+                continue
 
         # 2. 去重逻辑
         if sanitized["id"] not in seen_ids:
             seen_ids.add(sanitized["id"])
             valid_list.append(sanitized)
-            
+
+    if dropped:
+        print(f"[WARN] {dropped} 条记录缺少型号或品牌，已丢弃")
     return valid_list
 
-def run():
+def run(deadline: Optional[Deadline] = None):
+    """
+    采集、校验并保存 CPU 数据
+
+    Args:
+        deadline: 时间预算（update_db 传入），用尽时各数据源退回缓存，返回已有的数据
+    """
     print("=" * 60)
     print("[SYSTEM] 启动 CPU 硬件数据同步流水线")
     print("=" * 60)
 
-    if not HAS_SCRAPER:
+    if not HAS_SOURCES and not HAS_SCRAPER:
         print("[FATAL] 核心爬虫模块丢失，请检查 cpu_production.py 是否在同一目录。")
         return
 
     # 1. 执行采集
-    print("[STEP 1/3] 正在从维基百科矩阵获取原始数据...")
-    raw_data = run_wiki_scraper()
+    # cpu_sources 的采集线程与维基爬虫没有显式的预算参数，通过当前生效的预算受限
+    with activate(deadline):
+        if HAS_SOURCES:
+            print("[STEP 1/3] 正在并发采集并合并各 CPU 数据源...")
+            raw_data = collect_cpu_data(deadline=deadline)
+        else:
+            print("[STEP 1/3] 正在从维基百科矩阵获取原始数据...")
+            raw_data = run_wiki_scraper()
     
     if not raw_data:
         print("[ERROR] 采集返回数据为空，请检查网络连接或维基百科页面结构是否变动。")
@@ -95,13 +152,15 @@ def run():
         print("\n" + "—" * 40)
         print(f"✅ 同步成功！")
         print(f"📊 最终入库条数: {len(final_data)}")
-        print(f"🌐 数据源: Wikipedia (Intel Core / AMD Ryzen)")
+        print(f"🌐 数据源: {'多数据源合并' if HAS_SOURCES else 'Wikipedia (Intel Core / AMD Ryzen)'}")
         print(f"💾 存储位置: {os.path.relpath(OUTPUT_PATH)}")
         print("—" * 40)
 
     except Exception as e:
         print(f"[ERROR] 写入文件失败: {e}")
 
+    return final_data
+
 if __name__ == "__main__":
     # 强制设置输出编码以支持中文日志
     if hasattr(sys.stdout, 'reconfigure'):
@@ -8,21 +8,46 @@ CPU数据采集模块 - 维基百科生产级对接版
 4. 对接云数据库导入格式
 """
 
-import pandas as pd
 import re
 import json
 import os
 import hashlib
-import requests
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any, Optional
+try:
+    from date_normalizer import find_date
+    from unit_parser import parse_clock_range, parse_cache, parse_power, parse_process
+    from entity_resolution import deduplicate_records
+    from table_fingerprint import open_table_cache
+    from wikitable import PARSER_VERSION as WIKITABLE_VERSION, extract_wikitables
+    from wiki_revision import open_revision_fetcher
+    from http_transport import get_transport
+except ImportError:
+    # 日期、单位解析和实体识别模块位于 scripts 目录
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from date_normalizer import find_date
+    from unit_parser import parse_clock_range, parse_cache, parse_power, parse_process
+    from entity_resolution import deduplicate_records
+    from table_fingerprint import open_table_cache
+    from wikitable import PARSER_VERSION as WIKITABLE_VERSION, extract_wikitables
+    from wiki_revision import open_revision_fetcher
+    from http_transport import get_transport
+
+
+# 解析器版本：解析逻辑（包括用到的单位、日期解析）变化时递增，使表格缓存中的旧记录失效
+PARSER_VERSION = f"2+wikitable.{WIKITABLE_VERSION}"
 
+# 处理器表格的表头特征：表头包含任一关键词才构建数据行
+CPU_TABLE_SIGNATURE = ['model', 'processor', 'core', 'frequency', 'clock', 'tdp', 'cache', 'socket']
 
 
 class WikiCpuProductionScraper:
     def __init__(self):
         self.exchange_rate = 7.2
+        self.max_workers = 4
         # 扩展目标 URL，覆盖更全的型号
         self.targets = [
             {"brand": "Intel", "url": "https://en.wikipedia.org/wiki/List_of_Intel_Core_i9_processors", "type": "Core i9"},
@@ -33,7 +58,7 @@ class WikiCpuProductionScraper:
 
     def _clean(self, val: Any) -> str:
         """深度清洗：去除引用 [1]、换行符和多余空格"""
-        if pd.isna(val): return ""
+        if val is None or val != val: return ""  # None 或 NaN
         s = str(val)
         s = re.sub(r'\[.*?\]', '', s) # 去掉维基百科引用
         return s.replace('\n', ' ').strip()
@@ -70,90 +95,115 @@ class WikiCpuProductionScraper:
 
     def fetch_all(self) -> List[Dict]:
         all_results = []
+        table_cache = open_table_cache()
+        revisions = open_revision_fetcher()
+        try:
+            # 各页面并发获取，结果按 targets 顺序合并
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for results in executor.map(lambda target: self._fetch_target(target, table_cache, revisions),
+                                            self.targets):
+                    all_results.extend(results)
+        finally:
+            if table_cache is not None:
+                table_cache.close()
+            if revisions is not None:
+                revisions.close()
+        
+        return all_results
+
+    def _fetch_target(self, target: Dict[str, str], table_cache, revisions=None) -> List[Dict]:
+        """获取并解析单个维基百科页面，失败时返回空列表"""
+        if revisions is not None:
+            # 修订号未变时不下载页面；变化时只获取改动的章节
+            try:
+                return revisions.fetch_rows(target['url'], lambda html: self._parse_tables(html, target),
+                                            version=PARSER_VERSION) or []
+            except Exception as e:
+                print(f"[WARN] 修订号接口不可用，整页下载 {target['type']}: {e}")
+        
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
         }
+        try:
+            print(f"[FETCH] 正在获取 {target['brand']} {target['type']} ...")
+            
+            # 1. 通过共享连接池获取 HTML（带浏览器 User-Agent，绕过 403）
+            response = get_transport().get(target['url'], headers=headers, timeout=30)
+            response.raise_for_status() 
+            
+            # 2. wikitable 与上次相同时直接复用上次的解析结果
+            html = response.text
+            if table_cache is None:
+                return self._parse_tables(html, target)
+            return table_cache.parse(target['url'], html, "wikitable",
+                                     lambda: self._parse_tables(html, target), version=PARSER_VERSION)
+            
+        except Exception as e:
+            print(f"[WARN] 处理 {target['type']} 时出错: {e}")
+            return []
+
+    def _parse_tables(self, html: str, target: Dict[str, str]) -> List[Dict]:
+        """按表头特征选出处理器表格，数据行直接标准化"""
+        results = []
+        # 跳过太小的表格
+        tables = extract_wikitables(html, signature=CPU_TABLE_SIGNATURE, min_rows=5, min_cols=3)
         
-        for target in self.targets:
-            try:
-                print(f"[FETCH] 正在获取 {target['brand']} {target['type']} ...")
+        for table in tables:
+            # 尝试查找包含CPU数据的行
+            for row in table.rows:
+                # 检查行中是否包含CPU型号关键词
+                row_str = " ".join(str(cell) for cell in row)
+                if not any(keyword in row_str for keyword in ['Core i', 'Ryzen', 'Processor', 'CPU', 'Model']):
+                    continue
                 
-                # 1. 使用 requests 获取 HTML，绕过 403
-                response = requests.get(target['url'], headers=headers, timeout=30)
-                response.raise_for_status() 
+                # 尝试从行中提取模型名称
+                model = None
+                for cell in row:
+                    cell_str = self._clean(cell)
+                    if (len(cell_str) >= 3 and 
+                        any(keyword in cell_str for keyword in ['Core i', 'Ryzen', 'Xeon', 'Athlon', 'Celeron', 'Pentium']) and
+                        not any(exclude in cell_str for exclude in ['Model', 'Processor', 'Name'])):
+                        model = cell_str
+                        break
                 
-                # 2. 将 HTML 字符串传给 pandas（修复FutureWarning）
-                from io import StringIO
-                tables = pd.read_html(StringIO(response.text))
+                if not model:
+                    continue
                 
-                for df in tables:
-                    # 跳过太小的表格
-                    if df.shape[0] < 5 or df.shape[1] < 3:
-                        continue
-                    
-                    # 尝试查找包含CPU数据的行
-                    for _, row in df.iterrows():
-                        # 检查行中是否包含CPU型号关键词
-                        row_str = " ".join(str(cell) for cell in row)
-                        if not any(keyword in row_str for keyword in ['Core i', 'Ryzen', 'Processor', 'CPU', 'Model']):
-                            continue
-                        
-                        # 尝试从行中提取模型名称
-                        model = None
-                        for cell in row:
-                            cell_str = self._clean(cell)
-                            if (len(cell_str) >= 3 and 
-                                any(keyword in cell_str for keyword in ['Core i', 'Ryzen', 'Xeon', 'Athlon', 'Celeron', 'Pentium']) and
-                                not any(exclude in cell_str for exclude in ['Model', 'Processor', 'Name'])):
-                                model = cell_str
-                                break
-                        
-                        if not model:
-                            continue
-                        
-                        # 解析核心/线程数（从行中查找数字）
-                        cores, threads = 4, 8
-                        for cell in row:
-                            cell_str = self._clean(cell)
-                            if any(keyword in cell_str for keyword in ['core', 'Core', 'thread', 'Thread']):
-                                cores, threads = self._parse_cores_threads(cell_str)
-                                break
-                        
-                        # 构建CPU对象
-                        cpu = {
-                            'id': f"cpu-{hashlib.md5(model.encode()).hexdigest()[:8]}",
-                            'model': model,
-                            'brand': target['brand'],
-                            'releaseDate': self._parse_date_from_row(row),
-                            'price': self.parse_price_from_row(row),
-                            'description': f"{target['brand']} {target['type']} {model}",
-                            'cores': str(cores),
-                            'threads': str(threads),
-                            'baseClock': self._parse_clock_from_row(row, 'base'),
-                            'boostClock': self._parse_clock_from_row(row, 'boost'),
-                            'socket': self._parse_socket_from_row(row),
-                            'tdp': int(self._parse_numeric_from_row(row, 'tdp')),
-                            'cache': int(self._parse_numeric_from_row(row, 'cache')),
-                            'integratedGraphics': self._parse_graphics_from_row(row),
-                            'process': self._parse_process_from_row(row),
-                            'source': 'Wikipedia'
-                        }
-                        
-                        all_results.append(cpu)
-                        
-            except Exception as e:
-                print(f"[WARN] 处理 {target['type']} 时出错: {e}")
+                # 解析核心/线程数（从行中查找数字）
+                cores, threads = 4, 8
+                for cell in row:
+                    cell_str = self._clean(cell)
+                    if any(keyword in cell_str for keyword in ['core', 'Core', 'thread', 'Thread']):
+                        cores, threads = self._parse_cores_threads(cell_str)
+                        break
+                
+                # 构建CPU对象
+                cpu = {
+                    'id': f"cpu-{hashlib.md5(model.encode()).hexdigest()[:8]}",
+                    'model': model,
+                    'brand': target['brand'],
+                    'releaseDate': self._parse_date_from_row(row),
+                    'price': self.parse_price_from_row(row),
+                    'description': f"{target['brand']} {target['type']} {model}",
+                    'cores': str(cores),
+                    'threads': str(threads),
+                    'baseClock': self._parse_clock_from_row(row, 'base'),
+                    'boostClock': self._parse_clock_from_row(row, 'boost'),
+                    'socket': self._parse_socket_from_row(row),
+                    'tdp': int(self._parse_numeric_from_row(row, 'tdp')),
+                    'cache': int(self._parse_numeric_from_row(row, 'cache')),
+                    'integratedGraphics': self._parse_graphics_from_row(row),
+                    'process': self._parse_process_from_row(row),
+                    'source': 'Wikipedia'
+                }
+                
+                results.append(cpu)
         
-        return all_results
+        return results
 
     def _parse_date_from_row(self, row) -> str:
-        """从行中解析发布日期"""
-        for cell in row:
-            cell_str = self._clean(cell)
-            match = re.search(r'(20\d{2})', cell_str)
-            if match:
-                return f"{match.group(1)}-01-01"
-        return "2024-01-01"
+        """从行中解析发布日期（支持完整日期、季度和年份）"""
+        return find_date((self._clean(cell) for cell in row), default="2024-01-01")
     
     def parse_price_from_row(self, row) -> Optional[float]:
         """从行中解析价格"""
@@ -165,17 +215,17 @@ class WikiCpuProductionScraper:
         return None
     
     def _parse_clock_from_row(self, row, clock_type: str) -> float:
-        """从行中解析时钟频率"""
+        """从行中解析时钟频率（基础频率取第一个值，加速频率取第二个值）"""
+        clocks = []
         for cell in row:
             cell_str = self._clean(cell)
             if 'GHz' in cell_str or 'MHz' in cell_str:
-                match = re.search(r'(\d+\.?\d*)\s*(?:GHz|MHz)', cell_str)
-                if match:
-                    value = float(match.group(1))
-                    if 'MHz' in cell_str:
-                        value = value / 1000  # 转换为GHz
-                    return value
-        return 3.0 if clock_type == 'base' else 4.0
+                clocks.extend(v for v in parse_clock_range(cell_str) if v is not None)
+                if len(clocks) >= 2:
+                    break
+        if not clocks:
+            return 3.0 if clock_type == 'base' else 4.0
+        return clocks[0] if clock_type == 'base' or len(clocks) == 1 else clocks[1]
     
     def _parse_socket_from_row(self, row) -> str:
         """从行中解析插槽类型"""
@@ -190,13 +240,13 @@ class WikiCpuProductionScraper:
         for cell in row:
             cell_str = self._clean(cell)
             if field_type == 'tdp' and ('W' in cell_str or 'TDP' in cell_str):
-                match = re.search(r'(\d+)\s*W', cell_str)
-                if match:
-                    return float(match.group(1))
+                value = parse_power(cell_str)
             elif field_type == 'cache' and ('MB' in cell_str or 'Cache' in cell_str):
-                match = re.search(r'(\d+)\s*MB', cell_str)
-                if match:
-                    return float(match.group(1))
+                value = parse_cache(cell_str)
+            else:
+                continue
+            if value is not None:
+                return value
         return 65.0 if field_type == 'tdp' else 16.0
     
     def _parse_graphics_from_row(self, row) -> bool:
@@ -210,19 +260,17 @@ class WikiCpuProductionScraper:
     def _parse_process_from_row(self, row) -> str:
         """从行中解析制程工艺"""
         for cell in row:
-            cell_str = self._clean(cell)
-            if any(keyword in cell_str for keyword in ['nm', 'process', 'Process', 'lithography']):
-                match = re.search(r'(\d+)\s*nm', cell_str)
-                if match:
-                    return f"{match.group(1)} nm"
+            process = parse_process(self._clean(cell))
+            if process is not None:
+                return f"{process:g} nm"
         return "7 nm"
 
     def run(self):
         # 1. 采集
         raw_data = self.fetch_all()
         
-        # 2. 去重
-        unique_data = {item['id']: item for item in raw_data}.values()
+        # 2. 去重（同一ID，以及不同页面中写法不同的同一型号）
+        unique_data = deduplicate_records(list({item['id']: item for item in raw_data}.values()), 'cpu')
         
         print(f"\n[OK] 采集清洗完成: 共 {len(unique_data)} 条记录")
         return list(unique_data)
@@ -6,8 +6,12 @@ CPU数据爬虫模块
 
 import json
 import re
+import sys
 import time
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from typing import List, Dict, Any, Iterator, Optional
+from urllib.parse import urlencode
 from datetime import datetime
 try:
     from web_scraper import HardwareScraper
@@ -17,18 +21,42 @@ except ImportError:
     import os
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
     from web_scraper import HardwareScraper
+try:
+    from unit_parser import parse_clock_range, parse_cache, parse_power
+except ImportError:
+    # 单位解析模块位于 scripts 目录
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from unit_parser import parse_clock_range, parse_cache, parse_power
+from config import TECHPOWERUP_CRAWL_CONFIG
+from table_fingerprint import table_region
+from catalog_db import CatalogDB
+from entity_resolution import deduplicate_records
+from rate_limiter import HostRateLimiter
+
+# 解析器版本：解析逻辑（包括用到的单位、日期解析）变化时递增，使表格缓存中的旧记录失效
+PARSER_VERSION = "2"
 
 
 class CpuScraper(HardwareScraper):
     """CPU数据爬虫 - TechPowerUp版本"""
     
-    def __init__(self):
-        """初始化CPU爬虫"""
+    def __init__(self, full_crawl: Optional[bool] = None):
+        """
+        初始化CPU爬虫
+        
+        Args:
+            full_crawl: 是否按 厂商 × 发布年份 × 细分市场 分区全量采集（默认读取配置）
+        """
         super().__init__(
             category="cpu",
             base_url="https://www.techpowerup.com",
             delay_range=(1, 2)  # TechPowerUp反爬较松
         )
+        self.full_crawl = TECHPOWERUP_CRAWL_CONFIG["full_crawl"] if full_crawl is None else full_crawl
+        # 全量采集中被截断且无法切分完整、或子分区采集失败的分区
+        self.incomplete_partitions: List[Dict[str, Any]] = []
         
         # TechPowerUp CPU数据库页面
         self.cpu_db_url = "/cpu-specs/"
@@ -54,26 +82,50 @@ class CpuScraper(HardwareScraper):
         cpu_data = []
         
         # 从TechPowerUp爬取
-        tp_data = self._scrape_techpowerup()
+        if self.full_crawl:
+            tp_data = self._scrape_techpowerup_full()
+        else:
+            tp_data = self.checkpoint("techpowerup:cpu-specs", self._scrape_techpowerup)
         if tp_data:
             cpu_data.extend(tp_data)
             print(f"✅ 从TechPowerUp爬取到 {len(tp_data)} 个CPU数据")
         
-        # 如果数据不足，使用备用数据源
-        if len(cpu_data) < 20:
+        # 如果数据不足，使用备用数据源；时间预算用尽时不补充，由 update_db 与上次的数据合并
+        if len(cpu_data) < 20 and self.budget_exhausted():
+            print("⏱️  时间预算用尽，不使用备用数据源")
+        elif len(cpu_data) < 20:
             print("⚠️  爬取数据不足，使用备用数据源")
             backup_data = self._get_backup_data()
             cpu_data.extend(backup_data)
         
-        # 去重
+        # 去重（全量采集时是采集结束后对目录库读回的记录单独做的一遍实体识别）
         unique_data = self._deduplicate(cpu_data)
         
         return unique_data
     
+    def _techpowerup_rows(self, html: str, show_headers: bool = False) -> Optional[list]:
+        """从 cpu-specs 列表页中取数据行，失败时返回 None"""
+        soup = self.parse_html(html)
+        if not soup:
+            print("❌ 无法解析TechPowerUp页面")
+            return None
+        
+        # 查找CPU数据表格
+        table = soup.find('table', class_='items-desktop-table')
+        if not table:
+            print("❌ 未找到CPU数据表格")
+            return None
+        
+        # 提取表头
+        thead = table.find('thead')
+        if thead and show_headers:
+            headers = [cell.get_text(strip=True) for cell in thead.find_all('th')]
+            print(f"📊 表格列: {headers}")
+        
+        return table.find_all('tr')[1:]  # 跳过表头
+    
     def _scrape_techpowerup(self) -> List[Dict[str, Any]]:
         """从TechPowerUp爬取CPU数据"""
-        cpu_items = []
-        
         try:
             print(f"📄 获取TechPowerUp CPU数据库页面: {self.cpu_db_url}")
             
@@ -82,58 +134,208 @@ class CpuScraper(HardwareScraper):
             if not html:
                 print("❌ 无法获取TechPowerUp页面")
                 return []
-                
-            soup = self.parse_html(html)
-            if not soup:
-                print("❌ 无法解析TechPowerUp页面")
-                return []
             
-            # 查找CPU数据表格
-            table = soup.find('table', class_='items-desktop-table')
-            if not table:
-                print("❌ 未找到CPU数据表格")
-                return []
-            
-            # 提取表头
-            headers = []
-            thead = table.find('thead')
-            if thead:
-                header_cells = thead.find_all('th')
-                headers = [cell.get_text(strip=True) for cell in header_cells]
-                print(f"📊 表格列: {headers}")
-            
-            # 提取数据行
-            rows = table.find_all('tr')[1:]  # 跳过表头
-            print(f"📈 找到 {len(rows)} 行CPU数据")
-            
-            # 解析每一行
-            for i, row in enumerate(rows[:100]):  # 只取前100个
-                try:
-                    cpu_item = self._parse_techpowerup_row(row)
-                    if cpu_item and self.validate_data(cpu_item):
-                        cpu_items.append(cpu_item)
-                        
-                    # 显示进度
-                    if (i + 1) % 20 == 0:
-                        print(f"  已处理 {i + 1} 个CPU...")
-                        
-                except Exception as e:
-                    print(f"  解析第{i+1}行失败: {e}")
-                    continue
-                    
-                # 避免请求过快
-                if (i + 1) % 10 == 0:
-                    time.sleep(0.5)
-            
-            print(f"✅ 成功解析 {len(cpu_items)} 个CPU数据")
+            # 表格与上次相同时直接复用上次的解析结果
+            return self.parse_table(self.cpu_db_url, html, "techpowerup",
+                                    lambda: self._parse_techpowerup_page(html), PARSER_VERSION) or []
             
         except Exception as e:
             print(f"❌ 爬取TechPowerUp数据失败: {e}")
             import traceback
             traceback.print_exc()
+            return []
+    
+    def _parse_techpowerup_page(self, html: str) -> Optional[List[Dict[str, Any]]]:
+        """解析 cpu-specs 首页表格"""
+        rows = self._techpowerup_rows(html, show_headers=True)
+        if rows is None:
+            return None
+        print(f"📈 找到 {len(rows)} 行CPU数据")
+        
+        cpu_items = []
+        # 解析每一行
+        for i, row in enumerate(rows[:100]):  # 只取前100个
+            try:
+                cpu_item = self._parse_techpowerup_row(row)
+                if cpu_item and self.validate_data(cpu_item):
+                    cpu_items.append(cpu_item)
+                    
+                # 显示进度
+                if (i + 1) % 20 == 0:
+                    print(f"  已处理 {i + 1} 个CPU...")
+                    
+            except Exception as e:
+                print(f"  解析第{i+1}行失败: {e}")
+                continue
+                
+            # 避免请求过快
+            if (i + 1) % 10 == 0:
+                time.sleep(0.5)
         
+        print(f"✅ 成功解析 {len(cpu_items)} 个CPU数据")
         return cpu_items
     
+    def iter_techpowerup_partitions(self) -> Iterator[Dict[str, Any]]:
+        """
+        生成分区查询参数：厂商 × 发布年份 × 细分市场
+        
+        单个列表页只显示部分结果，按过滤条件切分查询空间后每个分区都足够小，合起来覆盖全库
+        """
+        config = TECHPOWERUP_CRAWL_CONFIG
+        # 新年份的型号最多，最先采集
+        for year in range(date.today().year, config["first_year"] - 1, -1):
+            for manufacturer in config["manufacturers"]:
+                for segment in config["segments"]:
+                    yield {"mfgr": manufacturer, "released": str(year), **segment, "sort": "name"}
+    
+    def _scrape_partition(self, params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        采集单个分区，请求失败时返回 None
+        
+        列表页被截断时按 split_filters 中下一个过滤条件切分后逐个采集子分区；无法继续切分、
+        子分区采集失败或子分区没有覆盖列表页上的全部型号时，把该分区记为不完整。
+        """
+        page = self.checkpoint("techpowerup-page:" + "&".join(f"{k}={v}" for k, v in params.items()),
+                               lambda: self._scrape_partition_page(params))
+        if page is None:
+            return None
+        if not page["truncated"]:
+            return page["items"]
+        
+        split = next(((name, values) for name, values in TECHPOWERUP_CRAWL_CONFIG["split_filters"]
+                      if name not in params), None)
+        if split is None:
+            self._mark_partition_incomplete(params, "已没有可继续切分的过滤条件")
+            return page["items"]
+        name, values = split
+        print(f"✂️  分区 {params} 被截断，按 {name} 切分为 {len(values)} 个子分区")
+        merged = {}
+        for value in values:
+            sub_items = self._scrape_partition({**params, name: value})
+            if sub_items is None:
+                self._mark_partition_incomplete({**params, name: value}, "子分区采集失败")
+                continue
+            for item in sub_items:
+                merged.setdefault(item['id'], item)
+        # 列表页上显示的型号应全部出现在某个子分区中，否则切分取值不全（如新的核心数），子分区之外还有型号
+        missing = [item for item in page["items"] if item['id'] not in merged]
+        if missing:
+            self._mark_partition_incomplete(params, f"{len(missing)} 个型号不在任何 {name} 子分区中")
+            for item in missing:
+                merged[item['id']] = item
+        return list(merged.values())
+    
+    def _scrape_partition_page(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        获取并解析单个分区的列表页
+        
+        Returns:
+            {"items": 记录列表, "truncated": 行数是否达到列表页上限}；请求或解析失败时返回 None
+        """
+        html = self.fetch_page(self.cpu_db_url, params=params)
+        if not html:
+            print(f"❌ 无法获取分区页面: {params}")
+            return None
+        items = self.parse_table(f"{self.cpu_db_url}?{urlencode(params)}", html, "techpowerup",
+                                 lambda: self._parse_partition_page(html, params), PARSER_VERSION)
+        if items is None:
+            return None
+        # 行数按表格片段的字符串扫描计算，表格缓存命中、跳过解析时同样可用
+        region = table_region(html, "table", "items-desktop-table")
+        rows = max(region.lower().count("<tr") - 1, 0)  # 去掉表头行
+        return {"items": items, "truncated": rows >= TECHPOWERUP_CRAWL_CONFIG["partition_max_rows"]}
+    
+    def _mark_partition_incomplete(self, params: Dict[str, Any], reason: str) -> None:
+        """
+        记录没有完整采集的分区
+        
+        与时间预算用尽一样标记当前预算，update_db 会把本次结果与上次的数据合并，
+        缺失分区中的型号不会因此被删除。
+        """
+        print(f"❌ 分区 {params} 采集不完整: {reason}")
+        self.incomplete_partitions.append(params)
+        deadline = self.active_deadline()
+        if deadline is not None:
+            deadline.mark_exhausted()
+    
+    def _parse_partition_page(self, html: str, params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """解析单个分区的列表页"""
+        rows = self._techpowerup_rows(html)
+        if rows is None:
+            return None
+        
+        cpu_items = []
+        for row in rows:
+            try:
+                cpu_item = self._parse_techpowerup_row(row)
+                if cpu_item and self.validate_data(cpu_item):
+                    cpu_items.append(cpu_item)
+            except Exception as e:
+                print(f"  解析分区 {params} 的行失败: {e}")
+        return cpu_items
+    
+    def iter_techpowerup_full(self, max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        分区并发全量采集 TechPowerUp，逐条产出跨分区去重后的记录
+        
+        所有分区共用一个按主机限速器；每个列表页（包括切分出的子分区）是一个断点续传单元。
+        
+        Args:
+            max_workers: 并发采集的分区数（默认读取配置）
+            
+        Yields:
+            CPU数据（分区完成顺序）
+        """
+        config = TECHPOWERUP_CRAWL_CONFIG
+        if self.rate_limiter is None:
+            self.rate_limiter = HostRateLimiter(config["min_interval"], config["jitter"])
+        partitions = list(self.iter_techpowerup_partitions())
+        self.incomplete_partitions = []
+        workers = max_workers or config["max_workers"]
+        print(f"🧩 TechPowerUp 全量采集: {len(partitions)} 个分区，{workers} 个线程")
+        
+        seen_ids = set()
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self._scrape_partition, params): params for params in partitions}
+            for future in as_completed(futures):
+                done += 1
+                try:
+                    items = future.result() or []
+                except Exception as e:
+                    print(f"❌ 分区 {futures[future]} 采集失败: {e}")
+                    continue
+                for item in items:
+                    # 同一型号可能出现在多个分区（如既是移动版又是服务器版）
+                    if item['id'] in seen_ids:
+                        continue
+                    seen_ids.add(item['id'])
+                    yield item
+                if done % 20 == 0:
+                    print(f"  已完成 {done}/{len(partitions)} 个分区，累计 {len(seen_ids)} 个CPU")
+        
+        if self.incomplete_partitions:
+            print(f"❌ 全量采集不完整: {len(self.incomplete_partitions)} 个分区的结果被截断或缺失，"
+                  f"共采集 {len(seen_ids)} 个CPU")
+        else:
+            print(f"✅ 全量采集完成: {len(seen_ids)} 个CPU")
+    
+    def _scrape_techpowerup_full(self) -> List[Dict[str, Any]]:
+        """
+        分区全量采集，分区完成即分批 upsert 到暂存目录库，采集过程中不在内存中累积结果
+        
+        Returns:
+            本次写入目录库的记录（尚未做实体识别去重）
+        """
+        config = TECHPOWERUP_CRAWL_CONFIG
+        started = time.time()
+        with CatalogDB(config["catalog_path"]) as catalog:
+            written = catalog.upsert_many(self.category, self.iter_techpowerup_full(),
+                                          config["catalog_batch_size"])
+            print(f"🗂️  已写入目录库 {written} 条: {catalog.path}")
+            # 只读回本次写入的记录：以前采集到、本次没有出现的型号不混入结果
+            return list(catalog.iter_records(self.category, source='TechPowerUp', updated_since=started))
+    
     def _parse_techpowerup_row(self, row) -> Optional[Dict[str, Any]]:
         """解析TechPowerUp表格行"""
         try:
@@ -250,62 +452,25 @@ class CpuScraper(HardwareScraper):
     
     def _parse_clock_text(self, clock_text: str) -> Dict[str, float]:
         """解析时钟频率文本"""
-        # 格式: "3.4 to 4.6 GHz" 或 "3.6-4.2 GHz"
-        try:
-            # 提取所有数字
-            numbers = re.findall(r'\d+\.?\d*', clock_text)
-            if len(numbers) >= 2:
-                base = float(numbers[0])
-                boost = float(numbers[1])
-            elif len(numbers) == 1:
-                base = float(numbers[0])
-                boost = base * 1.2  # 估算睿频
-            else:
-                base = 3.0
-                boost = 4.0
-            
-            # 检查单位
-            if 'MHZ' in clock_text.upper():
-                base = base / 1000
-                boost = boost / 1000
-                
-        except:
-            base = 3.0
-            boost = 4.0
-        
+        # 格式: "3.4 to 4.6 GHz" 或 "3.6-4.2 GHz"，无单位时按 GHz 处理
+        base, boost = parse_clock_range(clock_text, default_unit='GHz')
+        if base is None and boost is None:
+            return {'base': 3.0, 'boost': 4.0}
+        if base is None:
+            base = boost / 1.2  # 只有 "up to" 加速频率时估算基础频率
+        if boost is None:
+            boost = base * 1.2  # 估算睿频
         return {'base': base, 'boost': boost}
     
     def _parse_cache_text(self, cache_text: str) -> float:
-        """解析缓存文本"""
-        try:
-            # 提取数字
-            numbers = re.findall(r'\d+\.?\d*', cache_text)
-            if numbers:
-                cache = float(numbers[0])
-                # 检查单位
-                if 'KB' in cache_text.upper():
-                    cache = cache / 1024  # KB转MB
-                elif 'GB' in cache_text.upper():
-                    cache = cache * 1024  # GB转MB
-                return cache
-        except:
-            pass
-        
-        # 默认值
-        return 8.0
+        """解析缓存文本（MB）"""
+        cache = parse_cache(cache_text, default_unit='MB')
+        return cache if cache is not None else 8.0
     
     def _parse_tdp_text(self, tdp_text: str) -> int:
         """解析TDP文本"""
-        try:
-            # 提取数字
-            numbers = re.findall(r'\d+', tdp_text)
-            if numbers:
-                return int(numbers[0])
-        except:
-            pass
-        
-        # 默认值
-        return 65
+        tdp = parse_power(tdp_text, default_unit='W')
+        return int(tdp) if tdp is not None else 65
     
     def _estimate_price(self, model: str, brand: str, cores: int) -> float:
         """估算价格"""
@@ -494,7 +659,7 @@ class CpuScraper(HardwareScraper):
         return backup_cpus
     
     def _deduplicate(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """去重数据（基于ID）"""
+        """去重数据（先按ID，再合并不同写法的同一型号）"""
         seen_ids = set()
         unique_data = []
         
@@ -504,7 +669,7 @@ class CpuScraper(HardwareScraper):
                 seen_ids.add(item_id)
                 unique_data.append(item)
         
-        return unique_data
+        return deduplicate_records(unique_data, 'cpu')
     
     def normalize_data(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """标准化数据格式"""
@@ -513,17 +678,26 @@ class CpuScraper(HardwareScraper):
         return raw_data
 
 
-def run() -> List[Dict[str, Any]]:
+def run(resume: bool = False, full_crawl: Optional[bool] = None, deadline=None) -> List[Dict[str, Any]]:
     """
     运行CPU数据爬取
     
+    Args:
+        resume: 是否从上次中断处继续
+        full_crawl: 是否分区全量采集（默认读取配置）
+        deadline: 时间预算（deadline.Deadline），用尽时返回已经拿到的数据
+        
     Returns:
         CPU数据列表，每个CPU是一个字典
     """
     print("🔍 开始爬取CPU数据...")
     
-    scraper = CpuScraper()
-    cpu_data = scraper.run()
+    scraper = CpuScraper(full_crawl=full_crawl)
+    cpu_data = scraper.run(resume=resume, deadline=deadline)
+    if not cpu_data:
+        # 时间预算用尽时不补充备用数据，结果可能为空
+        print("⚠️  没有爬取到CPU数据")
+        return cpu_data
     
     # 数据统计
     intel_count = len([c for c in cpu_data if c['brand'] == 'Intel'])
@@ -561,7 +735,7 @@ def run() -> List[Dict[str, Any]]:
 
 if __name__ == "__main__":
     # 测试运行
-    data = run()
+    data = run(resume='--resume' in sys.argv, full_crawl=True if '--full' in sys.argv else None)
     print(f"爬取到{len(data)}个CPU数据")
     if data:
         print("第一个CPU:", json.dumps(data[0], ensure_ascii=False, indent=2))
@@ -29,22 +29,28 @@ except ImportError as e:
     HAS_SCRAPER = False
 
 
-def get_gpu_data_from_source() -> List[Dict[str, Any]]:
+def get_gpu_data_from_source(deadline=None) -> List[Dict[str, Any]]:
     """
     从数据源获取GPU数据
     
+    Args:
+        deadline: 时间预算（deadline.Deadline），用尽时爬虫返回已经拿到的数据
+        
     Returns:
         GPU数据列表
     """
     if HAS_SCRAPER:
         try:
             # 使用真正的爬虫获取数据
-            return run_gpu_scraper()
+            return run_gpu_scraper(deadline=deadline)
         except Exception as e:
             print(f"⚠️  爬虫运行失败: {e}")
             print("⚠️  使用备用数据")
     
-    # 备用数据（当爬虫失败时使用）
+    # 备用数据（当爬虫失败时使用）；时间预算用尽时返回空列表，update_db 保留上次的数据
+    if deadline is not None and deadline.exhausted:
+        print("⏱️  时间预算用尽，不使用备用数据")
+        return []
     return get_backup_gpu_data()
 
 
@@ -195,10 +201,13 @@ def validate_gpu_data(data: List[Dict[str, Any]]) -> bool:
     return True
 
 
-def run() -> List[Dict[str, Any]]:
+def run(deadline=None) -> List[Dict[str, Any]]:
     """
     运行GPU数据采集
     
+    Args:
+        deadline: 时间预算（deadline.Deadline）
+        
     Returns:
         GPU数据列表
     """
@@ -215,8 +224,12 @@ def run() -> List[Dict[str, Any]]:
     print("\n📊 开始采集GPU数据...")
     
     # 获取数据
-    gpu_data = get_gpu_data_from_source()
-    
+    gpu_data = get_gpu_data_from_source(deadline)
+    if not gpu_data:
+        # 时间预算用尽时不使用备用数据，结果可能为空；由 update_db 继续使用上次的数据
+        print("⚠️  没有采集到GPU数据")
+        return gpu_data
+
     # 验证数据
     if not validate_gpu_data(gpu_data):
         print("⚠️  数据验证失败，但仍返回数据")
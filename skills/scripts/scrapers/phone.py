@@ -29,22 +29,28 @@ except ImportError as e:
     HAS_SCRAPER = False
 
 
-def get_phone_data_from_source() -> List[Dict[str, Any]]:
+def get_phone_data_from_source(deadline=None) -> List[Dict[str, Any]]:
     """
     从数据源获取手机数据
     
+    Args:
+        deadline: 时间预算（deadline.Deadline），用尽时爬虫返回已经拿到的数据
+        
     Returns:
         手机数据列表
     """
     if HAS_SCRAPER:
         try:
             # 使用真正的爬虫获取数据
-            return run_phone_scraper()
+            return run_phone_scraper(deadline=deadline)
         except Exception as e:
             print(f"⚠️  爬虫运行失败: {e}")
             print("⚠️  使用备用数据")
     
-    # 备用数据（当爬虫失败时使用）
+    # 备用数据（当爬虫失败时使用）；时间预算用尽时返回空列表，update_db 保留上次的数据
+    if deadline is not None and deadline.exhausted:
+        print("⏱️  时间预算用尽，不使用备用数据")
+        return []
     return get_backup_phone_data()
 
 
@@ -207,10 +213,13 @@ def validate_phone_data(data: List[Dict[str, Any]]) -> bool:
     return True
 
 
-def run() -> List[Dict[str, Any]]:
+def run(deadline=None) -> List[Dict[str, Any]]:
     """
     运行手机数据采集
     
+    Args:
+        deadline: 时间预算（deadline.Deadline）
+        
     Returns:
         手机数据列表
     """
@@ -227,7 +236,7 @@ def run() -> List[Dict[str, Any]]:
     print("\n📊 开始采集手机数据...")
     
     # 获取数据
-    phone_data = get_phone_data_from_source()
+    phone_data = get_phone_data_from_source(deadline)
     
     # 验证数据
     if not validate_phone_data(phone_data):
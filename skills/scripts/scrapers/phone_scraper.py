@@ -6,8 +6,9 @@
 
 import json
 import re
+import sys
 import time
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional
 from datetime import datetime
 try:
     from web_scraper import HardwareScraper
@@ -17,6 +18,10 @@ except ImportError:
     import os
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
     from web_scraper import HardwareScraper
+from rate_limiter import open_shared_rate_limiter
+
+# 解析器版本：解析逻辑（包括用到的单位、日期解析）变化时递增，使表格缓存中的旧记录失效
+PARSER_VERSION = "1"
 
 
 class PhoneScraper(HardwareScraper):
@@ -27,7 +32,9 @@ class PhoneScraper(HardwareScraper):
         super().__init__(
             category="phone",
             base_url="https://search.jd.com",
-            delay_range=(2, 5)
+            delay_range=(2, 5),
+            # 与其他京东爬虫（含其他进程）共用 search.jd.com 的自适应令牌桶
+            rate_limiter=open_shared_rate_limiter()
         )
         
         # 手机搜索关键词
@@ -79,75 +86,87 @@ class PhoneScraper(HardwareScraper):
             r'([A-Za-z]+\s*[\d]+\s*[A-Za-z]*\s*手机)',  # 通用手机模式
         ]
     
-    def scrape(self) -> List[Dict[str, Any]]:
+    def iter_scrape(self) -> Iterator[Dict[str, Any]]:
         """
-        爬取手机数据
+        逐条产出手机数据（每个关键词的结果一到就交给下游）
         
-        Returns:
-            手机数据列表
+        Yields:
+            手机数据记录
         """
-        phone_data = []
+        jd_count = 0
         
         # 尝试从京东爬取
-        jd_data = self._scrape_jd()
-        if jd_data:
-            phone_data.extend(jd_data)
-            print(f"✅ 从京东爬取到 {len(jd_data)} 个手机数据")
-        
-        # 如果数据不足，使用备用数据源
-        if len(phone_data) < 8:
+        for item in self._iter_jd():
+            jd_count += 1
+            yield item
+        if jd_count:
+            print(f"✅ 从京东爬取到 {jd_count} 个手机数据")
+        
+        # 如果数据不足，使用备用数据源；时间预算用尽时不补充，由 update_db 与上次的数据合并
+        if jd_count < 8 and self.budget_exhausted():
+            print("⏱️  时间预算用尽，不使用备用数据源")
+        elif jd_count < 8:
             print("⚠️  爬取数据不足，使用备用数据源")
-            backup_data = self._get_backup_data()
-            phone_data.extend(backup_data)
-        
-        # 去重
-        unique_data = self._deduplicate(phone_data)
-        
-        return unique_data
+            yield from self._get_backup_data()
     
-    def _scrape_jd(self) -> List[Dict[str, Any]]:
+    def _iter_jd(self) -> Iterator[Dict[str, Any]]:
         """从京东爬取手机数据"""
-        phone_items = []
-        
         for keyword in self.search_keywords[:3]:  # 先试前三个关键词
-            try:
-                print(f"🔍 正在搜索京东: {keyword}")
-                
-                # 构建搜索URL
-                params = {
-                    'keyword': keyword,
-                    'enc': 'utf-8',
-                    'wq': keyword,
-                    'pvid': self._generate_pvid()
-                }
-                
-                # 获取搜索页面
-                html = self.fetch_page("/Search", params=params)
-                if not html:
-                    continue
-                    
-                soup = self.parse_html(html)
-                if not soup:
-                    continue
-                
-                # 提取商品列表
-                items = soup.select('.gl-item')
-                print(f"  找到 {len(items)} 个商品")
-                
-                for item in items[:15]:  # 每个关键词最多处理15个商品
-                    try:
-                        phone_item = self._parse_jd_item(item)
-                        if phone_item and self.validate_data(phone_item):
-                            phone_items.append(phone_item)
-                    except Exception as e:
-                        print(f"  解析商品失败: {e}")
-                        continue
-                        
-                # 避免请求过快
+            # 每个关键词是一个断点续传单元
+            keyword_items = self.checkpoint(f"jd:{keyword}", lambda: self._scrape_jd_keyword(keyword))
+            if keyword_items:
+                yield from keyword_items
+    
+    def _scrape_jd_keyword(self, keyword: str) -> Optional[List[Dict[str, Any]]]:
+        """搜索单个关键词，请求失败时返回 None"""
+        try:
+            print(f"🔍 正在搜索京东: {keyword}")
+            
+            # 构建搜索URL
+            params = {
+                'keyword': keyword,
+                'enc': 'utf-8',
+                'wq': keyword,
+                'pvid': self._generate_pvid()
+            }
+            
+            # 获取搜索页面
+            html = self.fetch_page("/Search", params=params)
+            if not html:
+                return None
+            
+            # 商品列表与上次相同时直接复用上次的解析结果（pvid 每次随机，不计入页面键）
+            phone_items = self.parse_table(f"jd:{self.category}:{keyword}", html, "jd",
+                                         lambda: self._parse_jd_page(html), PARSER_VERSION)
+            
+            # 避免请求过快（使用共享限速器时由限速器控制节奏）
+            if self.rate_limiter is None:
                 time.sleep(3)
-                
+            
+        except Exception as e:
+            print(f"搜索 {keyword} 失败: {e}")
+            return None
+        
+        return phone_items
+    
+    def _parse_jd_page(self, html: str) -> Optional[List[Dict[str, Any]]]:
+        """解析京东搜索结果页"""
+        soup = self.parse_html(html)
+        if not soup:
+            return None
+        
+        # 提取商品列表
+        items = soup.select('.gl-item')
+        print(f"  找到 {len(items)} 个商品")
+        
+        phone_items = []
+        for item in items[:15]:  # 每个关键词最多处理15个商品
+            try:
+                phone_item = self._parse_jd_item(item)
+                if phone_item and self.validate_data(phone_item):
+                    phone_items.append(phone_item)
             except Exception as e:
-                print(f"搜索 {keyword} 失败: {e}")
+                print(f"  解析商品失败: {e}")
                 continue
         
         return phone_items
@@ -648,19 +667,6 @@ class PhoneScraper(HardwareScraper):
         ]
         return backup_phones
     
-    def _deduplicate(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """去重数据（基于ID）"""
-        seen_ids = set()
-        unique_data = []
-        
-        for item in data:
-            item_id = item.get('id')
-            if item_id and item_id not in seen_ids:
-                seen_ids.add(item_id)
-                unique_data.append(item)
-        
-        return unique_data
-    
     def normalize_data(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """标准化数据格式"""
         # 这里可以添加数据清洗和标准化逻辑
@@ -668,17 +674,21 @@ class PhoneScraper(HardwareScraper):
         return raw_data
 
 
-def run() -> List[Dict[str, Any]]:
+def run(resume: bool = False, deadline=None) -> List[Dict[str, Any]]:
     """
     运行手机数据爬取
     
+    Args:
+        resume: 是否从上次中断处继续
+        deadline: 时间预算（deadline.Deadline），用尽时返回已经拿到的数据
+        
     Returns:
         手机数据列表
     """
     print("🔍 开始爬取手机数据...")
     
     scraper = PhoneScraper()
-    phone_data = scraper.run()
+    phone_data = scraper.run(resume=resume, deadline=deadline)
     
     # 数据统计
     brand_stats = {}
@@ -719,7 +729,7 @@ def run() -> List[Dict[str, Any]]:
 
 if __name__ == "__main__":
     # 测试运行
-    data = run()
+    data = run(resume='--resume' in sys.argv)
     print(f"爬取到{len(data)}个手机数据")
     if data:
         print("第一个手机:", json.dumps(data[0], ensure_ascii=False, indent=2))
@@ -4,14 +4,26 @@
 提供HTTP请求、HTML解析、数据提取等通用功能
 """
 
-import requests
 import time
 import random
-from typing import Dict, List, Any, Optional
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional, Union
 from urllib.parse import urljoin, urlparse
 import logging
 from bs4 import BeautifulSoup
 import json
+try:
+    from crawl_journal import CrawlJournal, journal_path
+except ImportError:
+    # 断点续传日志模块位于 scripts 目录
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from crawl_journal import CrawlJournal, journal_path
+from table_fingerprint import TableCache, open_table_cache
+from json_stream import write_json_items
+from http_transport import CircuitOpenError, Transport, TransportError, TransportTimeout, get_transport
+from deadline import Deadline, DeadlineExceeded, current_deadline
 
 # 配置日志
 logging.basicConfig(
@@ -25,7 +37,8 @@ class WebScraper:
     """通用网页爬虫类"""
     
     def __init__(self, base_url: str = "", headers: Optional[Dict] = None, 
-                 delay_range: tuple = (1, 3), max_retries: int = 3):
+                 delay_range: tuple = (1, 3), max_retries: int = 3, rate_limiter=None,
+                 transport: Optional[Transport] = None):
         """
         初始化爬虫
         
@@ -34,24 +47,46 @@ class WebScraper:
             headers: HTTP请求头
             delay_range: 请求延迟范围（秒）
             max_retries: 最大重试次数
+            rate_limiter: 按主机限速器（HostRateLimiter 或跨进程共享的 SharedRateLimiter），
+                设置后代替随机延迟，并在每次响应后调用其 report() 调整速率
+            transport: HTTP 传输层，默认使用进程内共享的连接池（http_transport.get_transport）
         """
         self.base_url = base_url
-        self.session = requests.Session()
+        self.transport = transport or get_transport()
         self.headers = headers or {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
         }
-        self.session.headers.update(self.headers)
         self.delay_range = delay_range
         self.max_retries = max_retries
+        self.rate_limiter = rate_limiter
+        # 时间预算（HardwareScraper.run 传入；未设置时使用 deadline.activate() 生效的当前预算）
+        self.deadline: Optional[Deadline] = None
         
-    def _random_delay(self):
-        """随机延迟，避免被网站封禁"""
-        delay = random.uniform(*self.delay_range)
-        time.sleep(delay)
+    def active_deadline(self) -> Optional[Deadline]:
+        """本爬虫受限的时间预算"""
+        return self.deadline or current_deadline()
+    
+    def budget_exhausted(self) -> bool:
+        """时间预算是否曾经不足（已采集的数据不完整，不应再补充内置的备用数据）"""
+        deadline = self.active_deadline()
+        return deadline is not None and deadline.exhausted
+        
+    def _random_delay(self, url: Optional[str] = None):
+        """随机延迟，避免被网站封禁；设置了限速器时按主机排队（等待时间计入传输层的礼貌等待指标）"""
+        if self.rate_limiter is not None and url:
+            waited = self.rate_limiter.acquire(url)
+        else:
+            waited = random.uniform(*self.delay_range)
+            time.sleep(waited)
+        if url:
+            self.transport.metrics.record_sleep(url, waited)
+        
+    def _report(self, url: str, status: Optional[int], latency: float, retry_after: Optional[str] = None):
+        """把响应结果反馈给限速器（未设置限速器时忽略）"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.report(url, status=status, latency=latency, retry_after=retry_after)
         
     def fetch_page(self, url: str, params: Optional[Dict] = None, 
                    method: str = 'GET', data: Optional[Dict] = None) -> Optional[str]:
@@ -68,31 +103,55 @@ class WebScraper:
             网页HTML内容或None
         """
         full_url = urljoin(self.base_url, url) if self.base_url else url
+        if method.upper() not in ('GET', 'POST'):
+            raise ValueError(f"不支持的HTTP方法: {method}")
+        if self.transport.circuit_open(full_url):
+            # 主机连续失败已熔断：不再等待、重试，直接交给调用方退回备用数据
+            logger.warning(f"主机熔断中，跳过请求: {full_url}")
+            return None
+        deadline = self.active_deadline()
+        if deadline is not None and deadline.low():
+            # 时间预算即将用尽：不再发起新请求，调用方返回已经拿到的数据
+            deadline.mark_exhausted()
+            logger.warning(f"时间预算即将用尽，跳过请求: {full_url}")
+            return None
         
         for attempt in range(self.max_retries):
+            started = None
             try:
-                self._random_delay()
+                self._random_delay(full_url)
+                started = time.monotonic()
                 
-                if method.upper() == 'GET':
-                    response = self.session.get(full_url, params=params, timeout=10)
-                elif method.upper() == 'POST':
-                    response = self.session.post(full_url, data=data, timeout=10)
-                else:
-                    raise ValueError(f"不支持的HTTP方法: {method}")
+                # 重试与退避由本方法结合限速器处理，传输层不再重试
+                response = self.transport.request(method, full_url, params=params, data=data,
+                                                  headers=self.headers, timeout=10, retries=0,
+                                                  deadline=deadline)
                 
+                self._report(full_url, response.status_code, time.monotonic() - started,
+                             response.headers.get('Retry-After'))
                 response.raise_for_status()
                 
-                # 检查编码
-                if response.encoding is None:
-                    response.encoding = 'utf-8'
-                    
                 logger.info(f"成功获取页面: {full_url} (状态码: {response.status_code})")
                 return response.text
                 
-            except requests.exceptions.RequestException as e:
+            except (CircuitOpenError, DeadlineExceeded) as e:
+                # 重试过程中熔断器打开（或其他进程正在探测），或等待期间预算用尽
+                logger.warning(f"{e}")
+                return None
+            except TransportError as e:
+                if isinstance(e, TransportTimeout) and started is not None:
+                    # 超时同样视为主机过载（DNS、连接被拒等错误与主机负载无关，不调整速率）
+                    self._report(full_url, None, time.monotonic() - started)
                 logger.warning(f"第{attempt + 1}次尝试失败: {e}")
                 if attempt < self.max_retries - 1:
+                    if self.rate_limiter is not None:
+                        # 限速器已按响应减速（含 Retry-After），下次 acquire 时等待
+                        continue
                     wait_time = 2 ** attempt  # 指数退避
+                    if deadline is not None and wait_time >= deadline.remaining() - deadline.reserve:
+                        deadline.mark_exhausted()
+                        logger.warning(f"时间预算不足以再次重试: {full_url}")
+                        break
                     logger.info(f"等待{wait_time}秒后重试...")
                     time.sleep(wait_time)
                 else:
@@ -288,15 +347,39 @@ class HardwareScraper(WebScraper):
         super().__init__(**kwargs)
         self.category = category
         self.data = []
+        self.journal: Optional[CrawlJournal] = None
+        self.table_cache: Optional[TableCache] = None
         
+    def iter_scrape(self) -> Iterator[Dict[str, Any]]:
+        """
+        逐条产出爬取的数据（子类实现 iter_scrape 或 scrape 之一）
+        
+        默认从 scrape() 的结果中逐条产出，只实现了 scrape 的旧子类不需要修改。
+        
+        Yields:
+            数据记录
+        """
+        if type(self).scrape is HardwareScraper.scrape:
+            raise NotImplementedError("子类必须实现iter_scrape或scrape方法")
+        yield from self.scrape()
+    
     def scrape(self) -> List[Dict[str, Any]]:
         """
-        爬取数据（子类需要实现）
+        爬取数据（默认收集 iter_scrape() 的结果并按ID去重）
         
         Returns:
             爬取的数据列表
         """
-        raise NotImplementedError("子类必须实现scrape方法")
+        if type(self).iter_scrape is HardwareScraper.iter_scrape:
+            raise NotImplementedError("子类必须实现iter_scrape或scrape方法")
+        seen_ids = set()
+        unique_data = []
+        for item in self.iter_scrape():
+            item_id = item.get('id')
+            if item_id and item_id not in seen_ids:
+                seen_ids.add(item_id)
+                unique_data.append(item)
+        return unique_data
     
     def normalize_data(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -339,6 +422,46 @@ class HardwareScraper(WebScraper):
             
         return True
     
+    def checkpoint(self, unit: str, produce) -> Any:
+        """
+        以断点续传日志包装一个工作单元（如一个搜索关键词、一个列表页）
+
+        Args:
+            unit: 单元标识
+            produce: 无参函数，返回该单元的采集结果
+
+        Returns:
+            日志中已完成时直接返回记录的结果，否则执行 produce() 并在结果非空时记入日志
+        """
+        if self.journal is None:
+            return produce()
+        if self.journal.is_done(unit):
+            logger.info(f"断点续传，跳过已完成单元: {unit}")
+            return self.journal.get(unit)
+        result = produce()
+        # 空结果通常意味着请求失败，不记入日志，续传时重试
+        if result:
+            self.journal.record(unit, result, kind=self.category)
+        return result
+    
+    def parse_table(self, key: str, html: str, region: str, parse, version: str = "") -> Any:
+        """
+        表格区域指纹未变化时复用上次的记录，跳过解析和校验
+
+        Args:
+            key: 页面键（URL 和影响结果的查询参数）
+            html: 页面 HTML
+            region: 表格区域名（见 TABLE_CACHE_CONFIG["regions"]）
+            parse: 无参函数，返回解析、校验后的记录，失败时返回 None
+            version: 解析器版本（子类模块的 PARSER_VERSION），变化时旧记录失效
+
+        Returns:
+            记录列表
+        """
+        if self.table_cache is None:
+            return parse()
+        return self.table_cache.parse(key, html, region, parse, version)
+    
     def generate_id(self, model: str, brand: str) -> str:
         """
         生成唯一ID
@@ -356,33 +479,86 @@ class HardwareScraper(WebScraper):
         id_hash = hashlib.md5(id_str.encode()).hexdigest()[:8]
         return f"{self.category}-{id_hash}"
     
-    def run(self) -> List[Dict[str, Any]]:
+    def iter_run(self, resume: bool = False, deadline: Optional[Deadline] = None) -> Iterator[Dict[str, Any]]:
         """
-        运行爬虫
+        流式运行爬虫：边爬取边验证，按ID去重后逐条产出有效数据
         
-        Returns:
-            爬取的数据列表
+        断点续传日志和表格缓存在迭代期间保持打开；只有完整迭代结束才标记日志完成，
+        调用方提前停止迭代时，下次可以用 resume 继续。时间预算用尽时 fetch_page 不再发起请求，
+        爬虫返回已经拿到的数据，日志同样不标记完成。
+        
+        Args:
+            resume: 是否从上次中断处继续（回放 .cache/journals/<category>.jsonl）
+            deadline: 时间预算，默认 deadline.current_deadline()
+            
+        Yields:
+            通过验证的数据记录
         """
         logger.info(f"开始爬取{self.category}数据...")
         
+        self.deadline = deadline
+        self.journal = CrawlJournal(journal_path(self.category), resume=resume)
+        self.table_cache = open_table_cache()
+        seen_ids = set()
+        total = 0
         try:
-            self.data = self.scrape()
-            
-            # 验证数据
-            valid_data = []
-            for item in self.data:
-                if self.validate_data(item):
-                    valid_data.append(item)
-                else:
+            for item in self.iter_scrape():
+                total += 1
+                if not self.validate_data(item):
                     logger.warning(f"数据验证失败: {item.get('model', 'unknown')}")
+                    continue
+                if item['id'] in seen_ids:
+                    continue
+                seen_ids.add(item['id'])
+                yield item
+            if self.budget_exhausted():
+                logger.warning(f"时间预算用尽，返回部分数据：共获取{total}条数据，有效{len(seen_ids)}条")
+            else:
+                self.journal.finish()
+                logger.info(f"爬取完成，共获取{total}条数据，有效{len(seen_ids)}条")
+        finally:
+            self.journal.close()
+            self.journal = None
+            if self.table_cache is not None:
+                self.table_cache.close()
+                self.table_cache = None
+    
+    def run(self, resume: bool = False, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """
+        运行爬虫（iter_run 的列表形式，保留给旧调用方）
+        
+        Args:
+            resume: 是否从上次中断处继续（回放 .cache/journals/<category>.jsonl）
+            deadline: 时间预算，用尽时返回已经拿到的数据
             
-            logger.info(f"爬取完成，共获取{len(self.data)}条数据，有效{len(valid_data)}条")
-            return valid_data
-            
+        Returns:
+            爬取的数据列表
+        """
+        try:
+            self.data = list(self.iter_run(resume=resume, deadline=deadline))
+            return self.data
         except Exception as e:
             logger.error(f"爬取{self.category}数据失败: {e}")
             return []
-
+    
+    def run_to_file(self, path: Union[str, Path], resume: bool = False,
+                    deadline: Optional[Deadline] = None) -> int:
+        """
+        流式运行爬虫并逐条写出 JSON 文件（全部完成后才替换目标文件）
+        
+        Args:
+            path: 输出文件路径
+            resume: 是否从上次中断处继续
+            deadline: 时间预算
+            
+        Returns:
+            写出的记录数；失败时返回 -1，目标文件保持原样
+        """
+        try:
+            return write_json_items(self.iter_run(resume=resume, deadline=deadline), path)
+        except Exception as e:
+            logger.error(f"爬取{self.category}数据失败: {e}")
+            return -1
 
 if __name__ == "__main__":
     # 测试爬虫
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+数据表格区域指纹缓存
+重新抓取的页面里，真正需要的数据表格（TechPowerUp 的 items-desktop-table、维基百科的
+wikitable、京东搜索结果的 .gl-item）往往和上次完全相同，但周围的时间戳、广告使整页缓存失效。
+这里只截取表格所在的 HTML 片段（字符串扫描，不构建 DOM）计算指纹，按页面键保存指纹和解析后
+的记录；指纹相同时直接复用上次的记录，跳过解析和校验。
+调用方传入自己模块的 PARSER_VERSION，它与区域指纹一起比较：解析逻辑更新后，即使页面没有变化
+也会重新解析一次。
+
+使用方法：
+with TableCache() as cache:
+    rows = cache.parse(url, html, "wikitable", lambda: parse_rows(html), version=PARSER_VERSION)
+"""
+
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from config import TABLE_CACHE_CONFIG
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tables (
+    key         TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    rows        TEXT NOT NULL,
+    updated_at  REAL NOT NULL
+)
+"""
+
+
+def table_region(html: str, tag: str, css_class: str) -> str:
+    """
+    截取页面中所有带指定 class 的元素的 HTML 片段
+
+    Args:
+        html: 页面 HTML
+        tag: 元素标签名（table、li 等）
+        css_class: 类名，须是 class 属性中一个完整的（空白分隔的）类名
+
+    Returns:
+        依次拼接的片段；未找到时为空字符串
+    """
+    # 只匹配引号内完整的类名："items-desktop-table-x"、"wikitable-foo" 不算
+    opening = re.compile(r'<%s\b[^>]*\bclass\s*=\s*(["\'])(?:(?!\1).)*?(?<![^\s"\'])%s(?=[\s"\'])'
+                         % (tag, re.escape(css_class)), re.I | re.S)
+    nested = re.compile(r'<(/?)%s\b' % tag, re.I)
+    parts = []
+    pos = 0
+    while True:
+        match = opening.search(html, pos)
+        if not match:
+            break
+        # 计算同名标签的嵌套深度，找到对应的闭合标签
+        depth = 0
+        end = len(html)
+        for tag_match in nested.finditer(html, match.start()):
+            depth += -1 if tag_match.group(1) else 1
+            if depth == 0:
+                end = html.find('>', tag_match.end()) + 1 or len(html)
+                break
+        parts.append(html[match.start():end])
+        pos = end
+    return '\n'.join(parts)
+
+
+def region_fingerprint(region: str) -> str:
+    """表格片段指纹（忽略空白差异）"""
+    return hashlib.md5(' '.join(region.split()).encode('utf-8')).hexdigest()
+
+
+class TableCache:
+    """按页面键持久化的表格指纹和解析结果（SQLite，线程安全）"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path or TABLE_CACHE_CONFIG["path"])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        self._lock = threading.Lock()
+        self.stats = {"hit": 0, "miss": 0}
+
+    def lookup(self, key: str, digest: str) -> Optional[List[Any]]:
+        """指纹与上次相同时返回上次的记录，否则返回 None"""
+        with self._lock:
+            row = self._conn.execute("SELECT fingerprint, rows FROM tables WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] != digest:
+            return None
+        return json.loads(row[1])
+
+    def store(self, key: str, digest: str, rows: List[Any]) -> None:
+        """保存页面的表格指纹和解析结果"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tables (key, fingerprint, rows, updated_at) VALUES (?, ?, ?, ?)",
+                (key, digest, json.dumps(rows, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def parse(self, key: str, html: str, region: str, parse: Callable[[], Optional[List[Any]]],
+              version: str = "") -> Optional[List[Any]]:
+        """
+        表格未变化时复用上次的记录，否则调用 parse() 并保存结果
+
+        Args:
+            key: 页面键（URL 加上影响结果的查询参数，不要包含随机参数）
+            html: 页面 HTML
+            region: TABLE_CACHE_CONFIG["regions"] 中的表格区域名
+            parse: 无参函数，返回该页面解析、校验后的记录；返回 None 表示失败，不缓存
+            version: 解析器版本（调用方模块的 PARSER_VERSION），与上次不同时重新解析
+
+        Returns:
+            记录列表
+        """
+        tag, css_class = TABLE_CACHE_CONFIG["regions"][region]
+        fragment = table_region(html, tag, css_class)
+        if not fragment:
+            return parse()
+        # 解析器版本并入指纹：表格未变但解析逻辑更新时，旧记录不再命中
+        digest = f"{version}:{region_fingerprint(fragment)}" if version else region_fingerprint(fragment)
+        cached = self.lookup(key, digest)
+        if cached is not None:
+            self.stats["hit"] += 1
+            print(f"♻️  表格未变化，复用上次的 {len(cached)} 条记录: {key}")
+            return cached
+        self.stats["miss"] += 1
+        rows = parse()
+        if rows is not None:
+            self.store(key, digest, rows)
+        return rows
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_table_cache() -> Optional[TableCache]:
+    """按配置打开表格缓存；关闭时返回 None"""
+    return TableCache() if TABLE_CACHE_CONFIG["enabled"] else None
@@ -1,15 +1,23 @@
 # techpowerup_cpu_scraper_enhanced.py
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import time
 import logging
-import random
 from urllib.parse import urljoin
 from typing import List, Dict, Optional
 import os
 import re
+import csv
 import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator
+
+from crawl_journal import CrawlJournal, journal_path
+from deadline import DeadlineExceeded
+from http_transport import CircuitOpenError, export_metrics, get_transport
+from rate_limiter import HostRateLimiter
+from url_frontier import UrlFrontier
 
 # ----------------------------
 # 配置
@@ -18,10 +26,18 @@ BASE_URL = "https://www.techpowerup.com"
 CPU_SPECS_URL = f"{BASE_URL}/cpu-specs/"
 OUTPUT_JSON = "techpowerup_cpu_specs_detailed_2026.json"
 OUTPUT_CSV = "techpowerup_cpu_specs_detailed_2026.csv"  # 保留CSV输出作为备份
+OUTPUT_JSONL = "techpowerup_cpu_specs_detailed_2026.jsonl"  # 详情完成即追加写入
+JOURNAL_FILE = journal_path("techpowerup_cpu_specs_detailed")  # 断点续传日志
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 MAX_RETRIES = 3
-DELAY_RANGE_LIST = (1.0, 2.5)   # 列表页延迟
 DELAY_RANGE_DETAIL = (0.8, 1.8) # 详情页延迟（可稍快）
+MAX_WORKERS = 4                 # 并发抓取详情页的线程数
+
+# 所有线程共享的按主机限速：同一主机的请求间隔落在 DELAY_RANGE_DETAIL 内
+rate_limiter = HostRateLimiter(
+    min_interval=DELAY_RANGE_DETAIL[0],
+    jitter=DELAY_RANGE_DETAIL[1] - DELAY_RANGE_DETAIL[0]
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -37,10 +53,14 @@ logger = logging.getLogger(__name__)
 def fetch_page(url: str, retries: int = MAX_RETRIES) -> BeautifulSoup:
     for attempt in range(retries):
         try:
+            get_transport().metrics.record_sleep(url, rate_limiter.acquire(url))
             headers = {"User-Agent": USER_AGENT}
-            resp = requests.get(url, headers=headers, timeout=15)
+            resp = get_transport().get(url, headers=headers, timeout=15, retries=0)
             resp.raise_for_status()
             return BeautifulSoup(resp.text, "html.parser")
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            logger.warning(f"{e}")
+            break
         except Exception as e:
             logger.warning(f"Attempt {attempt + 1}/{retries} failed for {url}: {e}")
             time.sleep(2 ** attempt)
@@ -127,75 +147,219 @@ def parse_detail_page(soup: BeautifulSoup) -> Dict[str, str]:
     }
 
 
-def scrape_all_cpus_with_details() -> List[Dict]:
-    logger.info("Starting enhanced CPU scraping with detail pages...")
-    all_cpus = []
-    page = 1
+def fetch_detail(basic: Dict) -> Optional[Dict]:
+    """抓取单个 CPU 的详情页并与列表页数据合并，失败时返回 None"""
+    try:
+        logger.debug(f"Fetching detail for {basic['model']}")
+        detail_soup = fetch_page(basic["model_url"])
+        detail_info = parse_detail_page(detail_soup)
+
+        # 合并数据
+        cpu_record = {**basic, **detail_info}
+        cpu_record["scraped_at"] = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+        return cpu_record
+    except Exception as e:
+        logger.error(f"Error processing {basic.get('model', 'Unknown')}: {e}")
+        return None
 
-    while True:
-        url = f"{CPU_SPECS_URL}?page={page}"
-        logger.info(f"Fetching list page {page}")
-        soup = fetch_page(url)
-        table = soup.select_one("table.styled-table")
-        if not table:
-            break
 
-        rows = table.find_all("tr")[1:]
-        if not rows:
-            break
+def _list_page_url(page: int) -> str:
+    return f"{CPU_SPECS_URL}?page={page}"
 
-        for row in rows:
-            try:
-                basic = parse_cpu_row(row)
-                if not basic or basic["model"] == "N/A":
-                    continue
 
-                # 抓取详情页
-                logger.debug(f"Fetching detail for {basic['model']}")
-                detail_soup = fetch_page(basic["model_url"])
-                detail_info = parse_detail_page(detail_soup)
+def iter_cpus_with_details(max_workers: int = MAX_WORKERS,
+                           journal: Optional[CrawlJournal] = None,
+                           frontier: Optional[UrlFrontier] = None,
+                           incremental: bool = False) -> Iterator[Dict]:
+    """
+    逐条产出带详情的 CPU 记录
 
-                # 合并数据
-                cpu_record = {**basic, **detail_info}
-                cpu_record["scraped_at"] = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
-                all_cpus.append(cpu_record)
+    详情页由线程池并发抓取（受全局按主机限速约束），处理第 N 页详情的同时预取第 N+1 页列表，
+    每条详情完成即产出，不在内存中累积全部结果。
 
-                time.sleep(random.uniform(*DELAY_RANGE_DETAIL))
+    传入 journal 时，每条详情和每个全部成功的列表页都会记入日志；以 resume 模式打开的日志中
+    已完成的详情会先被回放，已完成的列表页和详情页不再请求。
 
-            except Exception as e:
-                logger.error(f"Error processing {basic.get('model', 'Unknown')}: {e}")
+    传入 frontier 时每次采集结果都会写入 URL 边界；incremental 为 True 时，边界中未到刷新时间的
+    型号直接复用上次的详情（与本次列表页数据合并），只请求新型号和过期型号的详情页。
 
-        time.sleep(random.uniform(*DELAY_RANGE_LIST))
-        next_button = soup.select_one("a:-soup-contains('Next')")
-        if not next_button:
-            break
-        page += 1
+    Args:
+        max_workers: 详情页并发线程数
+        journal: 断点续传日志
+        frontier: 详情页 URL 边界
+        incremental: 是否增量采集
 
-    return all_cpus
+    Yields:
+        CPU 记录（完成顺序，不保证与列表顺序一致）
+    """
+    logger.info(f"Starting enhanced CPU scraping with detail pages ({max_workers} workers)...")
+    if journal is not None and journal.completed:
+        logger.info(f"Resuming from journal: {journal.completed} completed units")
+        yield from journal.records(kind="detail")
 
+    def page_state(number: int) -> Optional[Dict]:
+        return journal.get(f"page:{number}") if journal is not None else None
 
-def save_to_csv(data: List[Dict], filename: str):
-    df = pd.DataFrame(data)
-    # 按发布时间排序（可选）
-    df.to_csv(filename, index=False, encoding="utf-8-sig")
-    logger.info(f"Saved {len(df)} records to {filename}")
+    page = 1
+    prefetched = None
+
+    with ThreadPoolExecutor(max_workers=1) as list_pool, \
+            ThreadPoolExecutor(max_workers=max_workers) as detail_pool:
+        while True:
+            # 已完成的列表页无需重新请求
+            state = page_state(page)
+            if state is not None:
+                if not state.get("has_next"):
+                    break
+                page += 1
+                continue
+
+            logger.info(f"Fetching list page {page}")
+            soup = prefetched.result() if prefetched else fetch_page(_list_page_url(page))
+            prefetched = None
+
+            table = soup.select_one("table.styled-table")
+            if not table:
+                break
+
+            rows = table.find_all("tr")[1:]
+            if not rows:
+                break
+
+            # 预取下一页列表
+            has_next = soup.select_one("a:-soup-contains('Next')") is not None
+            if has_next and page_state(page + 1) is None:
+                prefetched = list_pool.submit(fetch_page, _list_page_url(page + 1))
+
+            futures = []
+            for row in rows:
+                try:
+                    basic = parse_cpu_row(row)
+                except Exception as e:
+                    logger.error(f"Error parsing row on page {page}: {e}")
+                    continue
+                if not basic or basic["model"] == "N/A":
+                    continue
+                if journal is not None and journal.is_done(f"detail:{basic['model_url']}"):
+                    continue
+                if incremental and frontier is not None \
+                        and not frontier.needs_fetch(basic["model_url"], basic["release_date"]):
+                    cached = frontier.get_record(basic["model_url"])
+                    if cached:
+                        cpu_record = {**cached, **basic}
+                        if journal is not None:
+                            journal.record(f"detail:{basic['model_url']}", cpu_record, kind="detail")
+                        yield cpu_record
+                        continue
+                futures.append(detail_pool.submit(fetch_detail, basic))
+
+            failures = 0
+            for future in as_completed(futures):
+                cpu_record = future.result()
+                if not cpu_record:
+                    failures += 1
+                    continue
+                if frontier is not None:
+                    frontier.update(cpu_record["model_url"], cpu_record, cpu_record.get("release_date"))
+                # 先记日志再产出，产出后崩溃也不会丢失
+                if journal is not None:
+                    journal.record(f"detail:{cpu_record['model_url']}", cpu_record, kind="detail")
+                yield cpu_record
+
+            # 有失败详情的页不记为完成，续传时会重试失败的详情
+            if journal is not None and not failures:
+                journal.record(f"page:{page}", {"has_next": has_next}, kind="page")
 
-def save_to_json(data: List[Dict], filename: str):
-    """保存数据到JSON文件"""
+            if not has_next:
+                break
+            page += 1
+
+
+def scrape_all_cpus_with_details(max_workers: int = MAX_WORKERS) -> List[Dict]:
+    """抓取全部 CPU（含详情）并返回列表"""
+    return list(iter_cpus_with_details(max_workers))
+
+
+def stream_to_jsonl(records: Iterable[Dict], filename: str) -> int:
+    """逐条追加写入 JSON Lines 文件，返回写入条数"""
+    count = 0
+    with open(filename, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            count += 1
+            if count % 100 == 0:
+                logger.info(f"Streamed {count} records to {filename}")
+    logger.info(f"Streamed {count} records to {filename}")
+    return count
+
+
+def iter_jsonl(filename: str) -> Iterator[Dict]:
+    """逐行读取 JSON Lines 文件"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def save_to_csv(records: Iterable[Dict], filename: str, fieldnames: List[str]):
+    """逐条写入 CSV（不整体加载到 DataFrame）"""
+    count = 0
+    with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    logger.info(f"Saved {count} records to {filename}")
+
+def save_to_json(records: Iterable[Dict], filename: str):
+    """逐条写入 JSON 数组文件"""
+    count = 0
     with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    logger.info(f"Saved {len(data)} records to {filename}")
+        f.write("[")
+        for record in records:
+            f.write(",\n" if count else "\n")
+            f.write(json.dumps(record, ensure_ascii=False))
+            count += 1
+        f.write("\n]\n" if count else "]\n")
+    logger.info(f"Saved {count} records to {filename}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="TechPowerUp CPU specs scraper with detail pages")
+    parser.add_argument("--resume", action="store_true", help="从断点续传日志继续，跳过已完成的页面和详情")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="详情页并发线程数")
+    parser.add_argument("--incremental", action="store_true",
+                        help="只采集新型号和超过刷新间隔的型号详情，其余复用上次结果")
+    args = parser.parse_args()
+
+    journal = CrawlJournal(JOURNAL_FILE, resume=args.resume)
+    frontier = UrlFrontier()
     try:
-        cpus = scrape_all_cpus_with_details()
-        save_to_json(cpus, OUTPUT_JSON)
-        save_to_csv(cpus, OUTPUT_CSV)  # 同时保存CSV作为备份
-    except Exception as e:
+        stream_to_jsonl(iter_cpus_with_details(args.workers, journal, frontier, args.incremental), OUTPUT_JSONL)
+        journal.close()
+        frontier.close()
+        logger.info(f"Frontier: {frontier.stats['new']} new, {frontier.stats['stale']} stale, "
+                    f"{frontier.stats['fresh']} reused, {frontier.stats['changed']} changed")
+
+        # 由 JSONL 转换出 JSON 和 CSV（CSV 作为备份），同样逐条处理
+        fieldnames = {}
+        for record in iter_jsonl(OUTPUT_JSONL):
+            fieldnames.update(dict.fromkeys(record))
+        save_to_json(iter_jsonl(OUTPUT_JSONL), OUTPUT_JSON)
+        save_to_csv(iter_jsonl(OUTPUT_JSONL), OUTPUT_CSV, list(fieldnames))
+        journal.finish()
+    except BaseException as e:
+        journal.close()
+        frontier.close()
         logger.exception(f"Scraping failed: {e}")
+        logger.info(f"Progress saved to {JOURNAL_FILE}, rerun with --resume to continue")
         raise
+    finally:
+        # 网络耗时与礼貌等待的对比，判断慢在远端还是自己的延迟
+        export_metrics()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
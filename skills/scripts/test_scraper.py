@@ -56,6 +56,15 @@ def test_phone_scraper():
         traceback.print_exc()
         return False
 
+def test_cli_import_time():
+    """测试快速命令的导入耗时（回归检查：python hwpipe.py importtime）"""
+    print("⏱️  测试命令行导入耗时...")
+    from hwpipe import check_import_time
+    problems = check_import_time()
+    for problem in problems:
+        print(f"❌ {problem}")
+    assert not problems, "; ".join(problems)
+
 def main():
     """主测试函数"""
     print("🧪 开始测试scraper模块...")
@@ -64,11 +73,17 @@ def main():
     results.append(test_cpu_scraper())
     results.append(test_gpu_scraper())
     results.append(test_phone_scraper())
+    try:
+        test_cli_import_time()
+        results.append(True)
+    except AssertionError:
+        results.append(False)
     
     print("\n📋 测试结果总结:")
     print(f"CPU scraper: {'✅ 通过' if results[0] else '❌ 失败'}")
     print(f"GPU scraper: {'✅ 通过' if results[1] else '❌ 失败'}")
     print(f"Phone scraper: {'✅ 通过' if results[2] else '❌ 失败'}")
+    print(f"命令行导入耗时: {'✅ 通过' if results[3] else '❌ 失败'}")
     
     if all(results):
         print("🎉 所有scraper测试通过！")
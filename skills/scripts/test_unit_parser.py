@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+测试 unit_parser 的频率解析
+各爬虫都通过 parse_clock_range 取基础/加速频率，这里覆盖范围、带标签和 "up to" 写法
+"""
+
+import sys
+import doctest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import unit_parser
+from unit_parser import parse_clock_range
+
+
+def test_doctests():
+    """unit_parser 中的 doctest 示例"""
+    result = doctest.testmod(unit_parser)
+    assert result.attempted > 0
+    assert result.failed == 0
+
+
+def test_clock_range_formats():
+    """范围、带标签、"up to" 前缀和单值的频率文本"""
+    cases = {
+        "3.4 to 4.6 GHz": (3.4, 4.6),
+        "3.6-4.2 GHz": (3.6, 4.2),
+        "3.6 GHz / 4.2 GHz": (3.6, 4.2),
+        "3,600 MHz": (3.6, None),
+        # 带标签的基础/加速频率，顺序任意，单位可以只写一次
+        "Base: 3.6 GHz Boost: 5.0 GHz": (3.6, 5.0),
+        "Max Turbo Frequency 5.0 GHz, Base Frequency 3.2 GHz": (3.2, 5.0),
+        "Base 3.6 / Boost 5.0 GHz": (3.6, 5.0),
+        "Boost: N/A Base: 3.6 GHz": (3.6, None),
+        # "up to" 只给出加速频率
+        "up to 5.0 GHz": (None, 5.0),
+        "Max Boost Clock: up to 5.7GHz": (None, 5.7),
+        "Turbo Boost 2.0 up to 4.7 GHz": (None, 4.7),
+        "3.6 GHz (up to 5.0 GHz)": (3.6, 5.0),
+        "N/A": (None, None),
+    }
+    for text, expected in cases.items():
+        assert parse_clock_range(text) == expected, text
+
+
+def test_clock_range_default_unit():
+    """没有单位时使用默认单位"""
+    assert parse_clock_range("3.4 4.6", default_unit="GHz") == (3.4, 4.6)
+    assert parse_clock_range("Base 3.6", default_unit="GHz") == (3.6, None)
+    assert parse_clock_range("Base 3.6") == (None, None)
+    assert parse_clock_range(None) == (None, None)
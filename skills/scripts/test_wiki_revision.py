@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+测试 wiki_revision 的增量获取
+FakeWiki 是按 MediaWiki API 格式应答的本地替身（query / compare / parse）；
+fixtures/wiki_revision/ 是用 RecordedTransport 录制的 FakeWiki 响应，回放覆盖
+修订号未变、按章节更新、整页获取三种路径。
+
+重新录制回放数据：
+python test_wiki_revision.py --record
+"""
+
+import sys
+import json
+import random
+import difflib
+import tempfile
+from html import escape
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from wiki_revision import RecordedTransport, WikiRevisionFetcher
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "wiki_revision"
+TITLE = "List of test processors"
+
+
+class FakeWiki:
+    """只有一个页面、可以逐次编辑的 MediaWiki API 替身"""
+
+    def __init__(self, sections, revid=100):
+        # sections: [(标题或 None, [行, ...]), ...]，第一项是导言
+        self.revisions = {}
+        self.revid = revid - 1
+        self.edit(sections)
+
+    def edit(self, sections):
+        self.revid += 1
+        self.revisions[self.revid] = [(title, list(lines)) for title, lines in sections]
+        return self.revid
+
+    def sections(self, revid=None):
+        return [(title, list(lines)) for title, lines in self.revisions[revid or self.revid]]
+
+    # -- 渲染 -----------------------------------------------------------
+    @staticmethod
+    def _section_wikitext(title, lines):
+        head = [f"== {title} =="] if title else []
+        return "\n".join(head + lines)
+
+    def wikitext(self, revid):
+        # 章节之间以空行分隔（与真实页面一致）
+        return "\n\n".join(self._section_wikitext(t, l) for t, l in self.revisions[revid])
+
+    @staticmethod
+    def _section_html(title, lines):
+        head = (f'<div class="mw-heading mw-heading2"><h2 id="{title.replace(" ", "_")}">{escape(title)}</h2></div>'
+                if title else "")
+        return head + "".join(f"<p>{escape(line)}</p>\n" for line in lines if line)
+
+    def html(self, revid):
+        return "".join(self._section_html(t, l) for t, l in self.revisions[revid])
+
+    def section_meta(self, revid):
+        text = self.wikitext(revid)
+        data = text.encode("utf-8")
+        meta, pos = [], 0
+        for index, (title, _) in enumerate(self.revisions[revid][1:], start=1):
+            heading = f"== {title} ==".encode("utf-8")
+            pos = data.index(heading, pos)
+            meta.append({"toclevel": 1, "level": "2", "line": title, "number": str(index),
+                         "index": str(index), "byteoffset": pos, "anchor": title.replace(" ", "_")})
+            pos += len(heading)
+        return meta
+
+    def diff(self, old, new):
+        a = self.wikitext(old).split("\n")
+        b = self.wikitext(new).split("\n")
+        rows = []
+        for group in difflib.SequenceMatcher(None, a, b).get_grouped_opcodes(2):
+            i1, j1 = group[0][1], group[0][3]
+            rows.append(f'<tr><td colspan="2" class="diff-lineno">Line {i1 + 1}:</td>'
+                        f'<td colspan="2" class="diff-lineno">Line {j1 + 1}:</td></tr>')
+            for tag, a1, a2, b1, b2 in group:
+                if tag == "equal":
+                    for line in a[a1:a2]:
+                        rows.append(f'<tr><td class="diff-marker"></td><td class="diff-context"><div>{escape(line)}</div></td>'
+                                    f'<td class="diff-marker"></td><td class="diff-context"><div>{escape(line)}</div></td></tr>')
+                    continue
+                for line in a[a1:a2]:
+                    rows.append(f'<tr><td class="diff-marker" data-marker="−"></td>'
+                                f'<td class="diff-deletedline diff-side-deleted"><div>{escape(line)}</div></td></tr>')
+                for line in b[b1:b2]:
+                    rows.append(f'<tr><td colspan="2" class="diff-empty diff-side-deleted"></td>'
+                                f'<td class="diff-marker" data-marker="+"></td>'
+                                f'<td class="diff-addedline diff-side-added"><div>{escape(line)}</div></td></tr>')
+        return "".join(rows)
+
+    # -- API ------------------------------------------------------------
+    def __call__(self, params):
+        action = params["action"]
+        if action == "query":
+            return {"query": {"pages": [{"title": TITLE, "revisions": [{"revid": self.revid}]}]}}
+        if action == "compare":
+            return {"compare": {"fromrevid": params["fromrev"], "torevid": params["torev"],
+                                "body": self.diff(int(params["fromrev"]), int(params["torev"]))}}
+        revid = int(params.get("oldid") or self.revid)
+        props = params["prop"].split("|")
+        if "section" in params:
+            title, lines = self.revisions[revid][int(params["section"])]
+            parsed = {"text": self._section_html(title, lines),
+                      # 章节接口返回的 wikitext 不带末尾空行
+                      "wikitext": self._section_wikitext(title, lines).rstrip("\n")}
+        else:
+            parsed = {"text": self.html(revid), "wikitext": self.wikitext(revid),
+                      "sections": self.section_meta(revid), "revid": revid}
+        return {"parse": {key: value for key, value in parsed.items() if key in props or key == "revid"}}
+
+
+def _initial_sections():
+    return [
+        (None, ["Intro line one.", "Intro line two."]),
+        ("Alpha", ["a1", "a2", "a3"]),
+        ("Beta", ["b1", "b2", "b3"]),
+        ("Gamma", ["g1", "g2", "g3"]),
+        ("Delta", ["d1", "d2", "d3"]),
+    ]
+
+
+def _fetch(fetcher):
+    return fetcher.fetch_rows(TITLE, lambda html: [html])[0]
+
+
+def _scenario(wiki, fetcher):
+    """依次运行：整页获取、未变化、章节更新（行数改变）、后续章节更新、标题改动后整页获取"""
+    yield "full", _fetch(fetcher), wiki.html(wiki.revid)
+    yield "unchanged", _fetch(fetcher), wiki.html(wiki.revid)
+
+    sections = wiki.sections()
+    sections[2] = ("Beta", ["b1", "b2 edited", "b2.5 inserted", "b3"])
+    wiki.edit(sections)
+    yield "sections", _fetch(fetcher), wiki.html(wiki.revid)
+
+    # 上一次更新改变了 Beta 的行数，Gamma 的行范围需要按新版本重新计算
+    sections = wiki.sections()
+    sections[3] = ("Gamma", ["g1", "g2 edited", "g3"])
+    wiki.edit(sections)
+    yield "sections", _fetch(fetcher), wiki.html(wiki.revid)
+
+    sections = wiki.sections()
+    sections[4] = ("Delta renamed", sections[4][1])
+    wiki.edit(sections)
+    yield "full", _fetch(fetcher), wiki.html(wiki.revid)
+
+
+def _record(directory):
+    """用 FakeWiki 重新录制回放数据，同时记录每一步的期望 HTML"""
+    for path in Path(directory).glob("*.json"):
+        path.unlink()
+    wiki = FakeWiki(_initial_sections())
+    transport = RecordedTransport(directory, live=wiki)
+    expected = []
+    with tempfile.TemporaryDirectory() as tmp:
+        with WikiRevisionFetcher(Path(tmp) / "store.sqlite3", transport) as fetcher:
+            for path, html, want in _scenario(wiki, fetcher):
+                assert html == want, f"录制时 {path} 步骤的结果与整页不一致"
+                expected.append({"path": path, "html": want})
+    with open(Path(directory) / "expected.json", "w", encoding="utf-8") as f:
+        json.dump(expected, f, ensure_ascii=False, indent=1)
+
+
+def test_replay_fixture():
+    """回放录制的响应：未变化、按章节更新、整页获取的结果都与整页 HTML 一致"""
+    with open(FIXTURE_DIR / "expected.json", "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    transport = RecordedTransport(FIXTURE_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        with WikiRevisionFetcher(Path(tmp) / "store.sqlite3", transport) as fetcher:
+            for step in expected:
+                before = dict(fetcher.stats)
+                assert _fetch(fetcher) == step["html"]
+                assert fetcher.stats[step["path"]] == before[step["path"]] + 1, step["path"]
+    # 第二次章节更新只请求 Gamma（章节 3）
+    section_requests = [r["section"] for r in transport.requests if "section" in r]
+    assert section_requests == [2, 3]
+
+
+def test_random_section_edits_match_full_parse():
+    """随机编辑单个章节（行数随之变化），增量结果始终与整页 HTML 一致"""
+    for seed in range(5):
+        rng = random.Random(seed)
+        wiki = FakeWiki(_initial_sections() + [(f"Extra {i}", [f"e{i}"]) for i in range(4)])
+        with tempfile.TemporaryDirectory() as tmp:
+            with WikiRevisionFetcher(Path(tmp) / "store.sqlite3", wiki) as fetcher:
+                _fetch(fetcher)
+                for step in range(30):
+                    sections = wiki.sections()
+                    index = rng.randrange(1, len(sections))
+                    title, lines = sections[index]
+                    position = rng.randrange(len(lines) + 1)
+                    if lines and rng.random() < 0.4:
+                        del lines[min(position, len(lines) - 1)]
+                    else:
+                        lines.insert(position, f"s{seed} r{step} row")
+                    sections[index] = (title, lines)
+                    wiki.edit(sections)
+                    assert _fetch(fetcher) == wiki.html(wiki.revid), f"seed {seed} 第 {step + 1} 次编辑"
+                assert fetcher.stats["sections"] > 0
+
+
+if __name__ == "__main__":
+    if "--record" in sys.argv:
+        FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+        _record(FIXTURE_DIR)
+        print(f"💾 已录制: {FIXTURE_DIR}")
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+硬件参数单位解析
+统一解析频率、缓存、功耗、内存和制程文本，换算为固定单位：
+- 频率 clock:   GHz   ("3.4 to 4.6 GHz", "3600 MHz", "Base: 3.6 GHz Boost: 5.0 GHz")
+- 缓存 cache:   MB    ("32 MB", "512 KB", "2x 16 MB")
+- 功耗 power:   W     ("125 W", "65 watts")
+- 内存 memory:  GB    ("16 GB", "512 MB", "1 TB")
+- 制程 process: nm    ("7 nm", "14nm")
+
+正则在导入时预编译，单值解析结果按原始文本缓存；批量接口先对取值去重，
+只解析唯一值，再通过 NumPy 索引映射回整列。
+
+使用方法：
+python unit_parser.py clock "3.4 to 4.6 GHz"
+"""
+
+import re
+import sys
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+
+# 各类数值换算到目标单位的系数（键为小写单位）
+UNIT_TABLES: Dict[str, Dict[str, float]] = {
+    "clock": {"ghz": 1.0, "mhz": 1e-3, "khz": 1e-6},
+    "cache": {"kb": 1 / 1024, "kib": 1 / 1024, "mb": 1.0, "mib": 1.0, "gb": 1024.0, "gib": 1024.0},
+    "power": {"w": 1.0, "watt": 1.0, "watts": 1.0, "kw": 1000.0},
+    "memory": {"mb": 1 / 1024, "mib": 1 / 1024, "gb": 1.0, "gib": 1.0, "tb": 1024.0, "tib": 1024.0},
+    "process": {"nm": 1.0, "µm": 1000.0, "um": 1000.0}
+}
+
+_NUMBER = r'(\d+(?:\.\d+)?)'
+_FIRST_NUMBER = re.compile(_NUMBER)
+_THOUSANDS = re.compile(r'(?<=\d),(?=\d{3}(?!\d))')
+
+
+def _unit_alternation(units: Iterable[str]) -> str:
+    # 长单位优先，避免 "watts" 被 "w" 截断
+    return '|'.join(re.escape(u) for u in sorted(units, key=len, reverse=True))
+
+
+# 倍数前缀表示总量的类别："2x 16 MB" 缓存共 32 MB；"8 × 3.2 GHz" 频率仍是每核 3.2 GHz
+_SUMMABLE_KINDS = frozenset({"cache", "memory"})
+
+# 可选的倍数前缀（"2x 16 MB"、"2 × 16 MB"）+ 数值 + 单位；前缀对所有类别都会被匹配掉，
+# 避免把个数当成数值，但只有 _SUMMABLE_KINDS 才乘以个数
+_QUANTITY_PATTERNS = {
+    kind: re.compile(
+        r'(?:(\d+)\s*[x×]\s*)?' + _NUMBER + r'\s*(' + _unit_alternation(units) + r')(?![a-z])',
+        re.IGNORECASE
+    )
+    for kind, units in UNIT_TABLES.items()
+}
+
+_CLOCK_UNIT = _unit_alternation(UNIT_TABLES["clock"])
+_CLOCK_RANGE = re.compile(
+    _NUMBER + r'\s*(' + _CLOCK_UNIT + r')?(?:\s*(?:to|-|–|—|~|/|,)\s*|\s+)'
+    + _NUMBER + r'\s*(' + _CLOCK_UNIT + r')(?![a-z])',
+    re.IGNORECASE
+)
+
+# 带标签的频率（"Base: 3.6 GHz"、"Turbo up to 5.0 GHz"）：标签与数值之间不能再出现其他标签，
+# 避免 "Boost: N/A Base: 3.6 GHz" 把基础频率当成加速频率
+_BASE_LABELS = r'base'
+_BOOST_LABELS = r'boost|turbo|max(?:imum)?|up\s+to'
+_CLOCK_LABELLED = re.compile(
+    r'\b(' + _BASE_LABELS + '|' + _BOOST_LABELS + r')\b'
+    r'(?:(?!\b(?:' + _BASE_LABELS + '|' + _BOOST_LABELS + r')\b)[^\d]){0,30}?'
+    + _NUMBER + r'\s*(' + _CLOCK_UNIT + r')?(?![a-z])',
+    re.IGNORECASE
+)
+_BASE_LABEL = re.compile(_BASE_LABELS, re.IGNORECASE)
+
+
+def _prepare(text: str) -> str:
+    """去掉千位分隔符（"1,200 MHz"）"""
+    return _THOUSANDS.sub('', text)
+
+
+@lru_cache(maxsize=16384)
+def _parse_quantity(kind: str, text: str, default_unit: Optional[str]) -> Optional[float]:
+    units = UNIT_TABLES[kind]
+    text = _prepare(text)
+    match = _QUANTITY_PATTERNS[kind].search(text)
+    if match:
+        count, number, unit = match.groups()
+        value = float(number) * units[unit.lower()]
+        return value * int(count) if count and kind in _SUMMABLE_KINDS else value
+    if default_unit:
+        match = _FIRST_NUMBER.search(text)
+        if match:
+            return float(match.group(1)) * units[default_unit.lower()]
+    return None
+
+
+def parse_quantity(kind: str, text: Any, default_unit: Optional[str] = None) -> Optional[float]:
+    """
+    解析带单位的数值并换算为该类别的目标单位
+
+    Args:
+        kind: 类别（clock/cache/power/memory/process）
+        text: 原始文本
+        default_unit: 文本中没有单位时使用的单位；为 None 时没有单位即视为无法解析
+
+    Returns:
+        换算后的数值，无法解析时返回 None
+    """
+    if kind not in UNIT_TABLES:
+        raise ValueError(f"未知的单位类别: {kind}")
+    if text is None:
+        return None
+    if isinstance(text, (int, float)) and not isinstance(text, bool):
+        return float(text) * UNIT_TABLES[kind][default_unit.lower()] if default_unit else None
+    return _parse_quantity(kind, str(text), default_unit)
+
+
+def parse_clock(text: Any, default_unit: Optional[str] = None) -> Optional[float]:
+    """解析频率（GHz）"""
+    return parse_quantity("clock", text, default_unit)
+
+
+def parse_cache(text: Any, default_unit: Optional[str] = None) -> Optional[float]:
+    """解析缓存容量（MB）"""
+    return parse_quantity("cache", text, default_unit)
+
+
+def parse_power(text: Any, default_unit: Optional[str] = None) -> Optional[float]:
+    """解析功耗（W）"""
+    return parse_quantity("power", text, default_unit)
+
+
+def parse_memory(text: Any, default_unit: Optional[str] = None) -> Optional[float]:
+    """解析内存容量（GB）"""
+    return parse_quantity("memory", text, default_unit)
+
+
+def parse_process(text: Any, default_unit: Optional[str] = None) -> Optional[float]:
+    """解析制程（nm）"""
+    return parse_quantity("process", text, default_unit)
+
+
+def _parse_labelled_clocks(text: str, default_unit: Optional[str]) -> Optional[Tuple[Optional[float], Optional[float]]]:
+    """解析带 Base / Boost / Turbo / up to 标签的频率，没有标签时返回 None"""
+    units = UNIT_TABLES["clock"]
+    matches = list(_CLOCK_LABELLED.finditer(text))
+    if not matches:
+        return None
+    # 没有单位的数值沿用文本中出现的频率单位（"Base 3.6 / Boost 5.0 GHz"），再退回默认单位
+    unit_match = _QUANTITY_PATTERNS["clock"].search(text)
+    fallback_unit = unit_match.group(3) if unit_match else default_unit
+    found: Dict[str, Tuple[bool, float, "re.Match"]] = {}
+    for match in matches:
+        label, number, unit = match.groups()
+        unit = unit or fallback_unit
+        if not unit:
+            continue
+        role = "base" if _BASE_LABEL.fullmatch(label) else "boost"
+        # 同一角色优先取自带单位的数值（"Turbo Boost 2.0 up to 4.7 GHz" 取 4.7）
+        explicit = match.group(3) is not None
+        if role not in found or (explicit and not found[role][0]):
+            found[role] = (explicit, float(number) * units[unit.lower()], match)
+    if not found:
+        return None
+
+    base = found["base"][1] if "base" in found else None
+    boost = found["boost"][1] if "boost" in found else None
+    # 只有一个带标签的值时，另一侧不带标签的频率补齐："3.6 GHz (up to 5.0 GHz)"
+    if base is None:
+        base = _parse_quantity("clock", text[:found["boost"][2].start()], None)
+    elif boost is None:
+        boost = _parse_quantity("clock", text[found["base"][2].end():], None)
+    return base, boost
+
+
+@lru_cache(maxsize=16384)
+def _parse_clock_range(text: str, default_unit: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    units = UNIT_TABLES["clock"]
+    text = _prepare(text)
+    labelled = _parse_labelled_clocks(text, default_unit)
+    if labelled is not None:
+        return labelled
+
+    match = _CLOCK_RANGE.search(text)
+    if match:
+        base, base_unit, boost, boost_unit = match.groups()
+        base_unit = base_unit or boost_unit
+        return float(base) * units[base_unit.lower()], float(boost) * units[boost_unit.lower()]
+
+    single = _parse_quantity("clock", text, None)
+    if single is not None:
+        return single, None
+
+    if default_unit:
+        numbers = _FIRST_NUMBER.findall(text)
+        scale = units[default_unit.lower()]
+        if len(numbers) >= 2:
+            return float(numbers[0]) * scale, float(numbers[1]) * scale
+        if numbers:
+            return float(numbers[0]) * scale, None
+    return None, None
+
+
+def parse_clock_range(text: Any, default_unit: Optional[str] = None) -> Tuple[Optional[float], Optional[float]]:
+    """
+    解析基础/加速频率（GHz），如 "3.4 to 4.6 GHz"、"3.6-4.2 GHz"、"3.6 GHz / 4.2 GHz"、
+    "Base: 3.6 GHz Boost: 5.0 GHz"、"up to 5.0 GHz"
+
+    >>> parse_clock_range("3.4 to 4.6 GHz")
+    (3.4, 4.6)
+    >>> parse_clock_range("Base: 3.6 GHz Boost: 5.0 GHz")
+    (3.6, 5.0)
+    >>> parse_clock_range("Boost 5.0 GHz, Base 3600 MHz")
+    (3.6, 5.0)
+    >>> parse_clock_range("up to 5.0 GHz")
+    (None, 5.0)
+    >>> parse_clock_range("3.6 GHz (up to 5.0 GHz)")
+    (3.6, 5.0)
+    >>> parse_clock_range("3.6 GHz")
+    (3.6, None)
+
+    Args:
+        text: 原始文本
+        default_unit: 文本中没有单位时使用的单位
+
+    Returns:
+        (基础频率, 加速频率)；只有一个不带标签的值时视为基础频率，加速频率为 None；
+        只有 "up to" / Boost / Turbo 标签的值时基础频率为 None；无法解析时均为 None
+    """
+    if text is None:
+        return None, None
+    return _parse_clock_range(str(text), default_unit)
+
+
+def _factorize(values: Iterable[Any]) -> Tuple[List[Any], Any]:
+    """对取值去重编码，返回 (唯一值列表, 每个元素对应的唯一值下标数组)"""
+    codes: Dict[Any, int] = {}
+    inverse = []
+    for value in values:
+        key = value if isinstance(value, (str, int, float)) or value is None else str(value)
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(codes)
+        inverse.append(code)
+    return list(codes), np.asarray(inverse, dtype=np.intp)
+
+
+def _require_numpy():
+    if not HAS_NUMPY:
+        raise ImportError("批量单位解析需要 numpy，请先安装: pip install numpy")
+
+
+def parse_array(values: Iterable[Any], kind: str, default_unit: Optional[str] = None):
+    """
+    批量解析一列数值
+
+    Args:
+        values: 原始文本序列
+        kind: 类别（clock/cache/power/memory/process）
+        default_unit: 文本中没有单位时使用的单位
+
+    Returns:
+        float64 数组，无法解析的位置为 NaN
+    """
+    _require_numpy()
+    unique, inverse = _factorize(values)
+    parsed = [parse_quantity(kind, value, default_unit) for value in unique]
+    table = np.array([np.nan if v is None else v for v in parsed], dtype='f8')
+    return table[inverse] if len(inverse) else np.empty(0, dtype='f8')
+
+
+def parse_clock_range_array(values: Iterable[Any], default_unit: Optional[str] = None):
+    """
+    批量解析基础/加速频率
+
+    Returns:
+        (基础频率数组, 加速频率数组)，无法解析的位置为 NaN
+    """
+    _require_numpy()
+    unique, inverse = _factorize(values)
+    parsed = [parse_clock_range(value, default_unit) for value in unique]
+    table = np.array([[np.nan if v is None else v for v in pair] for pair in parsed],
+                     dtype='f8').reshape(-1, 2)
+    if not len(inverse):
+        return np.empty(0, dtype='f8'), np.empty(0, dtype='f8')
+    return table[inverse, 0], table[inverse, 1]
+
+
+def cache_info():
+    """返回单值解析缓存的命中统计"""
+    return _parse_quantity.cache_info()
+
+
+def main():
+    """命令行：python unit_parser.py <kind> <text>..."""
+    if len(sys.argv) < 3:
+        print("用法: python unit_parser.py clock|cache|power|memory|process <文本>...")
+        sys.exit(1)
+    kind = sys.argv[1]
+    for text in sys.argv[2:]:
+        if kind == "clock":
+            print(f"{text!r:30} -> {parse_clock_range(text)}")
+        else:
+            print(f"{text!r:30} -> {parse_quantity(kind, text)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@
 """
 
 import sys
-import importlib
+import subprocess
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
@@ -15,11 +15,18 @@ from typing import Dict, List, Any, Optional
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from scripts.config import PATHS, TARGET_FILES, SCRAPER_MODULES
+from scripts.config import (
+    PATHS, TARGET_FILES, SCRAPER_MODULES, DEADLINE_CONFIG, LAST_GOOD_CONFIG, ISOLATION_CONFIG
+)
 from scripts.utils import (
     logger, DataValidator, BackupManager, DataComparator,
-    save_json, load_json
+    save_json
 )
+from scripts.scraper_registry import load_module
+from scripts.last_good import LastGoodStore
+from scripts.records import HardwareRecord, load_records
+# 采集器与传输层以 scripts 目录下的模块名导入 deadline，这里用同一个模块名，activate() 才对它们生效
+from deadline import Deadline, activate
 
 
 def ensure_directories() -> None:
@@ -30,35 +37,35 @@ def ensure_directories() -> None:
     logger.info(f"📁 目录初始化完成")
 
 
-def run_scraper(module_name: str, data_type: str) -> Optional[List[Dict[str, Any]]]:
+def run_scraper(module_name: str, data_type: str, deadline: Optional[Deadline] = None,
+                isolated: bool = False) -> Optional[List[Dict[str, Any]]]:
     """
     动态导入并运行scraper模块
     
     Args:
         module_name: 模块名称 (如: "scripts.scrapers.cpu")
         data_type: 数据类型 (如: "cpu")
+        deadline: 本类别的时间预算，传给模块的 run() 并在运行期间设为当前预算
+        isolated: 在资源受限的子进程中运行（见 isolated_runner.py）
         
     Returns:
         采集的数据列表，失败返回None
     """
+    if isolated:
+        return run_scraper_isolated(module_name, data_type, deadline)
+    
     try:
-        # 添加scripts目录到路径
-        scripts_dir = PATHS["PROJECT_ROOT"] / "scripts"
-        if str(scripts_dir) not in sys.path:
-            sys.path.insert(0, str(scripts_dir))
-        
-        # 动态导入模块
+        # 按需导入模块（注册表缓存导入结果，scripts 目录只加入 sys.path 一次）
         logger.info(f"📦 导入模块: {module_name}")
-        module = importlib.import_module(module_name)
-        
-        # 检查run函数
-        if not hasattr(module, "run"):
-            logger.error(f"模块缺少run()函数: {module_name}")
-            return None
+        module = load_module(module_name)
         
         # 运行scraper
         logger.info(f"🚀 运行{data_type.upper()}数据采集器...")
-        data = module.run()
+        if deadline is None:
+            data = module.run()
+        else:
+            with activate(deadline):
+                data = module.run(deadline=deadline)
         
         if not data:
             logger.warning(f"{data_type.upper()}采集器返回空数据")
@@ -77,13 +84,101 @@ def run_scraper(module_name: str, data_type: str) -> Optional[List[Dict[str, Any
         return None
 
 
-def update_single_data(data_type: str, target_file: Path) -> bool:
+def run_scraper_isolated(module_name: str, data_type: str,
+                         deadline: Optional[Deadline] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    在子进程中运行scraper模块：超过内存、CPU 或墙钟上限时终止该进程，只影响本类别
+    
+    Args:
+        module_name: 模块名称
+        data_type: 数据类型
+        deadline: 本类别的时间预算
+        
+    Returns:
+        采集的数据列表，失败返回None
+    """
+    from isolated_runner import run_isolated
+    
+    logger.info(f"🧱 在子进程中运行{data_type.upper()}数据采集器"
+                f"（内存 {ISOLATION_CONFIG['memory_mb']}MB，CPU {ISOLATION_CONFIG['cpu_seconds']}s）...")
+    result = run_isolated(module_name, data_type, deadline)
+    if result.error:
+        logger.error(f"{data_type.upper()}采集子进程失败: {result.error}（耗时 {result.elapsed:.0f}s）")
+        return None
+    if not result.data:
+        logger.warning(f"{data_type.upper()}采集器返回空数据")
+        return None
+    
+    peak = f"，峰值内存 {result.peak_rss_mb:.0f}MB" if result.peak_rss_mb else ""
+    logger.info(f"✅ {data_type.upper()}采集完成: {len(result.data)}个项目（耗时 {result.elapsed:.0f}s{peak}）")
+    return result.data
+
+
+# 采集器内置备用数据的 ID 标记（如 "gpu-backup-001"）
+BACKUP_ID_MARKER = "-backup-"
+
+
+def is_backup_record(item: Dict[str, Any]) -> bool:
+    """是否为采集器内置的备用数据（而不是真实采集的结果）"""
+    return BACKUP_ID_MARKER in str(item.get('id', ''))
+
+
+def load_existing(target_file: Path, data_type: str) -> List[HardwareRecord]:
+    """
+    读取现有数据为紧凑记录类型（采集期间一直持有，比字典列表占用的内存少）
+    
+    Args:
+        target_file: 目标JSON文件路径
+        data_type: 数据类型 (cpu/gpu/phone)
+        
+    Returns:
+        记录列表，文件不存在或损坏时为空列表
+    """
+    if not target_file.exists():
+        return []
+    try:
+        return load_records(target_file, data_type)
+    except (OSError, ValueError) as e:
+        logger.error(f"❌ 数据加载失败: {e}")
+        return []
+
+
+def merge_last_good(old_data: List[HardwareRecord], new_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    预算用尽时的部分结果与上次的数据合并：同 id 以新数据为准，本次没有采集到的旧项目保留
+    
+    新数据中的内置备用数据不参与合并，否则这些占位记录会混入完整的目录并通过数量回退检查。
+    
+    Args:
+        old_data: 上次保存的数据（load_existing 的结果）
+        new_data: 本次（部分）采集的数据
+        
+    Returns:
+        合并后的数据列表（旧数据顺序在前，新增项目追加在后）
+    """
+    fresh = {item.get('id'): item for item in new_data if not is_backup_record(item)}
+    merged = []
+    for record in old_data:
+        item = fresh.pop(record.get('id'), None)
+        merged.append(item if item is not None else record.to_dict())
+    merged.extend(fresh.values())
+    return merged
+
+
+def update_single_data(data_type: str, target_file: Path, deadline: Optional[Deadline] = None,
+                       force: bool = False, isolated: bool = False) -> bool:
     """
     更新单个类型的数据
     
+    只有通过校验和数量回退检查的数据才会发布（原子替换数据文件并记为 last-good 快照），
+    否则数据文件保持上次发布的内容。
+    
     Args:
         data_type: 数据类型 (cpu/gpu/phone)
         target_file: 目标JSON文件路径
+        deadline: 本类别的时间预算；用尽时部分结果与现有数据合并后保存
+        force: 跳过数量回退检查
+        isolated: 在资源受限的子进程中运行采集器
         
     Returns:
         更新是否成功
@@ -98,7 +193,11 @@ def update_single_data(data_type: str, target_file: Path) -> bool:
     
     # 步骤2: 加载现有数据
     logger.info("📂 步骤2: 加载现有数据...")
-    old_data = load_json(target_file) or []
+    store = LastGoodStore()
+    if store.restore(data_type, target_file):
+        # 数据文件丢失或损坏：先恢复上次发布的数据，采集失败时也有数据可用
+        logger.warning(f"♻️  数据文件缺失或损坏，已从最近一次发布的快照恢复")
+    old_data = load_existing(target_file, data_type)
     if old_data:
         logger.info(f"   现有数据: {len(old_data)}个项目")
     else:
@@ -111,11 +210,16 @@ def update_single_data(data_type: str, target_file: Path) -> bool:
         logger.error(f"未找到{data_type}的scraper配置")
         return False
     
-    new_data = run_scraper(module_name, data_type)
+    new_data = run_scraper(module_name, data_type, deadline, isolated)
     if not new_data:
         logger.error(f"无法获取{data_type}数据")
         return False
     
+    if deadline is not None and deadline.exhausted and old_data:
+        # 时间预算用尽，采集结果不完整：没有采集到的项目沿用上次的数据，而不是被删除
+        new_data = merge_last_good(old_data, new_data)
+        logger.warning(f"⏱️  {data_type.upper()}时间预算用尽，部分结果与现有数据合并: {len(new_data)}个项目")
+    
     # 步骤4: 验证新数据
     logger.info("✓ 步骤4: 验证数据完整性...")
     is_valid, errors = DataValidator.validate_data_list(new_data, data_type)
@@ -129,23 +233,99 @@ def update_single_data(data_type: str, target_file: Path) -> bool:
     
     logger.info(f"   验证通过: {len(new_data)}个项目")
     
-    # 步骤5: 对比数据变化
-    logger.info("📊 步骤5: 分析数据变化...")
+    # 步骤5: 数量回退检查（例如采集失败后只剩采集器内置的几条备用数据）
+    logger.info("🛡️  步骤5: 数量回退检查...")
+    regression = store.check_regression(data_type, len(new_data), len(old_data))
+    if regression and not force:
+        logger.error(f"拒绝发布: {regression}，继续使用上次发布的数据")
+        return False
+    if regression:
+        logger.warning(f"   {regression}（--force，仍然发布）")
+    
+    # 步骤6: 对比数据变化
+    logger.info("📊 步骤6: 分析数据变化...")
     stats = DataComparator.compare_data(old_data, new_data)
     DataComparator.print_comparison(data_type, stats)
     
-    # 步骤6: 保存新数据
-    logger.info("💾 步骤6: 保存新数据...")
+    # 步骤7: 保存新数据（写临时文件后替换，读取方不会看到写了一半的文件）
+    logger.info("💾 步骤7: 保存新数据...")
     if not save_json(new_data, target_file):
         logger.error(f"数据保存失败")
         return False
+    try:
+        store.save(data_type, new_data)
+    except OSError as e:
+        logger.warning(f"last-good 快照保存失败: {e}")
+    
+    # 附加步骤: 生成列式快照（失败不影响本次更新；numpy 只在这里才导入）
+    from scripts.catalog_snapshot import HAS_NUMPY, write_snapshot
+    if HAS_NUMPY:
+        try:
+            snapshot_file = write_snapshot(data_type, new_data)
+            logger.info(f"🗂️  列式快照已更新: {snapshot_file.name}")
+        except Exception as e:
+            logger.warning(f"列式快照生成失败: {e}")
     
     logger.info(f"✅ {data_type.upper()}数据更新成功！\n")
     return True
 
 
-def main():
-    """主函数 - 执行所有数据更新任务"""
+def start_background_refresh(data_types: Optional[List[str]] = None, budget: Optional[float] = None,
+                             force: bool = False, isolated: Optional[bool] = None) -> int:
+    """
+    stale-while-revalidate：立即用 last-good 快照恢复缺失的数据文件，再在独立的后台进程中运行 main()
+    
+    后台进程的数据只有通过校验和数量回退检查才会原子替换数据文件，在此之前读取方一直使用上次发布的数据。
+    
+    Args:
+        data_types: 要更新的数据类型，默认全部
+        budget: 后台运行的时间预算（秒）
+        force: 跳过数量回退检查
+        isolated: 在子进程中运行各采集器，默认 ISOLATION_CONFIG["enabled"]
+        
+    Returns:
+        退出码（0 表示后台进程已启动）
+    """
+    store = LastGoodStore()
+    types = [data_type for data_type in TARGET_FILES if not data_types or data_type in data_types]
+    for data_type in types:
+        if store.restore(data_type, TARGET_FILES[data_type]):
+            logger.info(f"♻️  {data_type.upper()}: 数据文件已从快照恢复")
+        info = store.info(data_type)
+        if info:
+            logger.info(f"📦 {data_type.upper()}: 继续使用 {info['count']} 个项目（发布于 {info['published_at']}）")
+    
+    command = [sys.executable, str(Path(__file__).resolve()), *types]
+    if budget:
+        command += ['--budget', str(budget)]
+    if force:
+        command.append('--force')
+    if isolated:
+        command.append('--isolated')
+    log_file = Path(LAST_GOOD_CONFIG["refresh_log"])
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_file, 'ab') as log:
+        # 新会话中运行：命令行退出或终端关闭后刷新继续进行
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                   start_new_session=True)
+    logger.info(f"🔄 后台刷新已启动（PID {process.pid}），输出见 {log_file}")
+    return 0
+
+
+def main(data_types: Optional[List[str]] = None, budget: Optional[float] = None, force: bool = False,
+         isolated: Optional[bool] = None) -> int:
+    """
+    主函数 - 执行数据更新任务
+    
+    Args:
+        data_types: 要更新的数据类型，默认全部
+        budget: 整次运行的时间预算（秒），默认 DEADLINE_CONFIG["run_seconds"]
+        force: 跳过数量回退检查
+        isolated: 在资源受限的子进程中运行各采集器，默认 ISOLATION_CONFIG["enabled"]
+        
+    Returns:
+        退出码（0 全部成功，1 部分成功，2 全部失败）
+    """
     logger.info("╔════════════════════════════════════════════════════════════╗")
     logger.info("║   硬件参数小助手 - 数据更新控制器                         ║")
     logger.info("╚════════════════════════════════════════════════════════════╝")
@@ -162,12 +342,28 @@ def main():
     BackupManager.cleanup_old_backups(PATHS["BACKUP_DIR"])
     logger.info("")
     
+    # 整次运行的时间预算，每个类别再分出不超过剩余预算的子预算
+    deadline = Deadline(budget or DEADLINE_CONFIG["run_seconds"],
+                        reserve=DEADLINE_CONFIG["reserve_seconds"], name="update_db")
+    logger.info(f"⏱️  时间预算: {deadline}")
+    if isolated is None:
+        isolated = ISOLATION_CONFIG["enabled"]
+    
     # 更新所有类型的数据
     success_results = {}
     
     for data_type, target_file in TARGET_FILES.items():
+        if data_types and data_type not in data_types:
+            continue
+        if deadline.low():
+            # 整体预算已用尽：不再采集，保留现有数据
+            deadline.mark_exhausted()
+            logger.warning(f"⏱️  时间预算已用尽，跳过{data_type.upper()}，保留现有数据")
+            success_results[data_type] = False
+            continue
         try:
-            success = update_single_data(data_type, target_file)
+            child = deadline.child(DEADLINE_CONFIG["category_seconds"].get(data_type), name=data_type)
+            success = update_single_data(data_type, target_file, child, force, isolated)
             success_results[data_type] = success
         except Exception as e:
             logger.error(f"❌ {data_type.upper()}更新过程中发生异常: {e}")
@@ -189,6 +385,11 @@ def main():
     
     logger.info(f"\n   总计: {success_count}/{total_count} 成功")
     
+    # 导出本次运行的 HTTP 请求指标（各主机耗时分布、重试和等待时间）；
+    # 采集器以 scripts 目录下的模块名导入 http_transport，这里必须用同一个模块名才能取到同一个连接池
+    from http_transport import export_metrics
+    export_metrics()
+    
     # 返回状态码
     if success_count == total_count:
         logger.info("\n🎉 所有数据更新成功！")
@@ -202,5 +403,12 @@ def main():
 
 
 if __name__ == "__main__":
-    exit_code = main()
+    import argparse
+    parser = argparse.ArgumentParser(description="更新本地 JSON 数据库")
+    parser.add_argument('types', nargs='*', metavar='TYPE', help=f"数据类型（{', '.join(TARGET_FILES)}，默认全部）")
+    parser.add_argument('--budget', type=float, metavar='SECONDS', help='整次运行的时间预算（秒）')
+    parser.add_argument('--force', action='store_true', help='跳过数量回退检查')
+    parser.add_argument('--isolated', action='store_true', default=None, help='在资源受限的子进程中运行各采集器')
+    args = parser.parse_args()
+    exit_code = main(args.types or None, args.budget, args.force, args.isolated)
     sys.exit(exit_code)
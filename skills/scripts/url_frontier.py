@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+增量采集的详情页 URL 边界
+以型号详情页 URL 为键持久化记录上次采集时间、内容指纹和采集结果（SQLite），
+增量模式下只采集：
+1. 从未采集过的 URL（内存中的已见集合判断，无需查库）
+2. 超过刷新间隔的 URL：间隔按发布时长分档（新品频繁刷新，老型号很少刷新）
+其余 URL 直接复用上次的采集结果。
+
+使用方法：
+python url_frontier.py            # 查看边界统计
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+from date_normalizer import parse_date
+from config import FRONTIER_CONFIG
+
+
+# 计算指纹时忽略的易变字段
+VOLATILE_FIELDS = ('scraped_at',)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    url          TEXT PRIMARY KEY,
+    model        TEXT,
+    release_date TEXT,
+    fetched_at   REAL NOT NULL,
+    changed_at   REAL NOT NULL,
+    fingerprint  TEXT NOT NULL,
+    record       TEXT NOT NULL
+)
+"""
+
+_DAY = 86400.0
+
+
+def fingerprint(record: Dict[str, Any], ignore: Iterable[str] = VOLATILE_FIELDS) -> str:
+    """记录内容指纹（忽略采集时间等易变字段）"""
+    stable = {k: v for k, v in record.items() if k not in set(ignore)}
+    return hashlib.md5(json.dumps(stable, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def refresh_interval_days(release_date: Any, today: Optional[date] = None) -> float:
+    """
+    按发布时长取重新采集间隔
+
+    Args:
+        release_date: 发布日期（任意 date_normalizer 支持的写法）
+        today: 计算发布时长的基准日期
+
+    Returns:
+        间隔天数
+    """
+    released = parse_date(release_date)
+    if released is None:
+        return FRONTIER_CONFIG["unknown_age_days"]
+    age = ((today or date.today()) - released).days
+    for max_age, interval in FRONTIER_CONFIG["refresh_policy"]:
+        if max_age is None or age <= max_age:
+            return interval
+    return FRONTIER_CONFIG["refresh_policy"][-1][1]
+
+
+class UrlFrontier:
+    """持久化的详情页 URL 边界"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path or FRONTIER_CONFIG["path"])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(_SCHEMA)
+        # 已见 URL 及其上次采集时间、发布日期常驻内存，判断是否需要采集时不访问数据库
+        self._seen: Dict[str, tuple] = {
+            url: (fetched_at, release_date)
+            for url, fetched_at, release_date in self._conn.execute(
+                "SELECT url, fetched_at, release_date FROM frontier")
+        }
+        self._uncommitted = 0
+        self.stats = {"new": 0, "stale": 0, "fresh": 0, "changed": 0}
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._seen
+
+    def needs_fetch(self, url: str, release_date: Any = None, now: Optional[float] = None) -> bool:
+        """
+        判断详情页是否需要采集
+
+        Args:
+            url: 详情页 URL
+            release_date: 列表页上的发布日期（优先于上次记录的日期）
+            now: 当前时间戳
+
+        Returns:
+            新 URL 或已超过刷新间隔时为 True
+        """
+        entry = self._seen.get(url)
+        if entry is None:
+            self.stats["new"] += 1
+            return True
+        fetched_at, known_release = entry
+        now = time.time() if now is None else now
+        interval = refresh_interval_days(release_date or known_release, date.fromtimestamp(now))
+        if now - fetched_at >= interval * _DAY:
+            self.stats["stale"] += 1
+            return True
+        self.stats["fresh"] += 1
+        return False
+
+    def get_record(self, url: str) -> Optional[Dict[str, Any]]:
+        """上次采集的结果"""
+        row = self._conn.execute("SELECT record FROM frontier WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, url: str, record: Dict[str, Any], release_date: Any = None,
+               now: Optional[float] = None) -> bool:
+        """
+        记录一次采集结果
+
+        Returns:
+            内容是否与上次不同（新 URL 视为变化）
+        """
+        now = time.time() if now is None else now
+        digest = fingerprint(record)
+        row = self._conn.execute("SELECT fingerprint, changed_at FROM frontier WHERE url = ?", (url,)).fetchone()
+        changed = row is None or row[0] != digest
+        changed_at = now if changed else row[1]
+        release_text = str(release_date) if release_date not in (None, '') else None
+        self._conn.execute(
+            "INSERT OR REPLACE INTO frontier (url, model, release_date, fetched_at, changed_at, fingerprint, record) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, record.get('model'), release_text, now, changed_at, digest,
+             json.dumps(record, ensure_ascii=False))
+        )
+        self._seen[url] = (now, release_text)
+        if changed:
+            self.stats["changed"] += 1
+        self._uncommitted += 1
+        if self._uncommitted >= FRONTIER_CONFIG["commit_every"]:
+            self.commit()
+        return changed
+
+    def commit(self) -> None:
+        self._conn.commit()
+        self._uncommitted = 0
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self.commit()
+            self._conn.close()
+            self._conn = None
+
+    def summary(self) -> Dict[str, Any]:
+        """边界整体统计"""
+        count, oldest, newest = self._conn.execute(
+            "SELECT COUNT(*), MIN(fetched_at), MAX(fetched_at) FROM frontier").fetchone()
+        to_text = lambda ts: datetime.fromtimestamp(ts).isoformat(timespec='seconds') if ts else None
+        now = time.time()
+        due = sum(1 for url, (fetched_at, release) in self._seen.items()
+                  if now - fetched_at >= refresh_interval_days(release) * _DAY)
+        return {"urls": count, "due": due, "oldest_fetch": to_text(oldest), "newest_fetch": to_text(newest)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main():
+    """打印边界统计"""
+    with UrlFrontier() as frontier:
+        summary = frontier.summary()
+    print(f"🗂️  边界文件: {FRONTIER_CONFIG['path']}")
+    print(f"🔗 已记录 URL: {summary['urls']}（到期待刷新 {summary['due']}）")
+    print(f"🕒 最早采集: {summary['oldest_fetch'] or '-'}，最近采集: {summary['newest_fetch'] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
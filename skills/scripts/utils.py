@@ -10,9 +10,10 @@ import shutil
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional
 
 from config import LOG_CONFIG, BACKUP_CONFIG, VALIDATION_CONFIG
+from json_stream import write_json_items
 
 
 class Logger:
@@ -225,27 +226,27 @@ class DataComparator:
         Returns:
             变更统计字典
         """
-        old_ids = {item["id"]: item for item in old_data}
-        new_ids = {item["id"]: item for item in new_data}
-        
-        old_id_set = set(old_ids.keys())
-        new_id_set = set(new_ids.keys())
-        
-        # 计算变更
-        added = new_id_set - old_id_set
-        removed = old_id_set - new_id_set
-        common = old_id_set & new_id_set
-        
-        # 检查更新的项目
+        # 只为旧数据建索引，新数据逐条对照，不再复制一份新数据的字典
+        old_by_id = {item["id"]: item for item in old_data}
+        new_id_set = set()
+        added = set()
         updated = set()
-        for item_id in common:
-            if old_ids[item_id] != new_ids[item_id]:
+        total_new = 0
+        for item in new_data:
+            total_new += 1
+            item_id = item["id"]
+            new_id_set.add(item_id)
+            old_item = old_by_id.get(item_id)
+            if old_item is None:
+                added.add(item_id)
+            elif old_item != item:
                 updated.add(item_id)
         
-        unchanged = common - updated
+        removed = old_by_id.keys() - new_id_set
+        unchanged = (new_id_set - added) - updated
         
         return {
-            "total_new": len(new_data),
+            "total_new": total_new,
             "total_old": len(old_data),
             "added": len(added),
             "removed": len(removed),
@@ -278,21 +279,19 @@ class DataComparator:
             logger.debug(f"   删除ID: {', '.join(stats['removed_ids'][:5])}...")
 
 
-def save_json(data: List[Dict], file_path: Path) -> bool:
+def save_json(data: Iterable[Dict], file_path: Path) -> bool:
     """
-    保存数据到JSON文件
+    保存数据到JSON文件（逐条写入临时文件后替换，失败时原文件不受影响）
     
     Args:
-        data: 数据列表
+        data: 数据列表或记录迭代器
         file_path: 文件路径
         
     Returns:
         是否成功
     """
     try:
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        write_json_items(data, file_path)
         logger.info(f"✅ 数据保存成功: {file_path}")
         return True
     except Exception as e:
@@ -9,18 +9,17 @@ import os
 import sys
 import time
 import random
-import ssl
-import gzip
-from io import BytesIO
 from datetime import datetime, timedelta
-from urllib.request import urlopen, Request
-from urllib.error import URLError, HTTPError
 from html.parser import HTMLParser
 
-# 创建一个不验证SSL证书的上下文
-ssl_context = ssl.create_default_context()
-ssl_context.check_hostname = False
-ssl_context.verify_mode = ssl.CERT_NONE
+from date_normalizer import parse_date
+from unit_parser import (
+    HAS_NUMPY, parse_clock_range, parse_cache, parse_power, parse_clock_range_array, parse_array
+)
+from http_transport import HTTPStatusError, TransportError, get_transport
+
+if HAS_NUMPY:
+    import numpy as np
 
 # 自定义HTML解析器来处理表格数据
 class TableParser(HTMLParser):
@@ -86,8 +85,6 @@ class CpuWebScraper:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
             "Upgrade-Insecure-Requests": "1"
         }
     
@@ -103,23 +100,10 @@ class CpuWebScraper:
         try:
             # 发送请求
             print(f"📄 获取页面: {self.cpu_db_url}")
-            request = Request(self.cpu_db_url, headers=self.headers)
-            
-            # 设置超时并使用SSL上下文
-            with urlopen(request, timeout=30, context=ssl_context) as response:
-                content = response.read()
-                
-                # 检查是否是gzip压缩内容
-                content_encoding = response.info().get('Content-Encoding', '')
-                if 'gzip' in content_encoding:
-                    # 解压缩gzip内容
-                    buffer = BytesIO(content)
-                    with gzip.GzipFile(fileobj=buffer, mode='rb') as f:
-                        content = f.read()
-                
-                # 解码内容
-                encoding = response.info().get_content_charset('utf-8')
-                html_content = content.decode(encoding)
+            # 共享传输层负责连接复用、压缩解码、字符集识别和重试
+            response = get_transport().get(self.cpu_db_url, headers=self.headers, timeout=30)
+            response.raise_for_status()
+            html_content = response.text
             
             # 解析页面
             parser = TableParser()
@@ -137,10 +121,13 @@ class CpuWebScraper:
             
             cpu_data = []
             
+            # 频率、缓存、TDP 列整列批量解析
+            units = self._parse_unit_columns(rows)
+            
             # 解析每一行
             for i, row in enumerate(rows):  # 处理所有行数据
                 try:
-                    cpu_item = self._parse_cpu_row(row)
+                    cpu_item = self._parse_cpu_row(row, units[i] if units else None)
                     if cpu_item:
                         cpu_data.append(cpu_item)
                         print(f"  ✅ 解析成功: {cpu_item['model']}")
@@ -161,22 +148,54 @@ class CpuWebScraper:
             print(f"✅ 成功获取 {len(cpu_data)} 个CPU数据")
             return cpu_data
             
-        except HTTPError as e:
-            print(f"❌ HTTP错误: {e.code} - {e.reason}")
+        except HTTPStatusError as e:
+            print(f"❌ HTTP错误: {e.response.status_code}")
             return []
-        except URLError as e:
-            print(f"❌ URL错误: {e.reason}")
+        except TransportError as e:
+            print(f"❌ URL错误: {e}")
             return []
         except Exception as e:
             print(f"❌ 处理数据时出错: {e}")
             return []
     
-    def _parse_cpu_row(self, row):
+    def _parse_unit_columns(self, rows):
+        """
+        批量解析频率、缓存和TDP列（重复取值只解析一次）
+        
+        Args:
+            rows: 表格行数据列表
+            
+        Returns:
+            与 rows 对应的解析结果列表，未安装 numpy 时返回 None
+        """
+        if not HAS_NUMPY:
+            return None
+        
+        def column(index):
+            return [row[index] if len(row) > index else None for row in rows]
+        
+        base, boost = parse_clock_range_array(column(3), default_unit='GHz')
+        base = np.where(np.isnan(base), boost / 1.2, base)  # 只有 "up to" 加速频率时估算基础频率
+        boost = np.where(np.isnan(boost), base * 1.2, boost)  # 估算睿频
+        base = np.where(np.isnan(base), 3.0, base)
+        boost = np.where(np.isnan(boost), 4.0, boost)
+        cache = parse_array(column(6), 'cache', default_unit='MB')
+        cache = np.where(np.isnan(cache), 8.0, cache)
+        tdp = parse_array(column(7), 'power', default_unit='W')
+        tdp = np.where(np.isnan(tdp), 65, tdp).astype(int)
+        
+        return [
+            {'clock': {'base': b, 'boost': o}, 'cache': c, 'tdp': t}
+            for b, o, c, t in zip(base.tolist(), boost.tolist(), cache.tolist(), tdp.tolist())
+        ]
+    
+    def _parse_cpu_row(self, row, units=None):
         """
         解析CPU表格行
         
         Args:
             row: 表格行数据列表
+            units: 批量解析得到的频率/缓存/TDP，缺省时逐行解析
             
         Returns:
             CPU数据字典
@@ -201,7 +220,7 @@ class CpuWebScraper:
         
         # 提取时钟频率
         clock_text = row[3]
-        clock_info = self._parse_clock(clock_text)
+        clock_info = units['clock'] if units else self._parse_clock(clock_text)
         
         # 提取插槽
         socket = row[4]
@@ -211,11 +230,11 @@ class CpuWebScraper:
         
         # 提取缓存
         cache_text = row[6]
-        cache = self._parse_cache(cache_text)
+        cache = units['cache'] if units else self._parse_cache(cache_text)
         
         # 提取TDP
         tdp_text = row[7]
-        tdp = self._parse_tdp(tdp_text)
+        tdp = units['tdp'] if units else self._parse_tdp(tdp_text)
         
         # 构建CPU数据
         cpu_data = {
@@ -313,31 +332,14 @@ class CpuWebScraper:
         Returns:
             基础和 boost 频率字典
         """
-        import re
-        
-        # 格式: "3.4 to 4.6 GHz" 或 "3.6-4.2 GHz"
-        try:
-            # 提取所有数字
-            numbers = re.findall(r'\d+\.?\d*', clock_text)
-            if len(numbers) >= 2:
-                base = float(numbers[0])
-                boost = float(numbers[1])
-            elif len(numbers) == 1:
-                base = float(numbers[0])
-                boost = base * 1.2  # 估算睿频
-            else:
-                base = 3.0
-                boost = 4.0
-            
-            # 检查单位
-            if 'MHZ' in clock_text.upper():
-                base = base / 1000
-                boost = boost / 1000
-                
-        except:
-            base = 3.0
-            boost = 4.0
-        
+        # 格式: "3.4 to 4.6 GHz" 或 "3.6-4.2 GHz"，无单位时按 GHz 处理
+        base, boost = parse_clock_range(clock_text, default_unit='GHz')
+        if base is None and boost is None:
+            return {'base': 3.0, 'boost': 4.0}
+        if base is None:
+            base = boost / 1.2  # 只有 "up to" 加速频率时估算基础频率
+        if boost is None:
+            boost = base * 1.2  # 估算睿频
         return {'base': base, 'boost': boost}
     
     def _parse_cache(self, cache_text):
@@ -350,24 +352,8 @@ class CpuWebScraper:
         Returns:
             缓存大小（MB）
         """
-        import re
-        
-        try:
-            # 提取数字
-            numbers = re.findall(r'\d+\.?\d*', cache_text)
-            if numbers:
-                cache = float(numbers[0])
-                # 检查单位
-                if 'KB' in cache_text.upper():
-                    cache = cache / 1024  # KB转MB
-                elif 'GB' in cache_text.upper():
-                    cache = cache * 1024  # GB转MB
-                return cache
-        except:
-            pass
-        
-        # 默认值
-        return 8.0
+        cache = parse_cache(cache_text, default_unit='MB')
+        return cache if cache is not None else 8.0
     
     def _parse_tdp(self, tdp_text):
         """
@@ -379,18 +365,8 @@ class CpuWebScraper:
         Returns:
             TDP值（W）
         """
-        import re
-        
-        try:
-            # 提取数字
-            numbers = re.findall(r'\d+', tdp_text)
-            if numbers:
-                return int(numbers[0])
-        except:
-            pass
-        
-        # 默认值
-        return 65
+        tdp = parse_power(tdp_text, default_unit='W')
+        return int(tdp) if tdp is not None else 65
     
     def _estimate_release_date(self, model, brand):
         """
@@ -566,18 +542,15 @@ def get_recent_cpu_data(cpu_data, years=10):
     recent_cpu_data = []
     
     for cpu in cpu_data:
-        try:
-            # 解析发布日期
-            release_date_str = cpu.get('releaseDate', '')
-            release_date = datetime.strptime(release_date_str, '%Y-%m-%d')
-            
-            # 检查是否在时间范围内
-            if release_date >= cutoff_date:
-                recent_cpu_data.append(cpu)
-                
-        except Exception as e:
-            print(f"⚠️  处理CPU数据时出错: {e}")
+        # 解析发布日期（支持 ISO、季度、月份等写法）
+        release_date = parse_date(cpu.get('releaseDate'))
+        if release_date is None:
+            print(f"⚠️  无法解析日期: {cpu.get('releaseDate')}")
             continue
+        
+        # 检查是否在时间范围内
+        if release_date >= cutoff_date.date():
+            recent_cpu_data.append(cpu)
     
     print(f"✅ 过滤出 {len(recent_cpu_data)} 个近{years}年的CPU数据")
     return recent_cpu_data
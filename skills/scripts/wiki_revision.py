@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+按修订号增量获取维基百科页面
+维基百科列表页一个月只改动几次，每次运行先用一次轻量的元数据请求取最新修订号：
+1. 修订号未变：不下载页面，直接复用上次的解析结果；解析器版本（调用方的 PARSER_VERSION）变化时
+   用缓存的章节 HTML 重新解析
+2. 修订号变化：通过 compare 接口取两版差异，按差异所在的 wikitext 行定位受影响的章节，
+   只重新获取这些章节的 HTML，与缓存中其余章节拼回整页后重新解析
+3. 差异涉及标题行、嵌入模板章节或改动过多时，整页重新获取
+
+所有请求走 MediaWiki API（action=query / compare / parse），传输层可替换：
+RecordedTransport 把请求和响应录制到本地目录，之后可离线回放验证上述流程。
+
+使用方法：
+with WikiRevisionFetcher() as fetcher:
+    rows = fetcher.fetch_rows(url, parse_html, version=PARSER_VERSION)
+
+python wiki_revision.py URL [URL ...] [--record DIR | --replay DIR]
+"""
+
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import unquote
+
+from config import WIKI_REVISION_CONFIG
+from http_transport import get_transport
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    title      TEXT PRIMARY KEY,
+    revid      INTEGER NOT NULL,
+    sections   TEXT NOT NULL,
+    rows       TEXT,
+    parser     TEXT,
+    checked_at REAL NOT NULL
+)
+"""
+
+_DIFF_LINENO = re.compile(r'<td[^>]*class="diff-lineno"[^>]*>\s*Line\s+([\d,]+):?\s*</td>', re.I)
+_DIFF_CHANGED_CELL = re.compile(r'<td[^>]*class="diff-(?:deletedline|addedline)[^"]*"[^>]*>(.*?)</td>', re.I | re.S)
+_TAG = re.compile(r'<[^>]+>')
+_HEADING_LINE = re.compile(r'^\s*=+[^=].*=+\s*$')
+_HEADING_TAG = re.compile(r'<h[1-6]\b', re.I)
+
+
+def page_title(url_or_title: str) -> str:
+    """从 https://en.wikipedia.org/wiki/Title 形式的 URL 中取页面标题"""
+    title = url_or_title.rsplit('/wiki/', 1)[-1]
+    return unquote(title.split('#', 1)[0]).replace('_', ' ')
+
+
+class HttpTransport:
+    """直接请求 MediaWiki API（经由共享的 HTTP 传输层）"""
+
+    def __init__(self, api_url: Optional[str] = None):
+        self.api_url = api_url or WIKI_REVISION_CONFIG["api_url"]
+        self.transport = get_transport()
+        self.headers = {'User-Agent': WIKI_REVISION_CONFIG["user_agent"]}
+
+    def __call__(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        response = self.transport.get(self.api_url, params={**params, 'format': 'json', 'formatversion': 2},
+                                      headers=self.headers, timeout=WIKI_REVISION_CONFIG["timeout"])
+        response.raise_for_status()
+        data = response.json()
+        if 'error' in data:
+            raise RuntimeError(f"MediaWiki API 错误: {data['error'].get('info', data['error'])}")
+        return data
+
+
+class RecordedTransport:
+    """
+    本地录制的 API 替身：每组请求参数对应一个 JSON 文件，按顺序保存该请求的全部响应
+
+    录制模式（指定 live）下每次请求都转发给 live 并追加响应；回放模式下同一请求依次返回
+    录制的响应（用完后一直返回最后一个），因此可以重现"修订号变化"这类多次运行的过程。
+    未录制的请求抛出 KeyError。
+    """
+
+    def __init__(self, directory: Union[str, Path], live: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.live = live
+        self.requests: List[Dict[str, Any]] = []
+        self._replayed: Dict[Path, int] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, params: Dict[str, Any]) -> Path:
+        key = json.dumps({k: str(v) for k, v in params.items()}, sort_keys=True)
+        return self.directory / f"{params.get('action', 'api')}-{hashlib.md5(key.encode('utf-8')).hexdigest()[:12]}.json"
+
+    def __call__(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        path = self.path_for(params)
+        with self._lock:
+            self.requests.append(dict(params))
+            recorded = None
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    recorded = json.load(f)
+            if self.live is None:
+                if recorded is None:
+                    raise KeyError(f"未录制的请求: {params}")
+                count = self._replayed.get(path, 0)
+                self._replayed[path] = count + 1
+                return recorded['responses'][min(count, len(recorded['responses']) - 1)]
+        response = self.live(params)
+        with self._lock:
+            recorded = {'params': params, 'responses': []}
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    recorded = json.load(f)
+            recorded['responses'].append(response)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(recorded, f, ensure_ascii=False)
+        return response
+
+
+def split_sections(html: str, sections: List[Dict[str, Any]]) -> List[str]:
+    """
+    按章节锚点把 parse 接口返回的整页 HTML 切成各章节片段
+
+    Args:
+        html: 整页 HTML
+        sections: parse 接口的 sections 列表
+
+    Returns:
+        [导言, 章节1, 章节2, ...]，拼接后与原 HTML 相同
+    """
+    cuts = []
+    pos = 0
+    for section in sections:
+        anchor = html.find(f'id="{section["anchor"]}"', pos)
+        if anchor < 0:
+            raise ValueError(f"HTML 中找不到章节锚点: {section['anchor']}")
+        # 章节从标题 <hN> 开始；新版皮肤的标题外面还包着一层 <div class="mw-heading">
+        headings = [m.start() for m in _HEADING_TAG.finditer(html, pos, anchor)]
+        start = headings[-1] if headings else anchor
+        wrapper = html.rfind('<div class="mw-heading', pos, start)
+        if wrapper >= 0 and not html[html.index('>', wrapper) + 1:start].strip():
+            start = wrapper
+        cuts.append(start)
+        pos = anchor
+    bounds = [0] + cuts + [len(html)]
+    return [html[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+
+def section_line_starts(wikitext: str, sections: List[Dict[str, Any]]) -> List[int]:
+    """各章节标题在 wikitext 中的行号（从 1 开始），导言从第 1 行开始"""
+    data = wikitext.encode('utf-8')
+    return [1] + [data[:int(s['byteoffset'])].count(b'\n') + 1 for s in sections]
+
+
+def section_line_counts(wikitext: str, sections: List[Dict[str, Any]]) -> tuple:
+    """
+    各章节（含导言）在 wikitext 中占的行数，按标题的字节偏移计算，包括章节末尾的空行
+
+    Returns:
+        ([章节号, ...], [行数, ...])，导言的章节号为 0
+    """
+    starts = section_line_starts(wikitext, sections)
+    total = wikitext.count('\n') + 1
+    counts = [b - a for a, b in zip(starts, starts[1:] + [total + 1])]
+    return [0] + [int(s['index']) for s in sections], counts
+
+
+def changed_old_ranges(diff_html: str) -> Optional[List[tuple]]:
+    """
+    从 compare 接口的差异 HTML 中取每段改动在旧版本中覆盖的行范围
+
+    Returns:
+        [(起始行, 结束行), ...]（含上下文行，偏保守）；改动涉及章节标题时返回 None（章节结构变化，需整页获取）
+    """
+    for cell in _DIFF_CHANGED_CELL.findall(diff_html):
+        if _HEADING_LINE.match(_TAG.sub('', cell)):
+            return None
+    # 差异表中每段改动以一对 "Line N:"（左侧旧版本、右侧新版本）开头，
+    # 其后含上下文行或删除行的 <tr> 各对应一行旧文本
+    matches = list(_DIFF_LINENO.finditer(diff_html))
+    ranges = []
+    for i in range(0, len(matches) - 1, 2):
+        start = int(matches[i].group(1).replace(',', ''))
+        end_pos = matches[i + 2].start() if i + 2 < len(matches) else len(diff_html)
+        rows = diff_html[matches[i + 1].end():end_pos].split('<tr')
+        old_lines = sum(1 for row in rows if 'diff-context' in row or 'diff-deletedline' in row)
+        ranges.append((start, start + max(old_lines - 1, 0)))
+    return ranges
+
+
+class WikiRevisionFetcher:
+    """维基百科页面的修订号缓存（SQLite，线程安全）"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None,
+                 transport: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        """
+        Args:
+            path: 缓存数据库路径
+            transport: 接收 API 参数、返回 JSON 的函数（默认 HttpTransport）
+        """
+        self.path = Path(path or WIKI_REVISION_CONFIG["store_path"])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.transport = transport or HttpTransport()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        # 旧版缓存没有 parser 列：补上后旧记录的解析器版本为 NULL，下次读取时重新解析
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}
+        if 'parser' not in columns:
+            self._conn.execute("ALTER TABLE pages ADD COLUMN parser TEXT")
+            self._conn.commit()
+        self._lock = threading.Lock()
+        self.stats = {"unchanged": 0, "reparsed": 0, "sections": 0, "full": 0}
+
+    # -- API ------------------------------------------------------------
+    def latest_revision(self, title: str) -> int:
+        """页面当前修订号（只请求元数据）"""
+        data = self.transport({'action': 'query', 'prop': 'revisions', 'titles': title, 'rvprop': 'ids'})
+        page = data['query']['pages'][0]
+        if page.get('missing'):
+            raise KeyError(f"页面不存在: {title}")
+        return int(page['revisions'][0]['revid'])
+
+    def _parse(self, **params) -> Dict[str, Any]:
+        return self.transport({'action': 'parse', 'disableeditsection': 1, **params})['parse']
+
+    def _fetch_full(self, title: str) -> Dict[str, Any]:
+        """整页获取：HTML 按顶级章节切分，并记录各章节在 wikitext 中的行数"""
+        parsed = self._parse(page=title, prop='text|sections|wikitext|revid')
+        sections = parsed['sections']
+        whole = {'revid': parsed['revid'], 'sections': [{'index': None, 'html': parsed['text'], 'lines': None}]}
+        # 接口按章节号返回时包含全部子章节，因此只在顶级章节处切分
+        top = min((int(s['level']) for s in sections), default=None)
+        tops = [s for s in sections if int(s['level']) == top]
+        if not tops or sections[0] is not tops[0]:
+            return whole
+        if any(not str(s.get('index', '')).isdigit() or s.get('byteoffset') is None for s in tops):
+            # 嵌入模板的章节无法单独获取，只保存整页
+            return whole
+        htmls = split_sections(parsed['text'], tops)
+        indexes, counts = section_line_counts(parsed['wikitext'], tops)
+        return {'revid': parsed['revid'],
+                'sections': [{'index': i, 'html': h, 'lines': n} for i, h, n in zip(indexes, htmls, counts)]}
+
+    def _fetch_changed_sections(self, title: str, cached: Dict[str, Any], revid: int) -> Optional[Dict[str, Any]]:
+        """只重新获取差异涉及的章节；无法增量时返回 None"""
+        sections = cached['sections']
+        if len(sections) < 2 or any(s['lines'] is None for s in sections):
+            return None
+        diff = self.transport({'action': 'compare', 'fromrev': cached['revid'], 'torev': revid, 'prop': 'diff'})
+        ranges = changed_old_ranges(diff['compare'].get('body', ''))
+        if not ranges:
+            return None
+        # 旧版本中各章节的行范围
+        bounds, line = [], 1
+        for section in sections:
+            bounds.append((line, line + section['lines'] - 1))
+            line += section['lines']
+        affected = [i for i, (first, last) in enumerate(bounds)
+                    if any(start <= last and end >= first for start, end in ranges)]
+        if not affected or len(affected) > len(sections) * WIKI_REVISION_CONFIG["max_changed_ratio"]:
+            return None
+        # 新版本各章节的行数按整页 wikitext 中的标题字节偏移重新计算：章节接口返回的 wikitext
+        # 去掉了末尾空行，用它计算会让后面章节的行范围逐次错位，之后的差异落到错误的章节
+        layout = self._parse(oldid=revid, prop='sections|wikitext')
+        top = min((int(s['level']) for s in layout['sections']), default=None)
+        tops = [s for s in layout['sections'] if int(s['level']) == top]
+        if any(not str(s.get('index', '')).isdigit() or s.get('byteoffset') is None for s in tops):
+            return None
+        indexes, counts = section_line_counts(layout['wikitext'], tops)
+        if indexes != [s['index'] for s in sections]:
+            # 章节结构变化（差异中没有标题行时通常不会发生），整页获取
+            return None
+        updated = [dict(s, lines=n) for s, n in zip(sections, counts)]
+        for i in affected:
+            parsed = self._parse(oldid=revid, section=sections[i]['index'], prop='text')
+            updated[i]['html'] = parsed['text']
+        print(f"🧩 {title}: 修订 {cached['revid']} -> {revid}，重新获取章节 {[sections[i]['index'] for i in affected]}")
+        return {'revid': revid, 'sections': updated}
+
+    # -- 缓存 -----------------------------------------------------------
+    def _load(self, title: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT revid, sections, rows, parser FROM pages WHERE title = ?", (title,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'revid': row[0], 'sections': json.loads(row[1]), 'rows': json.loads(row[2]) if row[2] else None,
+                'parser': row[3] or ""}
+
+    def _save(self, title: str, page: Dict[str, Any], rows: Optional[List[Any]], version: str = "") -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (title, revid, sections, rows, parser, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (title, page['revid'], json.dumps(page['sections'], ensure_ascii=False),
+                 json.dumps(rows, ensure_ascii=False) if rows is not None else None, version, time.time())
+            )
+            self._conn.commit()
+
+    def fetch_rows(self, url: str, parse: Callable[[str], Optional[List[Any]]],
+                   version: str = "") -> Optional[List[Any]]:
+        """
+        获取页面并返回解析结果，修订号和解析器版本都未变时直接复用上次的结果
+
+        Args:
+            url: 页面 URL 或标题
+            parse: 接收整页 HTML、返回记录列表的函数
+            version: 解析器版本（调用方模块的 PARSER_VERSION）
+
+        Returns:
+            记录列表
+        """
+        title = page_title(url)
+        revid = self.latest_revision(title)
+        cached = self._load(title)
+        page = None
+        if cached is not None and cached['revid'] == revid and cached['rows'] is not None:
+            if cached['parser'] == version:
+                self.stats["unchanged"] += 1
+                print(f"♻️  {title}: 修订 {revid} 未变化，复用上次的 {len(cached['rows'])} 条记录")
+                return cached['rows']
+            # 页面未变、解析器已更新：用缓存的章节 HTML 重新解析，不需要下载
+            page = {'revid': revid, 'sections': cached['sections']}
+            self.stats["reparsed"] += 1
+            print(f"🔁 {title}: 解析器已更新，重新解析修订 {revid}")
+
+        if page is None and cached is not None and cached['revid'] != revid:
+            page = self._fetch_changed_sections(title, cached, revid)
+            if page is not None:
+                self.stats["sections"] += 1
+        if page is None:
+            page = self._fetch_full(title)
+            self.stats["full"] += 1
+        rows = parse(''.join(s['html'] for s in page['sections']))
+        self._save(title, page, rows, version)
+        return rows
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_revision_fetcher() -> Optional[WikiRevisionFetcher]:
+    """按配置打开修订号缓存；关闭时返回 None"""
+    return WikiRevisionFetcher() if WIKI_REVISION_CONFIG["enabled"] else None
+
+
+def main():
+    """命令行：检查页面修订号并更新缓存（可录制 / 回放 API 响应）"""
+    import argparse
+    parser = argparse.ArgumentParser(description="按修订号增量获取维基百科页面")
+    parser.add_argument('urls', nargs='+', help='页面 URL 或标题')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--record', metavar='DIR', help='请求真实接口并把响应录制到目录')
+    group.add_argument('--replay', metavar='DIR', help='只使用目录中录制的响应')
+    parser.add_argument('--store', help='缓存数据库路径（默认读取配置）')
+    args = parser.parse_args()
+
+    if args.record:
+        transport = RecordedTransport(args.record, live=HttpTransport())
+    elif args.replay:
+        transport = RecordedTransport(args.replay)
+    else:
+        transport = HttpTransport()
+    with WikiRevisionFetcher(args.store, transport) as fetcher:
+        for url in args.urls:
+            rows = fetcher.fetch_rows(url, lambda html: [len(html)])
+            print(f"📄 {page_title(url)}: HTML {rows[0]} 字符")
+        print(f"📊 未变化 {fetcher.stats['unchanged']}，重新解析 {fetcher.stats['reparsed']}，"
+              f"按章节更新 {fetcher.stats['sections']}，"
+              f"整页获取 {fetcher.stats['full']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+维基百科 wikitable 专用提取器
+代替 pandas.read_html：只处理 class 含 wikitable 的表格，表头解析完后先按表头特征筛选，
+不匹配的表格不再构建数据行；rowspan / colspan 按单元格网格展开，数据行以字符串列表
+直接交给调用方做标准化，不经过 DataFrame。
+
+使用方法：
+for table in extract_wikitables(html, signature=['model', 'cores']):
+    for row in table.rows:
+        ...
+
+python wikitable.py --benchmark [页面 URL 或本地 HTML 文件] [--repeat 5]
+"""
+
+import re
+import sys
+import time
+import importlib.util
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+# pandas 只在耗时对比时用到，导入需要数百毫秒，这里只检查是否安装
+HAS_PANDAS = importlib.util.find_spec('pandas') is not None
+
+# 提取结果（表头合并、rowspan / colspan 展开）变化时递增；调用方把它并入自己的 PARSER_VERSION
+PARSER_VERSION = "1"
+
+
+# 不计入单元格文本的元素（引用角标、内联样式）
+_SKIP_TAGS = {'style', 'script'}
+
+Signature = Union[Sequence[str], Callable[[List[str]], bool], None]
+
+
+class WikiTable:
+    """一张 wikitable：表头（多行表头按列合并）和展开后的数据行"""
+
+    __slots__ = ('index', 'caption', 'headers', 'rows')
+
+    def __init__(self, index: int, caption: str = ''):
+        self.index = index
+        self.caption = caption
+        self.headers: List[str] = []
+        self.rows: List[List[str]] = []
+
+    @property
+    def width(self) -> int:
+        return max([len(self.headers)] + [len(row) for row in self.rows[:5]])
+
+    def records(self) -> List[Dict[str, str]]:
+        """按表头转换为字典列表"""
+        headers = [h or f'col{i}' for i, h in enumerate(self.headers)]
+        return [dict(zip(headers, row)) for row in self.rows]
+
+    def __repr__(self) -> str:
+        return f"WikiTable(#{self.index}, {len(self.headers)} cols, {len(self.rows)} rows)"
+
+
+class _SpanGrid:
+    """按 rowspan / colspan 把原始行展开成等宽网格"""
+
+    def __init__(self):
+        # 列号 -> [剩余行数, 文本]
+        self._pending: Dict[int, list] = {}
+
+    def expand(self, cells: List[tuple]) -> List[str]:
+        row: List[str] = []
+        col = 0
+        cells = list(cells)
+        while cells or any(c >= col for c in self._pending):
+            span = self._pending.get(col)
+            if span is not None:
+                row.append(span[1])
+                span[0] -= 1
+                if span[0] <= 0:
+                    del self._pending[col]
+                col += 1
+                continue
+            if not cells:
+                # 剩余的只有更右侧的跨行单元格，中间留空
+                row.append('')
+                col += 1
+                continue
+            text, rowspan, colspan = cells.pop(0)
+            for _ in range(colspan):
+                if rowspan > 1:
+                    self._pending[col] = [rowspan - 1, text]
+                row.append(text)
+                col += 1
+        return row
+
+
+class _WikitableParser(HTMLParser):
+    """流式解析页面，只在 wikitable 内部收集单元格"""
+
+    def __init__(self, accept: Callable[[List[str]], bool]):
+        super().__init__(convert_charrefs=True)
+        self.accept = accept
+        self.tables: List[WikiTable] = []
+        self.selected = 0
+        self._count = 0
+        self._depth = 0           # 当前 wikitable 内部嵌套的 table 层数，0 表示不在 wikitable 中
+        self._table: Optional[WikiTable] = None
+        self._skip_table = False  # 表头不匹配，跳过剩余行
+        self._in_header = True
+        self._header_grid = _SpanGrid()
+        self._header_rows: List[List[str]] = []
+        self._grid = _SpanGrid()
+        self._row: Optional[List[tuple]] = None
+        self._row_has_td = False
+        self._cell: Optional[List[str]] = None
+        self._cell_spans = (1, 1)
+        self._caption: Optional[List[str]] = None
+        self._skip_depth = 0
+
+    # -- 表格边界 --------------------------------------------------------
+    def handle_starttag(self, tag, attrs):
+        if self._depth == 0:
+            if tag == 'table' and 'wikitable' in (dict(attrs).get('class') or '').split():
+                self._depth = 1
+                self._table = WikiTable(self._count)
+                self._count += 1
+                self._skip_table = False
+                self._in_header = True
+                self._header_grid, self._grid = _SpanGrid(), _SpanGrid()
+                self._header_rows = []
+            return
+        if tag == 'table':
+            self._depth += 1
+            return
+        if self._skip_table or self._depth > 1:
+            # 嵌套表格的内容只作为外层单元格文本
+            if tag == 'br' and self._cell is not None:
+                self._cell.append(' ')
+            return
+        if tag == 'tr':
+            self._finish_row()
+            self._row, self._row_has_td = [], False
+        elif tag in ('td', 'th'):
+            self._finish_cell()
+            if self._row is None:
+                self._row, self._row_has_td = [], False
+            attr = dict(attrs)
+            self._cell = []
+            self._cell_spans = (_span(attr.get('rowspan')), _span(attr.get('colspan')))
+            if tag == 'td':
+                self._row_has_td = True
+        elif tag == 'caption':
+            self._caption = []
+        elif tag in _SKIP_TAGS or (tag == 'sup' and 'reference' in (dict(attrs).get('class') or '')):
+            self._skip_depth += 1
+        elif tag == 'br' and self._cell is not None:
+            self._cell.append(' ')
+
+    def handle_endtag(self, tag):
+        if self._depth == 0:
+            return
+        if tag == 'table':
+            self._depth -= 1
+            if self._depth == 0:
+                self._finish_row()
+                self._finish_header()
+                if not self._skip_table:
+                    self.tables.append(self._table)
+                self._table = None
+            return
+        if self._skip_table or self._depth > 1:
+            return
+        if tag in _SKIP_TAGS or tag == 'sup':
+            if self._skip_depth:
+                self._skip_depth -= 1
+        elif tag in ('td', 'th'):
+            self._finish_cell()
+        elif tag == 'tr':
+            self._finish_row()
+        elif tag == 'caption' and self._caption is not None:
+            self._table.caption = _normalize(''.join(self._caption))
+            self._caption = None
+
+    def handle_data(self, data):
+        if self._depth == 0 or self._skip_table or self._skip_depth:
+            return
+        if self._cell is not None:
+            self._cell.append(data)
+        elif self._caption is not None:
+            self._caption.append(data)
+
+    # -- 行与单元格 ------------------------------------------------------
+    def _finish_cell(self):
+        if self._cell is None:
+            return
+        self._row.append((_normalize(''.join(self._cell)),) + self._cell_spans)
+        self._cell = None
+
+    def _finish_row(self):
+        self._finish_cell()
+        if not self._row:
+            self._row = None
+            return
+        cells, has_td = self._row, self._row_has_td
+        self._row = None
+        if self._in_header and not has_td:
+            self._header_rows.append(self._header_grid.expand(cells))
+            return
+        # 第一行数据行出现：表头已完整，先判断是否需要这张表
+        if self._in_header:
+            self._finish_header()
+            if self._skip_table:
+                return
+        self._table.rows.append(self._grid.expand(cells))
+
+    def _finish_header(self):
+        if not self._in_header:
+            return
+        self._in_header = False
+        width = max((len(r) for r in self._header_rows), default=0)
+        headers = []
+        for col in range(width):
+            parts = []
+            for header_row in self._header_rows:
+                text = header_row[col] if col < len(header_row) else ''
+                if text and text not in parts:
+                    parts.append(text)
+            headers.append(' - '.join(parts))
+        self._table.headers = headers
+        if self.accept(headers):
+            self.selected += 1
+        else:
+            self._skip_table = True
+
+
+def _span(value: Optional[str]) -> int:
+    match = re.match(r'\s*(\d+)', value or '')
+    return max(1, min(int(match.group(1)), 1000)) if match else 1
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(text.split())
+
+
+def _signature_matcher(signature: Signature) -> Callable[[List[str]], bool]:
+    if signature is None:
+        return lambda headers: True
+    if callable(signature):
+        return signature
+    keywords = [k.lower() for k in signature]
+    return lambda headers: any(k in ' '.join(headers).lower() for k in keywords)
+
+
+def extract_wikitables(html: str, signature: Signature = None, min_rows: int = 0,
+                       min_cols: int = 0) -> List[WikiTable]:
+    """
+    提取页面中的 wikitable
+
+    Args:
+        html: 页面 HTML
+        signature: 表头特征：关键词列表（表头包含任一关键词即选中）或接收表头列表的判断函数；None 表示全部
+        min_rows: 最少数据行数
+        min_cols: 最少列数
+
+    Returns:
+        选中的表格（页面顺序）
+    """
+    parser = _WikitableParser(_signature_matcher(signature))
+    parser.feed(html)
+    parser.close()
+    return [t for t in parser.tables if len(t.rows) >= min_rows and t.width >= min_cols]
+
+
+def iter_rows(html: str, signature: Signature = None, min_rows: int = 0,
+              min_cols: int = 0) -> Iterable[List[str]]:
+    """依次产出所有选中表格的数据行"""
+    for table in extract_wikitables(html, signature, min_rows, min_cols):
+        yield from table.rows
+
+
+def benchmark(html: str, signature: Signature = None, repeat: int = 5) -> Dict[str, float]:
+    """
+    对比 pandas.read_html 与本提取器的解析耗时
+
+    Returns:
+        {"read_html": 秒, "wikitable": 秒, "tables": 选中表格数, "rows": 数据行数}，未安装 pandas 时不含 read_html
+    """
+    result = {}
+    if HAS_PANDAS:
+        import pandas as pd
+        from io import StringIO
+        start = time.perf_counter()
+        for _ in range(repeat):
+            pd.read_html(StringIO(html))
+        result["read_html"] = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        tables = extract_wikitables(html, signature)
+    result["wikitable"] = (time.perf_counter() - start) / repeat
+    result["tables"] = len(tables)
+    result["rows"] = sum(len(t.rows) for t in tables)
+    return result
+
+
+def main():
+    """命令行：对比解析耗时"""
+    import argparse
+    import os
+    parser = argparse.ArgumentParser(description="wikitable 提取器与 pandas.read_html 耗时对比")
+    parser.add_argument('--benchmark', nargs='?', const='https://en.wikipedia.org/wiki/List_of_AMD_Ryzen_processors',
+                        metavar='URL_OR_FILE', help='页面 URL 或本地 HTML 文件')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数')
+    parser.add_argument('--signature', default='model,processor,core,frequency,clock,tdp,cache,socket',
+                        help='表头特征关键词（逗号分隔，留空表示全部表格）')
+    args = parser.parse_args()
+    if not args.benchmark:
+        parser.print_help()
+        return
+    source = args.benchmark
+    if os.path.exists(source):
+        with open(source, 'r', encoding='utf-8') as f:
+            html = f.read()
+    else:
+        from http_transport import get_transport
+        response = get_transport().get(source, timeout=30)
+        response.raise_for_status()
+        html = response.text
+    signature = [k for k in args.signature.split(',') if k.strip()] or None
+    result = benchmark(html, signature=signature, repeat=args.repeat)
+    print(f"📊 {source}: 选中 {result['tables']} 张 wikitable，{result['rows']} 行")
+    print(f"⚡ wikitable 提取器: {result['wikitable'] * 1000:.1f} ms")
+    if "read_html" in result:
+        print(f"🐼 pandas.read_html: {result['read_html'] * 1000:.1f} ms "
+              f"（{result['read_html'] / result['wikitable']:.1f}x）")
+    else:
+        print("⚠️  未安装 pandas，跳过 read_html 对比")
+
+
+if __name__ == "__main__":
+    sys.exit(main())